@@ -2,12 +2,14 @@
 Explore commodities data
 """
 
-import requests
-import pandas as pd
+import sys
 import os
 from dotenv import load_dotenv
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from common.http_client import fetch_function
+
 API_FUNCTION = ["WTI", "BRENT", "NATURAL_GAS", "COPPER", "ALUMINUM",
                 "WHEAT", "CORN", "COTTON", "SUGAR", "COFFEE", 
                 "ALL_COMMODITIES"][1]
@@ -23,8 +25,8 @@ API_KEY = os.getenv('ALPHAVANTAGE_API_KEY')
 
 TICKER = "NVDA"  # Example ticker symbol
 
-url = f'https://www.alphavantage.co/query?function={API_FUNCTION}&interval={INTERVAL}&datatype={DATATYPE}&apikey={API_KEY}'
-data = pd.read_csv(url) 
+response = fetch_function("alpha_vantage", API_FUNCTION, API_KEY, interval=INTERVAL, datatype=DATATYPE)
+data = response.parse()
 
 
 # Parse the main structure
@@ -2,12 +2,17 @@
 Explor various functions of the Alpha Vantage API.
 """
 
-import requests
-import pandas as pd
+import asyncio
+import sys
 import os
 from dotenv import load_dotenv
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from common import store
+from common.batch import iter_batch, make_jobs
+from common.timeseries import INCREMENTAL_FUNCTIONS, refresh_series
+
 API_FUNCTION = "CORE_STOCK_API"
 
 STOCK_API_FUNCTION = [
@@ -24,8 +29,12 @@ STOCK_API_FUNCTION = [
 ]
 
 SYMBOL = "NVDA"
+SYMBOLS = [SYMBOL]  # every function is fetched for every symbol, concurrently
 OUTPUT_SIZE = ["compact", "full"][0]  # "compact" or "full"
 DATA_TYPE = ["json", "csv"][1]  # "json" or "csv"
+# With csv, daily series are refreshed from the compact window and merged into
+# the store instead of being downloaded again (full history on the first run)
+INCREMENTAL = DATA_TYPE == "csv"
 
 outfolder = Path(__file__).parent / "examples"
 
@@ -36,11 +45,37 @@ load_dotenv()
 
 api_key = os.getenv('ALPHAVANTAGE_API_KEY')
 
-for STOCK_API_FUNCTION in STOCK_API_FUNCTION:
-    url = f'https://www.alphavantage.co/query?function={STOCK_API_FUNCTION}&symbol={SYMBOL}&outputsize={OUTPUT_SIZE}&datatype={DATA_TYPE}&apikey={api_key}'
-    response = requests.get(url)
-    df = pd.read_csv(url) if DATA_TYPE == "csv" else None
-    output_file = outfolder / API_FUNCTION / f"{STOCK_API_FUNCTION}_{SYMBOL}_{OUTPUT_SIZE}.{DATA_TYPE}"
-    df.to_csv(output_file, index=False) if DATA_TYPE == "csv" else None
-    print("DataFrame Head:", df.head(100))
+incremental_functions = [name for name in STOCK_API_FUNCTION if INCREMENTAL and name in INCREMENTAL_FUNCTIONS]
+batch_functions = [name for name in STOCK_API_FUNCTION if name not in incremental_functions]
+jobs = make_jobs(batch_functions, SYMBOLS, outputsize=OUTPUT_SIZE, datatype=DATA_TYPE)
+
+
+async def fetch_all():
+    # Results arrive in completion order, not submission order
+    async for result in iter_batch(jobs, api_key):
+        function_name, symbol = result.job.function_name, result.job.params["symbol"]
+        if result.error is not None:
+            print(f"❌ {function_name} {symbol}: {result.error}")
+            continue
+        response = result.response
+        if DATA_TYPE == "csv":
+            df = response.parse()
+            partition = store.write(df, function_name, symbol)
+            print(f"💾 {function_name} {symbol} saved to: {partition}")
+            print(f"{function_name} {symbol} DataFrame Head:", df.head(100))
+        else:
+            output_file = outfolder / API_FUNCTION / f"{function_name}_{symbol}_{OUTPUT_SIZE}.{DATA_TYPE}"
+            response.save(output_file)
+
+
+asyncio.run(fetch_all())
+
+for function_name in incremental_functions:
+    for symbol in SYMBOLS:
+        try:
+            df, mode = refresh_series(function_name, symbol, api_key)
+        except Exception as error:
+            print(f"❌ {function_name} {symbol}: {error}")
+            continue
+        print(f"🔄 {function_name} {symbol} refreshed ({mode}): {len(df)} bars through {df[store.DATE_COLUMN].iloc[0]}")
 
@@ -2,12 +2,14 @@
 Explore commodities data
 """
 
-import requests
-import pandas as pd
+import sys
 import os
 from dotenv import load_dotenv
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from common.http_client import fetch_function
+
 API_FUNCTION = ["REAL_GDP", "REAL_GDP_PER_CAPITA"][1]
 
 INTERVAL = ["yearly", "quarterly"][1]
@@ -19,8 +21,8 @@ outfolder = Path(__file__).parent / "examples"
 load_dotenv()
 API_KEY = os.getenv('ALPHAVANTAGE_API_KEY')
 
-url = f'https://www.alphavantage.co/query?function={API_FUNCTION}&interval={INTERVAL}&datatype={DATATYPE}&apikey={API_KEY}'
-data = pd.read_csv(url) 
+response = fetch_function("alpha_vantage", API_FUNCTION, API_KEY, interval=INTERVAL, datatype=DATATYPE)
+data = response.parse()
 
 
 # Parse the main structure
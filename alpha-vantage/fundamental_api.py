@@ -2,12 +2,17 @@
 Explore fundamental data
 """
 
-import requests
-import pandas as pd
+import sys
 import os
 from dotenv import load_dotenv
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from common import store
+from common.batch import make_jobs, run_batch
+from common.http_client import fetch_function
+from common.parsing import overview_frame
+
 API_FUNCTION = ["OVERVIEW", "DIVIDENDS", "SPLITS", "INCOME_STATEMENT", "BALANCE_SHEET",
                 "CASH_FLOW", "EARNINGS", "LISTING_STATUS", "EARNINGS_CALENDAR",
                 "IPO_CALENDAR"][7]
@@ -20,45 +25,48 @@ load_dotenv()
 API_KEY = os.getenv('ALPHAVANTAGE_API_KEY')
 
 TICKER = "NVDA"  # Example ticker symbol
+TICKERS = [TICKER]  # per-symbol statements are fetched for every ticker, concurrently
 
 if API_FUNCTION == "OVERVIEW":
-    url = f'https://www.alphavantage.co/query?function={API_FUNCTION}&symbol={TICKER}&apikey={API_KEY}'
-    print("Fetching data from:", url)
-    response = requests.get(url)
-    data = response.json()
-    print("Response status:", response.status_code)
-    print("Response content:", response.text)
+    response = fetch_function("alpha_vantage", API_FUNCTION, API_KEY, symbol=TICKER)
+    print("Fetching data from:", response.url)
+    data = response.parse()
+    print("Response content:", response.content.decode())
     print("JSON data:", data)
-    data = pd.DataFrame.from_dict(data, orient='index', columns=['Value'])
-    print("DataFrame Head:", data.head(100))
+    # One typed row (numbers, dates, categoricals) instead of an all-string Field/Value column
+    data = overview_frame([data])
+    print("DataFrame:", data.T)
     output_type = 'df'
 elif API_FUNCTION == "EARNINGS_CALENDAR":
-    url = f'https://www.alphavantage.co/query?function={API_FUNCTION}&apikey={API_KEY}'
-    data = pd.read_csv(url) 
+    response = fetch_function("alpha_vantage", API_FUNCTION, API_KEY)
+    data = response.parse()
     output_type = 'df'
 elif API_FUNCTION == "IPO_CALENDAR":
-    url = f'https://www.alphavantage.co/query?function={API_FUNCTION}&horizon=12month&apikey={API_KEY}'
-    data = pd.read_csv(url)
+    response = fetch_function("alpha_vantage", API_FUNCTION, API_KEY, horizon="12month")
+    data = response.parse()
     output_type = 'df'
 elif API_FUNCTION == "LISTING_STATUS":
-    url = f'https://www.alphavantage.co/query?function={API_FUNCTION}&apikey={API_KEY}'
-    response = requests.get(url)
-    data = pd.read_csv(url) 
+    response = fetch_function("alpha_vantage", API_FUNCTION, API_KEY)
+    data = response.parse()
     output_type = 'df_noticker'    
 else:
-    url = f'https://www.alphavantage.co/query?function={API_FUNCTION}&symbol={TICKER}&apikey={API_KEY}'
-    response = requests.get(url)
-    data = response.json()
+    data = {}
+    for result in run_batch(make_jobs(API_FUNCTION, TICKERS), API_KEY):
+        ticker = result.job.params["symbol"]
+        if result.error is not None:
+            print(f"❌ {API_FUNCTION} {ticker}: {result.error}")
+            continue
+        data[ticker] = result.response.parse()
+        output_file = result.response.save(outfolder / f"{API_FUNCTION}_{ticker}.json")
+        print("Output saved to:", output_file)
     output_type = 'json'
 
 if output_type == 'df':
-    output_file = outfolder / f"{API_FUNCTION}_{TICKER}.csv"
-    data.to_csv(output_file, index=True)
+    output_file = store.write(data, API_FUNCTION, TICKER, mode="replace")
     print("Output saved to:", output_file)
     print("DataFrame Head:", data.head(100))
 elif output_type == 'df_noticker':
-    output_file = outfolder / f"{API_FUNCTION}.csv"
-    data.to_csv(output_file, index=True)
+    output_file = store.write(data, API_FUNCTION, mode="replace")
     print("Output saved to:", output_file)
     print("DataFrame Head:", data.head(100))
 
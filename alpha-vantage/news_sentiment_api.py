@@ -2,16 +2,52 @@
 Explor various functions of the Alpha Vantage API.
 """
 
-import requests
+import sys
 import pandas as pd
 import os
 from dotenv import load_dotenv
 from pathlib import Path
 from datetime import datetime
+from itertools import batched
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from common.http_client import fetch_function
+from common.metrics import get_registry
+from common.news_archive import NewsArchive
+from common.news_backfill import iter_backfill
+from common.news_db import ArticleStore
+from common.news_stream import iter_articles_from_bytes
+from common.sentiment import daily_ticker_sentiment, daily_wide_sentiment, flatten_feed
+from common.sentiment_incremental import SentimentAccumulator
 
 API_FUNCTION = "NEWS_SENTIMENT"
 
+# Stage timings go to the shared metrics registry (pipeline_stage_seconds)
+metrics = get_registry()
+
+
+def stage(name):
+    return metrics.timer(pipeline="news_sentiment", stage=name)
+
+
+# Backfill mode: fetch the complete feed for a date range in adaptive windows
+# instead of a single request capped at 1,000 articles
+BACKFILL = False
+BACKFILL_FROM = "20200101T0000"
+BACKFILL_TO = "20201231T2359"
+BACKFILL_TICKERS = None  # e.g. "NVDA,MSFT"
+
+# Incremental mode: only fetch articles newer than the last run and update
+# running daily sums instead of recomputing the whole history
+INCREMENTAL = False
+INCREMENTAL_TICKERS = ['MSFT']
+INCREMENTAL_START = "20250101T0000"  # used on the very first run only
+
+# Articles per batch written to the article store and the archive while streaming
+INGEST_BATCH = 5000
+
 outfolder = Path(__file__).parent / "examples"
+archive = NewsArchive()  # data/news_archive/YYYY/MM/news-YYYYMMDD.ndjson.gz; replay with archive.replay()
 # Load ALPHAVANTAGE_API_KEY from .env file
 load_dotenv()
 API_KEY = os.getenv('ALPHAVANTAGE_API_KEY')
@@ -28,57 +64,94 @@ API_KEY = os.getenv('ALPHAVANTAGE_API_KEY')
 
 # Option 4: Try going back 5 years
 #url = f'https://www.alphavantage.co/query?function={API_FUNCTION}&tickers=MSFT&time_from=20200101T0000&time_to=20201231T2359&limit=50&sort=EARLIEST&apikey={API_KEY}'
-url = f'https://www.alphavantage.co/query?function={API_FUNCTION}&time_from=20200101T0000&limit=1000&sort=EARLIEST&apikey={API_KEY}'
+request_params = dict(tickers=None, topics=None, time_from="20200101T0000", time_to=None, limit=1000, sort="EARLIEST")
 
 # Option 5: Try going back 10 years
 # url = f'https://www.alphavantage.co/query?function={API_FUNCTION}&tickers=NVDA&time_from=20150101T0000&limit=1000&sort=EARLIEST&apikey={API_KEY}'
 
-response = requests.get(url)
-data = response.json()
+if INCREMENTAL:
+    accumulator = SentimentAccumulator(outfolder / "sentiment_state", INCREMENTAL_TICKERS)
+    failed_windows = []
+    touched_dates = accumulator.refresh(API_KEY, start=INCREMENTAL_START, failed_windows=failed_windows)
+    for window_start, window_end, error in failed_windows:
+        print(f"⚠️ Window {window_start} - {window_end} failed (retried next run): {error}")
+    print(f"🔄 Updated {len(touched_dates)} day(s) up to watermark {accumulator.watermark}")
+    print(accumulator.daily(touched_dates).to_string(index=False))
+    accumulator.daily().to_csv(outfolder / "daily_sentiment_incremental.csv", index=False)
+    exit()
+
+# Analyze your specific tickers
+target_tickers = ['MSFT']  # Focus only on NVDA
+
+# Articles are consumed as a stream (backfill windows or one response body),
+# never collected into one list
+failed_windows = []
+if BACKFILL:
+    articles = iter_backfill(API_KEY, BACKFILL_FROM, BACKFILL_TO, tickers=BACKFILL_TICKERS,
+                             failed_windows=failed_windows)
+else:
+    with stage("fetch"):
+        response = fetch_function("alpha_vantage", API_FUNCTION, API_KEY, **request_params)
+    articles = iter_articles_from_bytes(response.content)
+
+news_db = ArticleStore()
+preview = []
+archived = 0
+
+
+def ingest(articles):
+    """
+    Pass articles through in batches, adding each batch to the indexed article
+    store (for historical queries across runs) and the compressed archive;
+    URLs already stored or archived are skipped. Keeps the first 3 for display.
+    """
+    global archived
+    for batch in batched(articles, INGEST_BATCH):
+        news_db.insert(batch)
+        archived += archive.append(batch)
+        preview.extend(batch[:3 - len(preview)])
+        yield from batch
+
+
+# Flatten this run's articles into columnar article / ticker-mention frames
+# while they stream past the store and the archive
+with stage("ingest"):
+    articles_df, mentions_df = flatten_feed(ingest(articles), target_tickers)
+for window_start, window_end, error in failed_windows:
+    print(f"⚠️ Window {window_start} - {window_end} failed: {error}")
 
 # Parse the main structure
-print(f"📊 Total items: {data['items']}")
-print(f"📰 Articles found: {len(data['feed'])}")
+print(f"📰 Articles found: {len(articles_df)}")
 
 # Analyze date range and distribution
-if len(data['feed']) > 0:
-    dates = []
-    for article in data['feed']:
-        date_str = article['time_published'][:8]  # Extract YYYYMMDD
-        dates.append(datetime.strptime(date_str, '%Y%m%d'))
-    
-    dates.sort()
+if len(articles_df) > 0:
+    dates = articles_df['date'].sort_values()
     print(f"\n📅 HISTORICAL DATA ANALYSIS:")
     print("="*50)
-    print(f"🗓️  Earliest article: {dates[0].strftime('%Y-%m-%d')}")
-    print(f"🗓️  Latest article: {dates[-1].strftime('%Y-%m-%d')}")
-    print(f"📊 Date range span: {(dates[-1] - dates[0]).days} days")
-    
+    print(f"🗓️  Earliest article: {dates.iloc[0].strftime('%Y-%m-%d')}")
+    print(f"🗓️  Latest article: {dates.iloc[-1].strftime('%Y-%m-%d')}")
+    print(f"📊 Date range span: {(dates.iloc[-1] - dates.iloc[0]).days} days")
+
     # Count articles by year
-    year_counts = {}
-    for date in dates:
-        year = date.year
-        year_counts[year] = year_counts.get(year, 0) + 1
-    
+    year_counts = dates.dt.year.value_counts().sort_index()
     print(f"\n📈 Articles by Year:")
-    for year in sorted(year_counts.keys()):
-        print(f"  {year}: {year_counts[year]} articles")
-    
+    for year, count in year_counts.items():
+        print(f"  {year}: {count} articles")
+
     # Count articles by month (last 12 months)
-    from collections import Counter
-    recent_dates = [d for d in dates if d >= datetime.now() - pd.DateOffset(months=12)]
-    if recent_dates:
-        month_counts = Counter([d.strftime('%Y-%m') for d in recent_dates])
+    recent_dates = dates[dates >= datetime.now() - pd.DateOffset(months=12)]
+    if len(recent_dates):
+        month_counts = recent_dates.dt.strftime('%Y-%m').value_counts().sort_index()
         print(f"\n📈 Recent Monthly Distribution (last 12 months):")
-        for month in sorted(month_counts.keys())[-12:]:
-            print(f"  {month}: {month_counts[month]} articles")
+        for month, count in month_counts.iloc[-12:].items():
+            print(f"  {month}: {count} articles")
 
 print("\n" + "="*60)
 
 
 
 # Parse individual articles
-for i, article in enumerate(data['feed'][:3]):  # Show first 3 articles
+for i, article in enumerate(preview):  # Show first 3 articles
     print(f"\n📰 Article {i+1}:")
     print(f"Title: {article['title']}")
     print(f"Source: {article['source']}")
@@ -101,113 +174,32 @@ print(f"\n🎯 SUMMARY STATISTICS:")
 print("="*40)
 
 # Count sentiment labels
-sentiment_counts = {}
-for article in data['feed']:
-    sentiment = article['overall_sentiment_label']
-    sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
+sentiment_counts = articles_df['overall_sentiment_label'].value_counts(sort=False)
 
 print(f"📊 Overall Sentiment Distribution:")
-for sentiment, count in sentiment_counts.items():
-    percentage = (count / len(data['feed'])) * 100
+for sentiment, count in sentiment_counts[sentiment_counts > 0].items():
+    percentage = (count / len(articles_df)) * 100
     print(f"  {sentiment}: {count} articles ({percentage:.1f}%)")
 
-# Analyze your specific tickers
-target_tickers = ['MSFT']  # Focus only on NVDA
-ticker_sentiment_data = {ticker: [] for ticker in target_tickers}
-
-for article in data['feed']:
-    for ticker_info in article['ticker_sentiment']:
-        if ticker_info['ticker'] in target_tickers:
-            ticker_sentiment_data[ticker_info['ticker']].append({
-                'score': float(ticker_info['ticker_sentiment_score']),
-                'label': ticker_info['ticker_sentiment_label'],
-                'relevance': float(ticker_info['relevance_score'])
-            })
-
 print(f"\n📈 Ticker Analysis:")
-for ticker in target_tickers:
-    if ticker_sentiment_data[ticker]:
-        scores = [item['score'] for item in ticker_sentiment_data[ticker]]
-        avg_score = sum(scores) / len(scores)
-        mentions = len(ticker_sentiment_data[ticker])
-        print(f"  {ticker}: {mentions} mentions, Avg sentiment: {avg_score:.3f}")
+ticker_stats = mentions_df.groupby('ticker', observed=True)['ticker_sentiment_score'].agg(['size', 'mean'])
+for ticker, stats in ticker_stats.iterrows():
+    print(f"  {ticker}: {int(stats['size'])} mentions, Avg sentiment: {stats['mean']:.3f}")
 
 # Uncomment the next line to stop execution here (skip time series creation)
 # exit()
 
 # Create daily time series data for stock analysis
 from datetime import datetime
-import json
 
 print(f"\n📅 CREATING DAILY TIME SERIES:")
 print("="*40)
 
 # Aggregate sentiment data by date and ticker
-daily_data = {}
+with stage("daily_ticker_sentiment"):
+    df_timeseries = daily_ticker_sentiment(mentions_df)
 
-for article in data['feed']:
-    # Parse the date from time_published (format: YYYYMMDDTHHMMSS)
-    date_str = article['time_published'][:8]  # Extract YYYYMMDD
-    date = datetime.strptime(date_str, '%Y%m%d').strftime('%Y-%m-%d')
-    
-    for ticker_info in article['ticker_sentiment']:
-        if ticker_info['ticker'] in target_tickers:
-            ticker = ticker_info['ticker']
-            key = (date, ticker)
-            
-            if key not in daily_data:
-                daily_data[key] = {
-                    'date': date,
-                    'ticker': ticker,
-                    'articles': [],
-                    'sentiment_scores': [],
-                    'relevance_scores': [],
-                    'sentiment_labels': []
-                }
-            
-            daily_data[key]['articles'].append(article['title'])
-            daily_data[key]['sentiment_scores'].append(float(ticker_info['ticker_sentiment_score']))
-            daily_data[key]['relevance_scores'].append(float(ticker_info['relevance_score']))
-            daily_data[key]['sentiment_labels'].append(ticker_info['ticker_sentiment_label'])
-
-# Convert to DataFrame for time series analysis
-time_series_data = []
-
-for (date, ticker), day_data in daily_data.items():
-    scores = day_data['sentiment_scores']
-    relevances = day_data['relevance_scores']
-    
-    # Calculate various aggregations
-    avg_sentiment = sum(scores) / len(scores)
-    
-    # Weighted average by relevance
-    weighted_sentiment = sum(s * r for s, r in zip(scores, relevances)) / sum(relevances) if sum(relevances) > 0 else avg_sentiment
-    
-    # Count sentiment labels
-    positive_count = day_data['sentiment_labels'].count('Bullish')
-    negative_count = day_data['sentiment_labels'].count('Bearish')
-    neutral_count = day_data['sentiment_labels'].count('Neutral')
-    
-    time_series_data.append({
-        'date': date,
-        'ticker': ticker,
-        'article_count': len(scores),
-        'avg_sentiment_score': round(avg_sentiment, 4),
-        'weighted_sentiment_score': round(weighted_sentiment, 4),
-        'avg_relevance_score': round(sum(relevances) / len(relevances), 4),
-        'bullish_mentions': positive_count,
-        'bearish_mentions': negative_count,
-        'neutral_mentions': neutral_count,
-        'sentiment_ratio': round((positive_count - negative_count) / len(scores), 4) if len(scores) > 0 else 0
-    })
-
-# Create DataFrame and sort by date and ticker
-df_timeseries = pd.DataFrame(time_series_data)
-
-if not df_timeseries.empty and 'date' in df_timeseries.columns:
-    df_timeseries['date'] = pd.to_datetime(df_timeseries['date'])
-    df_timeseries = df_timeseries.sort_values(['date', 'ticker']).reset_index(drop=True)
-else:
+if df_timeseries.empty:
     print("⚠️ No time series data created - DataFrame is empty or missing 'date' column")
     exit()
 
@@ -229,19 +221,14 @@ summary = df_timeseries.groupby('ticker').agg({
 print(summary)
 
 # Save both raw data and time series
-output_file = outfolder / "news_sentiment_data.json"
 timeseries_file = outfolder / "daily_sentiment_timeseries.csv"
+timeseries_file.parent.mkdir(parents=True, exist_ok=True)
 
-output_file.parent.mkdir(parents=True, exist_ok=True)
-
-# Save raw data
-with open(output_file, 'w') as f:
-    json.dump(data, f, indent=2)
+with stage("save"):
+    # Save time series (raw articles were archived while streaming)
+    df_timeseries.to_csv(timeseries_file, index=False)
 
-# Save time series
-df_timeseries.to_csv(timeseries_file, index=False)
-
-print(f"\n💾 Raw data saved to: {output_file}")
+print(f"\n💾 {archived} new article(s) archived to: {archive.directory}")
 print(f"💾 Daily time series saved to: {timeseries_file}")
 
 print(f"\n✅ Ready for stock market analysis!")
@@ -256,66 +243,9 @@ print(f"  - article_count: Number of news mentions per day")
 print(f"\n📈 CREATING DAILY TIME SERIES:")
 print("="*50)
 
-from datetime import datetime
-from collections import defaultdict
-
-# Convert to daily time series
-daily_sentiment = defaultdict(lambda: defaultdict(list))
-
-for article in data['feed']:
-    # Parse the date from time_published (format: 20250628T101500)
-    date_str = article['time_published'][:8]  # Get YYYYMMDD
-    date = datetime.strptime(date_str, '%Y%m%d').strftime('%Y-%m-%d')
-    
-    # Add overall article sentiment
-    daily_sentiment[date]['overall'].append(float(article['overall_sentiment_score']))
-    
-    # Add ticker-specific sentiment
-    for ticker_info in article['ticker_sentiment']:
-        if ticker_info['ticker'] in target_tickers:
-            daily_sentiment[date][ticker_info['ticker']].append({
-                'sentiment_score': float(ticker_info['ticker_sentiment_score']),
-                'relevance_score': float(ticker_info['relevance_score'])
-            })
-
-# Aggregate daily sentiment data
-daily_aggregated = []
-
-for date in sorted(daily_sentiment.keys()):
-    row = {'date': date}
-    
-    # Overall market sentiment for the day
-    if daily_sentiment[date]['overall']:
-        row['overall_sentiment_avg'] = sum(daily_sentiment[date]['overall']) / len(daily_sentiment[date]['overall'])
-        row['article_count'] = len(daily_sentiment[date]['overall'])
-    
-    # Ticker-specific sentiment
-    for ticker in target_tickers:
-        if daily_sentiment[date][ticker]:
-            # Simple average
-            sentiment_scores = [item['sentiment_score'] for item in daily_sentiment[date][ticker]]
-            relevance_scores = [item['relevance_score'] for item in daily_sentiment[date][ticker]]
-            
-            row[f'{ticker}_sentiment_avg'] = sum(sentiment_scores) / len(sentiment_scores)
-            row[f'{ticker}_relevance_avg'] = sum(relevance_scores) / len(relevance_scores)
-            row[f'{ticker}_mention_count'] = len(sentiment_scores)
-            
-            # Weighted average (sentiment weighted by relevance)
-            if relevance_scores:
-                weighted_sentiment = sum(s * r for s, r in zip(sentiment_scores, relevance_scores))
-                total_relevance = sum(relevance_scores)
-                row[f'{ticker}_sentiment_weighted'] = weighted_sentiment / total_relevance if total_relevance > 0 else 0
-        else:
-            # Fill missing data with neutral values
-            row[f'{ticker}_sentiment_avg'] = 0.0
-            row[f'{ticker}_relevance_avg'] = 0.0
-            row[f'{ticker}_mention_count'] = 0
-            row[f'{ticker}_sentiment_weighted'] = 0.0
-    
-    daily_aggregated.append(row)
-
-# Create DataFrame for easy analysis
-df = pd.DataFrame(daily_aggregated)
+# One row per day: overall sentiment plus per-ticker columns
+with stage("daily_wide_sentiment"):
+    df = daily_wide_sentiment(articles_df, mentions_df, target_tickers)
 print(f"📊 Daily time series created: {len(df)} days")
 print(f"📅 Date range: {df['date'].min()} to {df['date'].max()}")
 print("\nFirst few rows:")
@@ -343,7 +273,7 @@ print("-" * 40)
 # Show last 5 days trend
 recent_df = df.tail(5)
 for _, row in recent_df.iterrows():
-    print(f"{row['date']}: ", end="")
+    print(f"{row['date']:%Y-%m-%d}: ", end="")
     for ticker in target_tickers:
         sentiment = row[f'{ticker}_sentiment_weighted']
         mentions = row[f'{ticker}_mention_count']
@@ -355,3 +285,8 @@ print("  - Merging with stock price data")
 print("  - Creating correlation analysis")
 print("  - Building predictive models")
 print("  - Plotting sentiment vs. price trends")
+
+print(f"\n⏱️  PIPELINE TIMINGS:")
+for histogram in metrics.snapshot()["histograms"]:
+    if histogram["labels"].get("pipeline") == "news_sentiment":
+        print(f"  {histogram['labels']['stage']}: {histogram['sum']:.3f}s")
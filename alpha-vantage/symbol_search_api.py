@@ -1,14 +1,19 @@
 
 
-import requests
+import sys
 import pandas as pd
 import os
 from dotenv import load_dotenv
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from common.http_client import fetch_function
+from common.symbol_index import load_index
+
 API_FUNCTION = "CORE_STOCK_API"
 STOCK_API_FUNCTION = "SYMBOL_SEARCH"
 KEYWORDS = "NVDA"
+OFFLINE = True  # search the local LISTING_STATUS index (no API call per lookup)
 
 outfolder = Path(__file__).parent / "examples"
 
@@ -19,11 +24,15 @@ load_dotenv()
 
 api_key = os.getenv('ALPHAVANTAGE_API_KEY')
 
-url = f'https://www.alphavantage.co/query?function={STOCK_API_FUNCTION}&keywords={KEYWORDS}&datatype=csv&apikey={api_key}'
-response = requests.get(url)
-df = pd.read_csv(url) 
-output_file = outfolder / API_FUNCTION / f"{STOCK_API_FUNCTION}_{KEYWORDS}.csv"
-df.to_csv(output_file, index=False) 
+if OFFLINE:
+    # Rebuilt from LISTING_STATUS at most once a day
+    index = load_index(api_key)
+    df = pd.DataFrame(index.search(KEYWORDS, limit=10))
+else:
+    response = fetch_function("alpha_vantage", STOCK_API_FUNCTION, api_key, keywords=KEYWORDS, datatype="csv")
+    df = response.parse()
+    output_file = outfolder / API_FUNCTION / f"{STOCK_API_FUNCTION}_{KEYWORDS}.csv"
+    response.save(output_file)
 print("DataFrame Head:", df.head(100))
 
 
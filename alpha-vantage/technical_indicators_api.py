@@ -1,41 +1,40 @@
 """
 Explore technical indicators data
+Indicators are computed locally from stored TIME_SERIES_DAILY_ADJUSTED bars
+(see common/indicators.py); the API is only called to spot-check them.
 """
 
-import requests
-import pandas as pd
+import sys
 import os
 from dotenv import load_dotenv
 from pathlib import Path
 
-API_FUNCTION = ["ADX"][0]
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from common.indicators import compute, load_prices, spot_check
 
-SYMBOL = "NVDA"
+API_FUNCTION = ["ADX", "WILLR", "ATR", "CCI", "SMA", "EMA", "WMA", "RSI", "MOM", "ROC", "BBANDS", "MACD", "OBV"][0]
 
-INTERVAL = ["daily", "weekly", "monthly"][0]
-
-DATATYPE = ["json", "csv"][1]  # "json" or "csv"
+SYMBOLS = None  # None = every symbol in the store
 
 TIME_PERIOD = 30
 
-outfolder = Path(__file__).parent / "examples"
+SPOT_CHECK = "NVDA"  # Symbol to compare against the API (None to skip the API call)
+
 # Load ALPHAVANTAGE_API_KEY from .env file
 load_dotenv()
 API_KEY = os.getenv('ALPHAVANTAGE_API_KEY')
 
-url = f'https://www.alphavantage.co/query?function={API_FUNCTION}&symbol={SYMBOL}interval={INTERVAL}&datatype={DATATYPE}&time_period={TIME_PERIOD}&outputsize=compact&apikey={API_KEY}'
-data = pd.read_csv(url) 
-
-
-# Parse the main structure
-print(data)
-
+params = {} if API_FUNCTION in ("MACD", "OBV") else {"time_period": TIME_PERIOD}
 
-import requests
+prices = load_prices(SYMBOLS)
+if not prices:
+    sys.exit("No TIME_SERIES_DAILY_ADJUSTED data stored; fetch it first (core_stock_api.py or main.py)")
 
-# replace the "demo" apikey below with your own key from https://www.alphavantage.co/support/#api-key
-url = 'https://www.alphavantage.co/query?function=WILLR&symbol=IBM&interval=daily&time_period=10&apikey=demo'
-r = requests.get(url)
-data = r.json()
+results = compute(API_FUNCTION, prices, **params)
+for column, panel in results.items():
+    print(f"{API_FUNCTION} {column} ({panel.shape[1]} symbols), latest rows:")
+    print(panel.tail())
 
-print(data)
\ No newline at end of file
+if SPOT_CHECK and SPOT_CHECK in prices["close"].columns:
+    print(f"Spot check against the API for {SPOT_CHECK}:")
+    print(spot_check(API_FUNCTION, SPOT_CHECK, API_KEY, prices=prices, **params))
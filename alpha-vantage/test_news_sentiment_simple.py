@@ -1,14 +1,22 @@
 """
 Simple test script for Alpha Vantage NEWS_SENTIMENT API
 Based directly on the official documentation examples
+Set ALPHAVANTAGE_BASE_URL to run it against the local replay server
+(python -m common.replay_server) instead of the live API.
 """
-import requests
 import json
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from common.api_config import API_CONFIGS
+from common.http_client import get_session
+
 load_dotenv()
 api_key = os.getenv('ALPHAVANTAGE_API_KEY')
+base_url = API_CONFIGS["alpha_vantage"]["base_url"]
 
 print(f"🔑 Using API key: {api_key[:10]}...{api_key[-4:] if api_key else 'None'}")
 print("="*60)
@@ -17,9 +25,9 @@ print("="*60)
 print("🧪 TEST 1: Alpha Vantage Documentation Example")
 print("URL from docs: https://www.alphavantage.co/query?function=NEWS_SENTIMENT&tickers=AAPL&apikey=demo")
 
-doc_url = "https://www.alphavantage.co/query?function=NEWS_SENTIMENT&tickers=AAPL&apikey=demo"
+doc_url = f"{base_url}?function=NEWS_SENTIMENT&tickers=AAPL&apikey=demo"
 try:
-    response = requests.get(doc_url)
+    response = get_session().get(doc_url)
     print(f"📡 Status: {response.status_code}")
     
     if response.status_code == 200:
@@ -43,11 +51,11 @@ print("\n" + "="*60)
 
 # Test 2: Use YOUR API key with the exact same simple query
 print("🧪 TEST 2: Your API Key with Simple AAPL Query")
-your_url = f"https://www.alphavantage.co/query?function=NEWS_SENTIMENT&tickers=AAPL&apikey={api_key}"
+your_url = f"{base_url}?function=NEWS_SENTIMENT&tickers=AAPL&apikey={api_key}"
 print(f"Your URL: {your_url}")
 
 try:
-    response = requests.get(your_url)
+    response = get_session().get(your_url)
     print(f"📡 Status: {response.status_code}")
     
     if response.status_code == 200:
@@ -85,11 +93,11 @@ print("\n" + "="*60)
 
 # Test 3: Try without any parameters except the function
 print("🧪 TEST 3: Minimal Query (No Parameters)")
-minimal_url = f"https://www.alphavantage.co/query?function=NEWS_SENTIMENT&apikey={api_key}"
+minimal_url = f"{base_url}?function=NEWS_SENTIMENT&apikey={api_key}"
 print(f"Minimal URL: {minimal_url}")
 
 try:
-    response = requests.get(minimal_url)
+    response = get_session().get(minimal_url)
     print(f"📡 Status: {response.status_code}")
     
     if response.status_code == 200:
@@ -112,11 +120,11 @@ print("🧪 TEST 4: Different Stocks")
 test_stocks = ["NVDA", "MSFT", "TSLA", "META"]
 
 for stock in test_stocks:
-    stock_url = f"https://www.alphavantage.co/query?function=NEWS_SENTIMENT&tickers={stock}&apikey={api_key}"
+    stock_url = f"{base_url}?function=NEWS_SENTIMENT&tickers={stock}&apikey={api_key}"
     print(f"\n📈 Testing {stock}...")
     
     try:
-        response = requests.get(stock_url)
+        response = get_session().get(stock_url)
         if response.status_code == 200:
             data = response.json()
             items = data.get('items', '0')
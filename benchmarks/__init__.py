@@ -0,0 +1 @@
+"""Benchmarks for the fetch / parse / aggregate / store pipeline (see benchmarks.run)."""
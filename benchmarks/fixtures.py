@@ -0,0 +1,90 @@
+"""
+Synthetic payloads shaped like recorded API responses.
+Everything is generated from a seed, so every run (and every commit) sees
+the same bytes. Large feeds are produced page by page, the way the API
+returns them (at most 1,000 articles per NEWS_SENTIMENT response).
+"""
+import io
+import json
+import random
+from datetime import datetime, timedelta
+
+LABELS = [(-0.35, "Bearish"), (-0.15, "Somewhat-Bearish"), (0.15, "Neutral"), (0.35, "Somewhat-Bullish")]
+SOURCES = ["Benzinga", "Motley Fool", "Zacks Commentary", "CNBC", "Reuters", "Business Standard"]
+TOPICS = ["Technology", "Earnings", "Financial Markets", "Economy - Monetary", "Retail & Wholesale"]
+
+PAGE_SIZE = 1000
+
+
+def symbols(count):
+    """Deterministic ticker-like symbols: AAAA, AAAB, ..."""
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    result = []
+    for i in range(count):
+        name, n = "", i
+        for _ in range(4):
+            name = letters[n % 26] + name
+            n //= 26
+        result.append(name)
+    return result
+
+
+def _label(score):
+    for bound, label in LABELS:
+        if score <= bound:
+            return label
+    return "Bullish"
+
+
+def iter_news_pages(n_articles, tickers, start=datetime(2024, 1, 1), articles_per_day=2000, seed=0):
+    """
+    Yield NEWS_SENTIMENT response bodies (bytes) of up to PAGE_SIZE articles,
+    n_articles in total, published in time order from `start`.
+    """
+    rng = random.Random(seed)
+    step = timedelta(days=1) / articles_per_day
+    for page_start in range(0, n_articles, PAGE_SIZE):
+        feed = []
+        for i in range(page_start, min(page_start + PAGE_SIZE, n_articles)):
+            overall = round(rng.uniform(-0.6, 0.6), 6)
+            mentions = []
+            for ticker in rng.sample(tickers, min(len(tickers), rng.randint(1, 4))):
+                score = round(rng.uniform(-0.6, 0.6), 6)
+                mentions.append({
+                    "ticker": ticker,
+                    "relevance_score": f"{rng.random():.6f}",
+                    "ticker_sentiment_score": f"{score:.6f}",
+                    "ticker_sentiment_label": _label(score)
+                })
+            feed.append({
+                "title": f"Synthetic headline {i}",
+                "url": f"https://news.example.com/{seed}/{i}",
+                "time_published": (start + i * step).strftime("%Y%m%dT%H%M%S"),
+                "authors": [],
+                "summary": "Synthetic article used for benchmarking the news pipeline.",
+                "source": rng.choice(SOURCES),
+                "topics": [{"topic": rng.choice(TOPICS), "relevance_score": f"{rng.random():.6f}"}],
+                "overall_sentiment_score": overall,
+                "overall_sentiment_label": _label(overall),
+                "ticker_sentiment": mentions
+            })
+        yield json.dumps({"items": str(len(feed)), "feed": feed}).encode()
+
+
+def daily_adjusted_csv(symbol, n_days, end=datetime(2025, 6, 27), seed=0):
+    """TIME_SERIES_DAILY_ADJUSTED CSV body (newest bar first) for one symbol."""
+    rng = random.Random(f"{seed}-{symbol}")
+    price = rng.uniform(10, 500)
+    out = io.StringIO()
+    out.write("timestamp,open,high,low,close,adjusted_close,volume,dividend_amount,split_coefficient\n")
+    day = end
+    for _ in range(n_days):
+        open_ = price
+        close = max(1.0, price * (1 + rng.gauss(0, 0.02)))
+        high = max(open_, close) * (1 + rng.random() * 0.01)
+        low = min(open_, close) * (1 - rng.random() * 0.01)
+        out.write(f"{day:%Y-%m-%d},{open_:.4f},{high:.4f},{low:.4f},{close:.4f},{close:.4f},"
+                  f"{rng.randint(100_000, 50_000_000)},0.0000,1.0\n")
+        price = open_ * (1 + rng.gauss(0, 0.01))
+        day -= timedelta(days=1 if day.weekday() != 0 else 3)
+    return out.getvalue().encode()
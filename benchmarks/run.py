@@ -0,0 +1,291 @@
+"""
+Pipeline benchmarks.
+Times each stage separately (URL building, fetch through the local replay
+server, CSV/JSON parsing, sentiment aggregation, store writes and reads) on
+synthetic fixtures and writes p50/p99 latency and throughput per stage as
+JSON, so runs from different commits can be compared.
+
+Usage:
+    python -m benchmarks.run                       # quick scale
+    python -m benchmarks.run --scale full          # 1M articles, 10k symbols
+    python -m benchmarks.run --stages parse_csv,store_write
+    python -m benchmarks.run --compare base.json new.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import fixtures
+from common import store
+from common.api_config import build_url
+from common.http_client import fetch_function
+from common.news_stream import iter_articles_from_bytes
+from common.parsing import SCHEMAS, read_csv_bytes, read_csv_typed, read_json_bytes
+from common.quota import get_scheduler
+from common.replay_server import FixtureSet, replay
+from common.sentiment import daily_ticker_sentiment, daily_wide_sentiment, flatten_feed
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+API_KEY = "benchmark"
+
+SCALES = {
+    "quick": {"news_articles": 20_000, "news_tickers": 50, "symbols": 200, "days": 100,
+              "build_url_calls": 50_000, "fetch_requests": 200},
+    "full": {"news_articles": 1_000_000, "news_tickers": 500, "symbols": 10_000, "days": 100,
+             "build_url_calls": 1_000_000, "fetch_requests": 5_000}
+}
+
+# Tickers the news script reports on in wide format
+WIDE_TICKERS = 5
+
+
+def summarize(samples_ns, items, unit, wall_s=None, **extra):
+    """
+    Stage result from per-operation latencies.
+
+    Args:
+        samples_ns: Latency of each timed operation, in nanoseconds
+        items: Units of work done (rows, articles, requests, ...)
+        unit: Name of the work unit, used in the throughput label
+        wall_s: Elapsed wall time (defaults to the sum of samples, i.e. serial work)
+    """
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    wall_s = wall_s if wall_s is not None else samples.sum() / 1e3
+    return {
+        "operations": int(samples.size),
+        "items": int(items),
+        "wall_s": round(wall_s, 6),
+        "p50_ms": round(float(np.percentile(samples, 50)), 6),
+        "p99_ms": round(float(np.percentile(samples, 99)), 6),
+        "mean_ms": round(float(samples.mean()), 6),
+        "max_ms": round(float(samples.max()), 6),
+        "throughput": round(items / wall_s, 3) if wall_s else None,
+        "throughput_unit": f"{unit}/s",
+        **extra
+    }
+
+
+def bench_build_url(scale):
+    tickers = fixtures.symbols(scale["symbols"])
+    samples = []
+    for i in range(scale["build_url_calls"]):
+        start = time.perf_counter_ns()
+        build_url("alpha_vantage", "TIME_SERIES_DAILY_ADJUSTED", API_KEY, symbol=tickers[i % len(tickers)])
+        samples.append(time.perf_counter_ns() - start)
+    return {"build_url": summarize(samples, len(samples), "urls")}
+
+
+def bench_fetch(scale):
+    tickers = fixtures.symbols(scale["symbols"])
+    fixture_set = FixtureSet()
+    for ticker in tickers:
+        fixture_set.add("TIME_SERIES_DAILY_ADJUSTED", ticker,
+                        fixtures.daily_adjusted_csv(ticker, scale["days"]), "csv")
+    news_page = next(fixtures.iter_news_pages(fixtures.PAGE_SIZE, fixtures.symbols(scale["news_tickers"])))
+    fixture_set.add("NEWS_SENTIMENT", None, news_page, "json")
+    # Lift the free-tier quota for the benchmark key; the replay server is local
+    get_scheduler().set_key_quota("alpha_vantage", API_KEY)
+
+    def timed(function_name, params):
+        start = time.perf_counter_ns()
+        response = fetch_function("alpha_vantage", function_name, API_KEY, use_cache=False, **params)
+        return time.perf_counter_ns() - start, len(response.content)
+
+    results = {}
+    with replay(fixture_set), ThreadPoolExecutor(max_workers=8) as executor:
+        for stage, function_name, make_params in [
+            ("fetch_csv", "TIME_SERIES_DAILY_ADJUSTED", lambda i: {"symbol": tickers[i % len(tickers)],
+                                                                    "datatype": "csv"}),
+            ("fetch_news", "NEWS_SENTIMENT", lambda i: {"tickers": tickers[i % len(tickers)]})
+        ]:
+            count = scale["fetch_requests"]
+            wall = time.perf_counter()
+            outcomes = list(executor.map(lambda i: timed(function_name, make_params(i)), range(count)))
+            wall = time.perf_counter() - wall
+            total_bytes = sum(size for _, size in outcomes)
+            results[stage] = summarize([elapsed for elapsed, _ in outcomes], count, "requests", wall,
+                                       concurrency=8, megabytes_per_s=round(total_bytes / wall / 1e6, 3))
+    return results
+
+
+def bench_parse_csv(scale):
+    """Inferred vs schema-typed CSV parsing; memory is the deep size of all parsed frames."""
+    bodies = [fixtures.daily_adjusted_csv(ticker, scale["days"]) for ticker in fixtures.symbols(scale["symbols"])]
+    schema = SCHEMAS["TIME_SERIES_DAILY_ADJUSTED"]
+    results = {}
+    for stage, parse in [
+        ("parse_csv", read_csv_bytes),
+        ("parse_csv_typed", lambda body: read_csv_typed(body, schema, float32_prices=False)),
+        ("parse_csv_typed_f32", lambda body: read_csv_typed(body, schema, float32_prices=True))
+    ]:
+        samples, rows, memory = [], 0, 0
+        for body in bodies:
+            start = time.perf_counter_ns()
+            df = parse(body)
+            samples.append(time.perf_counter_ns() - start)
+            rows += len(df)
+            memory += int(df.memory_usage(deep=True).sum())
+        results[stage] = summarize(samples, rows, "rows", memory_mb=round(memory / 1e6, 3))
+    return results
+
+
+def bench_news(scale):
+    """
+    JSON parse (whole body and streamed) and the news script's aggregation,
+    page by page and once over the whole feed's concatenated frames (the
+    millions of article-ticker rows a long backfill produces).
+    """
+    tickers = fixtures.symbols(scale["news_tickers"])
+    wide_tickers = tickers[:WIDE_TICKERS]
+    parse, stream, aggregate = [], [], []
+    article_frames, mention_frames = [], []
+    articles = 0
+    for page in fixtures.iter_news_pages(scale["news_articles"], tickers):
+        start = time.perf_counter_ns()
+        feed = read_json_bytes(page)["feed"]
+        parse.append(time.perf_counter_ns() - start)
+
+        start = time.perf_counter_ns()
+        for _ in iter_articles_from_bytes(page):
+            pass
+        stream.append(time.perf_counter_ns() - start)
+
+        start = time.perf_counter_ns()
+        articles_df, mentions_df = flatten_feed(feed)
+        daily_ticker_sentiment(mentions_df)
+        daily_wide_sentiment(articles_df, mentions_df, wide_tickers)
+        aggregate.append(time.perf_counter_ns() - start)
+        article_frames.append(articles_df)
+        mention_frames.append(mentions_df)
+        articles += len(feed)
+
+    start = time.perf_counter_ns()
+    articles_df = pd.concat(article_frames, ignore_index=True)
+    mentions_df = pd.concat(mention_frames, ignore_index=True)
+    daily_ticker_sentiment(mentions_df)
+    daily_wide_sentiment(articles_df, mentions_df, wide_tickers)
+    aggregate_full = time.perf_counter_ns() - start
+    return {
+        "parse_json": summarize(parse, articles, "articles"),
+        "parse_json_stream": summarize(stream, articles, "articles"),
+        "aggregate_sentiment": summarize(aggregate, articles, "articles"),
+        "aggregate_sentiment_full": summarize([aggregate_full], len(mentions_df), "mentions",
+                                              articles=articles)
+    }
+
+
+def bench_store(scale):
+    tickers = fixtures.symbols(scale["symbols"])
+    frames = [(ticker, read_csv_bytes(fixtures.daily_adjusted_csv(ticker, scale["days"]))) for ticker in tickers]
+    with tempfile.TemporaryDirectory() as directory:
+        samples, rows = [], 0
+        for ticker, df in frames:
+            start = time.perf_counter_ns()
+            store.write(df, "TIME_SERIES_DAILY_ADJUSTED", ticker, mode="replace", directory=directory)
+            samples.append(time.perf_counter_ns() - start)
+            rows += len(df)
+        results = {"store_write": summarize(samples, rows, "rows")}
+
+        reads = []
+        for _ in range(3):
+            start = time.perf_counter_ns()
+            panel = store.read_panel("TIME_SERIES_DAILY_ADJUSTED", "adjusted_close", directory=directory)
+            reads.append(time.perf_counter_ns() - start)
+        results["store_read_panel"] = summarize(reads, panel.size * len(reads), "values")
+    return results
+
+
+STAGES = {
+    "build_url": bench_build_url,
+    "fetch": bench_fetch,
+    "parse_csv": bench_parse_csv,
+    "news": bench_news,
+    "store": bench_store
+}
+
+
+def _git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale_name="quick", stages=None):
+    """Run the selected stage groups (all by default) and return the results document."""
+    scale = SCALES[scale_name]
+    results = {}
+    for name in stages or STAGES:
+        print(f"⏱️  {name}...", file=sys.stderr)
+        results.update(STAGES[name](scale))
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "scale": scale_name,
+            "parameters": scale,
+            "python": platform.python_version(),
+            "platform": platform.platform()
+        },
+        "stages": results
+    }
+
+
+def compare(base, new):
+    """Print per-stage changes between two result files (negative latency change = faster)."""
+    print(f"{'stage':22} {'p50 ms':>22} {'p99 ms':>22} {'throughput':>26}")
+    for stage, result in new["stages"].items():
+        old = base["stages"].get(stage)
+        if old is None:
+            continue
+        cells = []
+        for key in ("p50_ms", "p99_ms", "throughput"):
+            change = (result[key] - old[key]) / old[key] * 100 if old[key] else float("nan")
+            cells.append(f"{old[key]:.3f} -> {result[key]:.3f} ({change:+.1f}%)")
+        print(f"{stage:22} {cells[0]:>22} {cells[1]:>22} {cells[2]:>26}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the fetch / parse / aggregate / store pipeline.")
+    parser.add_argument("--scale", choices=SCALES, default="quick")
+    parser.add_argument("--stages", help=f"Comma-separated subset of: {', '.join(STAGES)}")
+    parser.add_argument("--output", help="Result file (default benchmarks/results/<timestamp>_<commit>_<scale>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two result files")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        base, new = (json.loads(Path(path).read_text()) for path in args.compare)
+        compare(base, new)
+        return
+
+    stages = args.stages.split(",") if args.stages else None
+    unknown = set(stages or []) - set(STAGES)
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(sorted(unknown))}")
+    document = run(args.scale, stages)
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{datetime.now():%Y%m%dT%H%M%S}_{document['meta']['commit'] or 'nocommit'}_{args.scale}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    for stage, result in document["stages"].items():
+        print(f"{stage:22} p50 {result['p50_ms']:10.3f} ms  p99 {result['p99_ms']:10.3f} ms  "
+              f"{result['throughput']:>14,.0f} {result['throughput_unit']}")
+    print(f"💾 Results saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Shared building blocks for the API explorer scripts.
+Submodules are imported on first attribute access (common.store,
+common.batch, ...), so importing the package itself costs nothing and a
+short job only pays for the modules it actually uses.
+"""
+import importlib
+
+__all__ = [
+    "api_config", "batch", "cache", "errors", "http_client", "import_budget", "indicators", "jobspec",
+    "metrics", "news_archive", "news_backfill", "news_db", "news_stream", "parsing", "quota", "quotes",
+    "replay_server", "sentiment", "sentiment_incremental", "singleflight", "store", "symbol_index", "timeseries"
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -2,21 +2,46 @@
 API Configuration for multiple APIs with parameter definitions and values.
 Designed for dynamic URL construction.
 """
-import requests
-import pandas as pd
 import os
-from dotenv import load_dotenv
-from pathlib import Path
-import sys
+import re
+import threading
+from collections import namedtuple
+from collections.abc import Mapping
+from functools import lru_cache
+from urllib.parse import quote, urlencode
+
+_dotenv_loaded = False
+
+
+def get_api_key(env_var="ALPHAVANTAGE_API_KEY"):
+    """
+    Read an API key from the environment, loading .env on first use
+    (python-dotenv is only imported if the variable isn't already set).
+    """
+    global _dotenv_loaded
+    if env_var not in os.environ and not _dotenv_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _dotenv_loaded = True
+    return os.getenv(env_var)
 
-load_dotenv()
-api_key = os.getenv('ALPHAVANTAGE_API_KEY')
 
 API_CONFIGS = {
     "alpha_vantage": {
-        "base_url": "https://www.alphavantage.co/query",
+        # ALPHAVANTAGE_BASE_URL points requests elsewhere, e.g. at the local replay server
+        "base_url": os.getenv("ALPHAVANTAGE_BASE_URL", "https://www.alphavantage.co/query"),
+        # Calls allowed per API key (free tier); premium keys get set_key_quota()
+        "quotas": {
+            "per_minute": 5,
+            "per_day": 25
+        },
+        # "priority": lower numbers are scheduled first (default 5)
+        # "cache_ttl": seconds a response stays fresh in the cache (0/absent = never cached)
         "functions": {
             "NEWS_SENTIMENT": {
+                "priority": 2,
+                "cache_ttl": 300,
                 "required": ["function", "apikey"],
                 "optional": ["tickers", "topics", "time_from", "time_to", "sort", "limit", "datatype"],
                 "defaults": {
@@ -34,6 +59,8 @@ API_CONFIGS = {
                 }
             },
             "TIME_SERIES_DAILY_ADJUSTED": {
+                "priority": 3,
+                "cache_ttl": 6 * 3600,
                 "required": ["function", "symbol", "apikey"],
                 "optional": ["outputsize", "datatype"],
                 "defaults": {
@@ -43,11 +70,12 @@ API_CONFIGS = {
                 "current_values": {
                     "function": "TIME_SERIES_DAILY_ADJUSTED",
                     "symbol": "NVDA",
-                    "outputsize": "full",
                     "datatype": "csv"
                 }
             },
             "GLOBAL_QUOTE": {
+                "priority": 0,
+                "cache_ttl": 60,
                 "required": ["function", "symbol", "apikey"],
                 "optional": ["datatype"],
                 "defaults": {
@@ -58,7 +86,23 @@ API_CONFIGS = {
                     "symbol": "NVDA"
                 }
             },
+            # Premium endpoint: comma-separated symbols, up to "max_symbols" per call
+            "REALTIME_BULK_QUOTES": {
+                "priority": 0,
+                "cache_ttl": 60,
+                "max_symbols": 100,
+                "required": ["function", "symbol", "apikey"],
+                "optional": ["datatype"],
+                "defaults": {
+                    "datatype": "json"
+                },
+                "current_values": {
+                    "function": "REALTIME_BULK_QUOTES",
+                    "symbol": "NVDA,MSFT,AAPL"
+                }
+            },
             "SYMBOL_SEARCH": {
+                "cache_ttl": 7 * 86400,
                 "required": ["function", "keywords", "apikey"],
                 "optional": ["datatype"],
                 "defaults": {
@@ -68,6 +112,179 @@ API_CONFIGS = {
                     "function": "SYMBOL_SEARCH",
                     "keywords": "nvidia"
                 }
+            },
+            "TIME_SERIES_INTRADAY": {
+                "priority": 0,
+                "cache_ttl": 60,
+                "required": ["function", "symbol", "interval", "apikey"],
+                "optional": ["adjusted", "extended_hours", "month", "outputsize", "datatype"],
+                "defaults": {
+                    "outputsize": "compact",
+                    "datatype": "json"
+                },
+                "current_values": {
+                    "function": "TIME_SERIES_INTRADAY",
+                    "symbol": "NVDA",
+                    "interval": "5min"
+                }
+            },
+            **{
+                function_name: {
+                    "priority": 3,
+                    "cache_ttl": 6 * 3600 if function_name == "TIME_SERIES_DAILY" else 86400,
+                    "required": ["function", "symbol", "apikey"],
+                    "optional": ["outputsize", "datatype"],
+                    "defaults": {
+                        "outputsize": "compact",
+                        "datatype": "json"
+                    },
+                    "current_values": {
+                        "function": function_name,
+                        "symbol": "NVDA"
+                    }
+                }
+                for function_name in [
+                    "TIME_SERIES_DAILY", "TIME_SERIES_WEEKLY", "TIME_SERIES_MONTHLY",
+                    "TIME_SERIES_WEEKLY_ADJUSTED", "TIME_SERIES_MONTHLY_ADJUSTED"
+                ]
+            },
+            "LISTING_STATUS": {
+                "priority": 9,
+                "cache_ttl": 86400,
+                "response_format": "csv",
+                "required": ["function", "apikey"],
+                "optional": ["date", "state"],
+                "defaults": {},
+                "current_values": {
+                    "function": "LISTING_STATUS"
+                }
+            },
+            # Fundamental data keyed by a single symbol
+            **{
+                function_name: {
+                    "priority": 8,
+                    "cache_ttl": 7 * 86400,
+                    "required": ["function", "symbol", "apikey"],
+                    "optional": [],
+                    "defaults": {},
+                    "current_values": {
+                        "function": function_name,
+                        "symbol": "NVDA"
+                    }
+                }
+                for function_name in [
+                    "OVERVIEW", "DIVIDENDS", "SPLITS", "INCOME_STATEMENT",
+                    "BALANCE_SHEET", "CASH_FLOW", "EARNINGS"
+                ]
+            },
+            "EARNINGS_CALENDAR": {
+                "priority": 8,
+                "cache_ttl": 86400,
+                "response_format": "csv",
+                "required": ["function", "apikey"],
+                "optional": ["symbol", "horizon"],
+                "defaults": {
+                    "horizon": "3month"
+                },
+                "current_values": {
+                    "function": "EARNINGS_CALENDAR"
+                }
+            },
+            "IPO_CALENDAR": {
+                "priority": 8,
+                "cache_ttl": 86400,
+                "response_format": "csv",
+                "required": ["function", "apikey"],
+                "optional": ["horizon"],
+                "defaults": {},
+                "current_values": {
+                    "function": "IPO_CALENDAR",
+                    "horizon": "12month"
+                }
+            },
+            # Commodities and economic indicators share the interval/datatype shape
+            **{
+                function_name: {
+                    "cache_ttl": 86400,
+                    "required": ["function", "apikey"],
+                    "optional": ["interval", "datatype"],
+                    "defaults": {
+                        "interval": "monthly",
+                        "datatype": "json"
+                    },
+                    "current_values": {
+                        "function": function_name
+                    }
+                }
+                for function_name in [
+                    "WTI", "BRENT", "NATURAL_GAS", "COPPER", "ALUMINUM", "WHEAT",
+                    "CORN", "COTTON", "SUGAR", "COFFEE", "ALL_COMMODITIES",
+                    "REAL_GDP", "REAL_GDP_PER_CAPITA"
+                ]
+            },
+            # Technical indicators (also computed locally by common.indicators)
+            **{
+                function_name: {
+                    "cache_ttl": 6 * 3600,
+                    "required": ["function", "symbol", "interval", "time_period", "apikey"],
+                    "optional": ["month", "datatype"],
+                    "defaults": {
+                        "datatype": "json"
+                    },
+                    "current_values": {
+                        "function": function_name,
+                        "symbol": "NVDA",
+                        "interval": "daily",
+                        "time_period": 14
+                    }
+                }
+                for function_name in ["ADX", "WILLR", "ATR", "CCI"]
+            },
+            **{
+                function_name: {
+                    "cache_ttl": 6 * 3600,
+                    "required": ["function", "symbol", "interval", "time_period", "series_type", "apikey"],
+                    "optional": ["month", "datatype"] + (["nbdevup", "nbdevdn", "matype"]
+                                                         if function_name == "BBANDS" else []),
+                    "defaults": {
+                        "datatype": "json"
+                    },
+                    "current_values": {
+                        "function": function_name,
+                        "symbol": "NVDA",
+                        "interval": "daily",
+                        "time_period": 20 if function_name == "BBANDS" else 14,
+                        "series_type": "close"
+                    }
+                }
+                for function_name in ["SMA", "EMA", "WMA", "RSI", "MOM", "ROC", "BBANDS"]
+            },
+            "MACD": {
+                "cache_ttl": 6 * 3600,
+                "required": ["function", "symbol", "interval", "series_type", "apikey"],
+                "optional": ["month", "fastperiod", "slowperiod", "signalperiod", "datatype"],
+                "defaults": {
+                    "datatype": "json"
+                },
+                "current_values": {
+                    "function": "MACD",
+                    "symbol": "NVDA",
+                    "interval": "daily",
+                    "series_type": "close"
+                }
+            },
+            "OBV": {
+                "cache_ttl": 6 * 3600,
+                "required": ["function", "symbol", "interval", "apikey"],
+                "optional": ["month", "datatype"],
+                "defaults": {
+                    "datatype": "json"
+                },
+                "current_values": {
+                    "function": "OBV",
+                    "symbol": "NVDA",
+                    "interval": "daily"
+                }
             }
         }
     },
@@ -91,6 +308,220 @@ API_CONFIGS = {
     }
 }
 
+class ParamSet(Mapping):
+    """
+    Immutable, hashable set of query parameters.
+    Values are stored as strings and items are kept sorted by name, so equal
+    requests compare (and hash) equal regardless of how they were built.
+    """
+    __slots__ = ("_items", "_values", "_hash")
+
+    def __init__(self, params=()):
+        values = {str(key): str(value) for key, value in dict(params).items() if value is not None}
+        self._items = tuple(sorted(values.items()))
+        self._values = values
+        self._hash = hash(self._items)
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return (key for key, _ in self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, ParamSet):
+            return self._items == other._items
+        return Mapping.__eq__(self, other)
+
+    def __repr__(self):
+        return f"ParamSet({dict(self._items)!r})"
+
+    def merged(self, **overrides):
+        """New ParamSet with overrides applied (None drops a parameter)."""
+        if not overrides:
+            return self
+        values = dict(self._values)
+        values.update(overrides)
+        return ParamSet(values)
+
+    def without(self, *keys):
+        """New ParamSet with the given parameters removed."""
+        return ParamSet({key: value for key, value in self._items if key not in keys})
+
+    def query_string(self):
+        """URL-encoded query string (commas and colons left readable)."""
+        return urlencode(self._items, quote_via=quote, safe=",:")
+
+
+# Characters quote() leaves alone with safe=",:"; most keys and values are only these
+_unreserved = re.compile(r"[A-Za-z0-9_.~,:-]*").fullmatch
+
+
+def _encode_param(key, value):
+    """One "key=value" query pair, encoded as ParamSet.query_string does."""
+    key, value = str(key), str(value)
+    if not _unreserved(key):
+        key = quote(key, safe=",:")
+    if not _unreserved(value):
+        value = quote(value, safe=",:")
+    return f"{key}={value}"
+
+
+# Symbols, dates and keys repeat across calls, so encoded pairs are memoized
+_encode_param_cached = lru_cache(maxsize=65536)(_encode_param)
+
+
+class RequestPlan(namedtuple("RequestPlan", ["api_name", "function_name", "base_url", "base_params",
+                                             "required", "missing", "response_format", "priority",
+                                             "cache_ttl", "base_query"])):
+    """
+    Compiled, immutable request template for one API function.
+    Defaults and current values are merged, validated and URL-encoded once
+    when the plan is compiled; each call only encodes its overrides and
+    checks the required parameters the plan couldn't fill itself (or that
+    an override set to None).
+    """
+    __slots__ = ()
+
+    def _check_required(self, override_params):
+        missing_required = [param for param in self.required
+                            if (override_params[param] is None if param in override_params
+                                else param in self.missing)]
+        if missing_required:
+            raise ValueError(f"Missing required parameters: {missing_required}")
+
+    def _join(self, override_params):
+        parts = [pair for key, pair in self.base_query if key not in override_params]
+        for key, value in override_params.items():
+            if value is not None:
+                try:
+                    parts.append(_encode_param_cached(key, value))
+                except TypeError:  # unhashable value
+                    parts.append(_encode_param(key, value))
+        return f"{self.base_url}?{'&'.join(parts)}"
+
+    def params(self, api_key, **override_params):
+        """
+        ParamSet for one call.
+
+        Raises:
+            ValueError: If a required parameter is missing or overridden with None
+        """
+        override_params["apikey"] = api_key
+        self._check_required(override_params)
+        return self.base_params.merged(**override_params)
+
+    def url(self, api_key, **override_params):
+        """
+        Complete URL for one call: the pre-encoded base pairs that aren't
+        overridden, then the overrides and the API key.
+
+        Raises:
+            ValueError: If a required parameter is missing or overridden with None
+        """
+        override_params["apikey"] = api_key
+        self._check_required(override_params)
+        return self._join(override_params)
+
+    def request(self, api_key, **override_params):
+        """
+        (params, url) for one call, validated once; the URL is joined from
+        the pre-encoded base pairs as in url().
+
+        Raises:
+            ValueError: If a required parameter is missing or overridden with None
+        """
+        override_params["apikey"] = api_key
+        self._check_required(override_params)
+        return self.base_params.merged(**override_params), self._join(override_params)
+
+    def format_for(self, params):
+        """"csv" or "json": the datatype parameter if present, else the configured format."""
+        return params.get("datatype", self.response_format)
+
+
+def compile_plan(api_name, function_name, api_config=None):
+    """
+    Validate one function's config and compile it into a RequestPlan.
+
+    Raises:
+        ValueError: If the config is malformed (unknown parameters or
+            missing required/optional/defaults/current_values entries)
+    """
+    api_config = api_config or API_CONFIGS[api_name]
+    func_config = api_config["functions"][function_name]
+    for section in ("required", "optional", "defaults", "current_values"):
+        if section not in func_config:
+            raise ValueError(f"{api_name}.{function_name} config is missing '{section}'")
+
+    known = set(func_config["required"]) | set(func_config["optional"])
+    values = {**func_config["defaults"], **func_config["current_values"]}
+    unknown = sorted(set(values) - known)
+    if unknown:
+        raise ValueError(f"{api_name}.{function_name} sets unknown parameters: {unknown}")
+
+    base_params = ParamSet(values)
+    return RequestPlan(
+        api_name=api_name,
+        function_name=function_name,
+        base_url=api_config["base_url"],
+        base_params=base_params,
+        required=tuple(func_config["required"]),
+        missing=tuple(param for param in func_config["required"] if param not in base_params),
+        response_format=func_config.get("response_format", "json"),
+        priority=func_config.get("priority"),
+        cache_ttl=func_config.get("cache_ttl", 0),
+        base_query=tuple((key, _encode_param(key, value)) for key, value in base_params.items())
+    )
+
+
+def compile_plans(configs=API_CONFIGS):
+    """Compile every configured function: {(api_name, function_name): RequestPlan}."""
+    return {(api_name, function_name): compile_plan(api_name, function_name, api_config)
+            for api_name, api_config in configs.items()
+            for function_name in api_config["functions"]}
+
+
+_PLANS = compile_plans()
+_plans_lock = threading.Lock()
+
+
+def get_plan(api_name, function_name):
+    """Compiled plan for a function."""
+    try:
+        return _PLANS[(api_name, function_name)]
+    except KeyError:
+        if api_name not in API_CONFIGS:
+            raise ValueError(f"Unknown API: {api_name}") from None
+        raise ValueError(f"Unknown function: {function_name} for API: {api_name}") from None
+
+def build_params(api_name, function_name, api_key, **override_params):
+    """
+    Merge the compiled defaults/current values, API key and overrides.
+    
+    Args:
+        api_name: e.g., "alpha_vantage"
+        function_name: e.g., "NEWS_SENTIMENT"
+        api_key: API key to use
+        **override_params: Any parameters to override current_values (None drops one)
+    
+    Returns:
+        ParamSet of query parameters, validated against the required list
+    """
+    return get_plan(api_name, function_name).params(api_key, **override_params)
+
+def format_url(api_name, params):
+    """Join a parameter set onto the API's base URL, URL-encoded."""
+    if not isinstance(params, ParamSet):
+        params = ParamSet(params)
+    return f"{API_CONFIGS[api_name]['base_url']}?{params.query_string()}"
+
 def build_url(api_name, function_name, api_key, **override_params):
     """
     Build API URL using configuration and current values.
@@ -104,56 +535,54 @@ def build_url(api_name, function_name, api_key, **override_params):
     Returns:
         Complete URL string ready for requests
     """
-    if api_name not in API_CONFIGS:
-        raise ValueError(f"Unknown API: {api_name}")
-    
-    api_config = API_CONFIGS[api_name]
-    
-    if function_name not in api_config["functions"]:
-        raise ValueError(f"Unknown function: {function_name} for API: {api_name}")
-    
-    func_config = api_config["functions"][function_name]
-    
-    # Start with defaults
-    params = func_config["defaults"].copy()
-    
-    # Add current values
-    params.update(func_config["current_values"])
-    
-    # Add API key
-    params["apikey"] = api_key
-    
-    # Override with any provided parameters
-    params.update(override_params)
-    
-    # Validate required parameters
-    missing_required = []
-    for req_param in func_config["required"]:
-        if req_param not in params:
-            missing_required.append(req_param)
-    
-    if missing_required:
-        raise ValueError(f"Missing required parameters: {missing_required}")
-    
-    # Build URL
-    base_url = api_config["base_url"]
-    param_string = "&".join([f"{key}={value}" for key, value in params.items()])
+    return get_plan(api_name, function_name).url(api_key, **override_params)
+
+def get_response_format(api_name, function_name, params):
+    """
+    Work out whether a request will come back as "csv" or "json".
     
-    return f"{base_url}?{param_string}"
+    Functions with a datatype parameter follow it; the rest declare a
+    fixed "response_format" in their config (json when omitted).
+    """
+    return get_plan(api_name, function_name).format_for(params)
 
 def update_current_values(api_name, function_name, **new_values):
     """
     Update the current_values for a specific API function.
+    The config entry and its plan are replaced, never modified in place,
+    so calls already holding the old plan are unaffected.
     
     Args:
         api_name: e.g., "alpha_vantage"
         function_name: e.g., "NEWS_SENTIMENT"
         **new_values: Parameters to update
     """
-    if api_name in API_CONFIGS and function_name in API_CONFIGS[api_name]["functions"]:
-        API_CONFIGS[api_name]["functions"][function_name]["current_values"].update(new_values)
-    else:
-        raise ValueError(f"Invalid API ({api_name}) or function ({function_name})")
+    get_plan(api_name, function_name)
+    with _plans_lock:
+        functions = API_CONFIGS[api_name]["functions"]
+        func_config = dict(functions[function_name])
+        func_config["current_values"] = {**func_config["current_values"], **new_values}
+        plan = compile_plan(api_name, function_name,
+                            {**API_CONFIGS[api_name], "functions": {function_name: func_config}})
+        functions[function_name] = func_config
+        _PLANS[(api_name, function_name)] = plan
+
+def set_base_url(api_name, base_url):
+    """
+    Point every function of an API at another base URL (e.g. a replay server).
+    Plans are recompiled and swapped in as in update_current_values.
+    
+    Returns:
+        The previous base URL
+    """
+    if api_name not in API_CONFIGS:
+        raise ValueError(f"Unknown API: {api_name}")
+    with _plans_lock:
+        previous = API_CONFIGS[api_name]["base_url"]
+        API_CONFIGS[api_name]["base_url"] = base_url
+        for function_name in API_CONFIGS[api_name]["functions"]:
+            _PLANS[(api_name, function_name)] = compile_plan(api_name, function_name)
+    return previous
 
 def get_current_values(api_name, function_name):
     """Get current parameter values for a function."""
@@ -167,7 +596,7 @@ if __name__ == "__main__":
                          tickers="NVDA,MSFT,GOOGL")
     
     # Build URL
-    api_key = api_key
+    api_key = get_api_key()
     url = build_url("alpha_vantage", "NEWS_SENTIMENT", api_key)
     print(f"Generated URL: {url}")
     
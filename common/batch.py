@@ -0,0 +1,129 @@
+"""
+Asyncio fan-out engine for batches of API calls.
+Runs (function, params) jobs concurrently with a bounded number of requests
+in flight and streams results back as they complete. Every call still goes
+through fetch_function, so the shared connection pool and quota scheduler
+apply to the whole batch. Duplicate jobs in flight at the same time are
+coalesced: one task fetches and the others await its result without
+holding a worker thread.
+"""
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from common.api_config import build_params
+from common.cache import cache_key
+from common.http_client import CLIENT_CONFIG, fetch_function
+from common.singleflight import get_singleflight
+
+Job = namedtuple("Job", ["function_name", "params", "priority"], defaults=[None])
+Job.__doc__ = "One API call: a configured function name plus override params."
+
+BatchResult = namedtuple("BatchResult", ["job", "response", "error"])
+BatchResult.__doc__ = "Outcome of a Job: the ApiResponse, or the exception it raised."
+
+
+def make_jobs(function_names, symbols, **params):
+    """
+    Build the symbol x function cross product as a list of jobs.
+
+    Args:
+        function_names: A function name or list of names, e.g. "TIME_SERIES_DAILY_ADJUSTED"
+        symbols: Iterable of symbols
+        **params: Extra parameters applied to every job
+
+    Returns:
+        List of Job
+    """
+    if isinstance(function_names, str):
+        function_names = [function_names]
+    return [Job(function_name, {**params, "symbol": symbol})
+            for function_name in function_names
+            for symbol in symbols]
+
+
+async def iter_batch(jobs, api_key, api_name="alpha_vantage", max_in_flight=None):
+    """
+    Run jobs concurrently and yield a BatchResult for each as it completes.
+
+    Args:
+        jobs: Iterable of Job (or (function_name, params) tuples); consumed lazily
+        api_key: API key used for every call
+        api_name: e.g., "alpha_vantage"
+        max_in_flight: Concurrent requests (defaults to the client's pool size)
+
+    Yields:
+        BatchResult in completion order; failures are returned, not raised.
+        At most max_in_flight finished results wait for the consumer; the
+        workers don't start new calls until it catches up.
+    """
+    if max_in_flight is None:
+        max_in_flight = CLIENT_CONFIG["pool_maxsize"]
+    if max_in_flight < 1:
+        raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+
+    executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="batch")
+    job_iter = iter(jobs)
+    results = asyncio.Queue(maxsize=max_in_flight)
+    singleflight = get_singleflight()
+
+    def call(job):
+        # Coalescing already happened on the event loop side
+        return fetch_function(api_name, job.function_name, api_key,
+                              priority=job.priority, coalesce=False, **job.params)
+
+    async def worker():
+        for job in job_iter:
+            job = Job(*job)
+            try:
+                key = cache_key(api_name, build_params(api_name, job.function_name, api_key, **job.params))
+                result = BatchResult(job, await singleflight.run_async(key, partial(call, job), executor), None)
+            except Exception as error:
+                result = BatchResult(job, None, error)
+            await results.put(result)
+        # None marks a finished worker
+        await results.put(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max_in_flight)]
+    finished = 0
+    try:
+        while finished < len(workers):
+            result = await results.get()
+            if result is None:
+                finished += 1
+            else:
+                yield result
+    finally:
+        for task in workers:
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def stream_batch(jobs, api_key, api_name="alpha_vantage", max_in_flight=None):
+    """
+    Blocking generator over iter_batch. The batch only advances while the
+    caller waits for the next result, so about max_in_flight responses are
+    held at a time, where run_batch keeps every response until the end.
+    """
+    loop = asyncio.new_event_loop()
+    results = iter_batch(jobs, api_key, api_name, max_in_flight)
+    try:
+        while True:
+            try:
+                result = loop.run_until_complete(anext(results))
+            except StopAsyncIteration:
+                return
+            yield result
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.close()
+
+
+def run_batch(jobs, api_key, api_name="alpha_vantage", max_in_flight=None):
+    """
+    Blocking helper: run a batch and return all results in completion order.
+    """
+    async def collect():
+        return [result async for result in iter_batch(jobs, api_key, api_name, max_in_flight)]
+    return asyncio.run(collect())
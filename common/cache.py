@@ -0,0 +1,202 @@
+"""
+Persistent response cache.
+Responses are stored on disk (SQLite) keyed by the canonical parameter set
+without the API key, expire after a per-function TTL from the compiled request plans, and
+are evicted least-recently-used once the cache grows past its size cap.
+A small in-memory LRU tier in front serves hot keys without touching disk;
+their access times are written back in batches so disk eviction stays LRU.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from common.api_config import ParamSet, get_plan
+
+CACHE_CONFIG = {
+    "directory": os.getenv("API_EXPLORER_CACHE_DIR", str(Path(__file__).resolve().parent.parent / ".cache")),
+    "max_bytes": 512 * 1024 * 1024,      # disk cap before LRU eviction
+    "memory_items": 256,                 # entries kept in the in-memory tier
+    "memory_max_item_bytes": 4 * 1024 * 1024,  # larger bodies skip the memory tier
+    "touch_batch": 64                    # memory hits buffered before accessed_at is written
+}
+
+
+def cache_key(api_name, params):
+    """
+    Canonical cache key for a request: parameters sorted by name with the
+    API key removed, so the same request from any key shares one entry.
+    """
+    if not isinstance(params, ParamSet):
+        params = ParamSet(params)
+    return api_name + "?" + params.without("apikey").query_string()
+
+
+def get_cache_ttl(api_name, function_name):
+    """TTL in seconds configured for a function (0 means never cache)."""
+    return get_plan(api_name, function_name).cache_ttl
+
+
+class ResponseCache:
+    """
+    Two-tier LRU cache of raw response bodies.
+
+    Args:
+        directory: Folder holding the SQLite cache file
+        max_bytes: Disk size cap; least recently used entries are evicted past it
+        memory_items: Number of entries kept in the in-memory tier
+        memory_max_item_bytes: Bodies larger than this are only kept on disk
+        touch_batch: Memory-tier hits buffered before their access times are
+            written to disk (always flushed before eviction and on close)
+    """
+
+    def __init__(self, directory, max_bytes, memory_items, memory_max_item_bytes, touch_batch=64):
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        self.path = Path(directory) / "responses.sqlite"
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.memory_max_item_bytes = memory_max_item_bytes
+        self.touch_batch = touch_batch
+        self._memory = OrderedDict()
+        self._touched = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, function TEXT, stored_at REAL, accessed_at REAL,"
+            " size INTEGER, content BLOB)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key, ttl):
+        """
+        Return the cached body for key if it is younger than ttl seconds, else None.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, content = entry
+                if now - stored_at < ttl:
+                    self._memory.move_to_end(key)
+                    self._touched[key] = now
+                    if len(self._touched) >= self.touch_batch:
+                        self._flush_touches()
+                    return content
+                del self._memory[key]
+
+            row = self._db.execute("SELECT stored_at, content FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            stored_at, content = row
+            if now - stored_at >= ttl:
+                self._delete(key)
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._remember(key, stored_at, content)
+            return content
+
+    def put(self, key, function_name, content):
+        """Store a response body and evict old entries if over the size cap."""
+        now = time.time()
+        with self._lock:
+            self._delete(key)
+            self._db.execute(
+                "INSERT INTO responses (key, function, stored_at, accessed_at, size, content) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, function_name, now, now, len(content), content)
+            )
+            self._total_bytes += len(content)
+            self._remember(key, now, content)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def discard(self, key):
+        """Drop one cached response, e.g. an error body stored before it was recognized."""
+        with self._lock:
+            self._delete(key)
+
+    def clear(self):
+        """Drop every cached response."""
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            self._db.execute("DELETE FROM responses")
+            self._total_bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._flush_touches()
+            self._db.close()
+
+    def _remember(self, key, stored_at, content):
+        if len(content) > self.memory_max_item_bytes or self.memory_items <= 0:
+            return
+        self._memory[key] = (stored_at, content)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _flush_touches(self):
+        if self._touched:
+            self._db.executemany("UPDATE responses SET accessed_at = ? WHERE key = ?",
+                                 [(accessed_at, key) for key, accessed_at in self._touched.items()])
+            self._touched.clear()
+
+    def _delete(self, key):
+        self._memory.pop(key, None)
+        self._touched.pop(key, None)
+        row = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= row[0]
+
+    def _evict(self):
+        # Trim to 90% of the cap so eviction doesn't run on every put
+        target = self.max_bytes * 0.9
+        self._flush_touches()
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            self._memory.pop(key, None)
+            self._touched.pop(key, None)
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def configure_cache(**settings):
+    """
+    Update cache settings. The cache is reopened on next use.
+
+    Args:
+        **settings: Any keys of CACHE_CONFIG, e.g. max_bytes=2**30
+    """
+    global _cache
+    unknown = [key for key in settings if key not in CACHE_CONFIG]
+    if unknown:
+        raise ValueError(f"Unknown cache settings: {unknown}")
+
+    with _cache_lock:
+        CACHE_CONFIG.update(settings)
+        if _cache is not None:
+            _cache.close()
+            _cache = None
+
+
+def get_cache():
+    """Return the process-wide response cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(**CACHE_CONFIG)
+    return _cache
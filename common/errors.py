@@ -0,0 +1,100 @@
+"""
+Typed errors for API "soft failures".
+Alpha Vantage answers throttled, premium-only and malformed requests with
+HTTP 200 and a small JSON body ({"Note": ...}, {"Information": ...} or
+{"Error Message": ...}), even when CSV was requested. classify() turns such
+a body into an exception so callers get data or an error, never the
+message parsed as data.
+"""
+import json
+from datetime import datetime, timedelta, timezone
+
+# Soft-failure bodies are a few hundred bytes; anything bigger is data
+MAX_MESSAGE_BYTES = 4096
+
+MESSAGE_FIELDS = ["Error Message", "Note", "Information"]
+
+RATE_LIMIT_MARKERS = ["rate limit", "call frequency", "requests per", "request per", "more sparingly"]
+
+
+class ApiError(Exception):
+    """A well-formed API answer that carries a message instead of data."""
+
+    def __init__(self, message, function_name=None, field=None):
+        super().__init__(f"{function_name}: {message}" if function_name else message)
+        self.message = message
+        self.function_name = function_name
+        self.field = field
+
+
+class RateLimitError(ApiError):
+    """
+    Throttled by the provider.
+
+    Attributes:
+        window: "second", "minute" or "day", the quota window that ran out
+        retry_after: Seconds until that window is expected to reset
+    """
+
+    def __init__(self, message, function_name=None, field=None, window="minute", retry_after=60.0):
+        super().__init__(message, function_name, field)
+        self.window = window
+        self.retry_after = retry_after
+
+
+class PremiumError(ApiError):
+    """The function (or parameter) needs a premium key; retrying won't help."""
+
+
+class InvalidRequestError(ApiError):
+    """The API rejected the request parameters ("Error Message")."""
+
+
+def seconds_until_daily_reset(now=None):
+    """Seconds until the next UTC midnight, when daily quotas are assumed to reset."""
+    now = now or datetime.now(timezone.utc)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+def classify(content, function_name=None):
+    """
+    Classify a response body.
+
+    Args:
+        content: Raw response bytes
+        function_name: Used in the error message
+
+    Returns:
+        An ApiError subclass instance for a soft failure, None for data
+    """
+    if len(content) > MAX_MESSAGE_BYTES or not content.lstrip()[:1] == b"{":
+        return None
+    try:
+        payload = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    field = next((name for name in MESSAGE_FIELDS if name in payload), None)
+    # A real payload may carry an informational field next to its data
+    if field is None or len(payload) > 1:
+        return None
+
+    message = str(payload[field])
+    lowered = message.lower()
+    if field == "Error Message":
+        return InvalidRequestError(message, function_name, field)
+    if any(marker in lowered for marker in RATE_LIMIT_MARKERS):
+        if "per second" in lowered:
+            return RateLimitError(message, function_name, field, "second", 1.0)
+        # The standard throttle Note names both limits ("5 calls per minute and
+        # 500 calls per day"); only a message without a minute limit is daily
+        if "per minute" in lowered or "call frequency" in lowered:
+            return RateLimitError(message, function_name, field, "minute", 60.0)
+        if "per day" in lowered:
+            return RateLimitError(message, function_name, field, "day", seconds_until_daily_reset())
+        return RateLimitError(message, function_name, field, "minute", 60.0)
+    if "premium" in lowered:
+        return PremiumError(message, function_name, field)
+    return ApiError(message, function_name, field)
@@ -0,0 +1,317 @@
+"""
+Shared HTTP client for all API calls.
+Keeps a single keep-alive session with a connection pool per process so that
+repeated calls reuse TCP/TLS connections instead of handshaking every time.
+requests is imported when the session is first built, not at import.
+Soft failures (HTTP 200 with a "Note" / "Information" / "Error Message"
+body) are raised as common.errors types; rate limits are retried after the
+quota window, and error bodies are never cached.
+"""
+import random
+import threading
+import time
+from pathlib import Path
+
+from common.api_config import build_url, get_plan
+from common.cache import cache_key, get_cache
+from common.errors import RateLimitError, classify
+from common.metrics import connection_timings, get_registry, request_labels, take_connect_time
+from common.parsing import parse_content
+from common.quota import get_scheduler
+from common.singleflight import get_singleflight
+
+CLIENT_CONFIG = {
+    "pool_connections": 4,     # number of hosts to keep pools for
+    "pool_maxsize": 32,        # connections kept alive per host
+    "pool_block": True,        # wait for a free connection instead of opening extras
+    "max_retries": 2,          # retries on connection errors only
+    "soft_retries": 3,         # retries after a rate-limit "Note" / "Information" body
+    "retry_jitter": 0.25,      # up to +25% random extra on each retry delay
+    "max_retry_delay": 300,    # raise instead of waiting longer than this (a spent daily limit fails fast)
+    "connect_timeout": 5,
+    "read_timeout": 60,
+    "headers": {
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+        "User-Agent": "api-explorer/0.1.0"
+    }
+}
+
+_session = None
+_session_lock = threading.Lock()
+_timed_pools = None
+
+
+def _timed_pool_classes():
+    """urllib3 pool classes whose new connections record their connect time."""
+    global _timed_pools
+    if _timed_pools is None:
+        from urllib3.connection import HTTPConnection, HTTPSConnection
+        from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+        def timed(connection_class):
+            class TimedConnection(connection_class):
+                def connect(self):
+                    start = time.perf_counter()
+                    super().connect()
+                    connection_timings.connect = time.perf_counter() - start
+            return TimedConnection
+
+        class TimedHTTPConnectionPool(HTTPConnectionPool):
+            ConnectionCls = timed(HTTPConnection)
+
+        class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+            ConnectionCls = timed(HTTPSConnection)
+
+        _timed_pools = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+    return _timed_pools
+
+
+
+def configure_client(**settings):
+    """
+    Update client settings. The pooled session is rebuilt on next use.
+
+    Args:
+        **settings: Any keys of CLIENT_CONFIG, e.g. pool_maxsize=64, read_timeout=30
+    """
+    unknown = [key for key in settings if key not in CLIENT_CONFIG]
+    if unknown:
+        raise ValueError(f"Unknown client settings: {unknown}")
+
+    CLIENT_CONFIG.update(settings)
+    close_client()
+
+
+def get_session():
+    """Return the shared pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=CLIENT_CONFIG["pool_connections"],
+                    pool_maxsize=CLIENT_CONFIG["pool_maxsize"],
+                    pool_block=CLIENT_CONFIG["pool_block"],
+                    max_retries=CLIENT_CONFIG["max_retries"]
+                )
+                adapter.poolmanager.pool_classes_by_scheme = _timed_pool_classes()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(CLIENT_CONFIG["headers"])
+                _session = session
+    return _session
+
+
+def close_client():
+    """Close the shared session and release its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get(url, **kwargs):
+    """
+    Issue a GET through the shared session.
+
+    Args:
+        url: Fully built request URL
+        **kwargs: Passed through to requests (e.g. stream=True)
+
+    Returns:
+        requests.Response with a successful status code
+    """
+    kwargs.setdefault("timeout", (CLIENT_CONFIG["connect_timeout"], CLIENT_CONFIG["read_timeout"]))
+    response = get_session().get(url, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+def get_function(api_name, function_name, api_key, **override_params):
+    """
+    Build the URL for a configured API function and fetch it.
+
+    Args:
+        api_name: e.g., "alpha_vantage"
+        function_name: e.g., "TIME_SERIES_DAILY"
+        api_key: API key to use
+        **override_params: Any parameters to override current_values
+
+    Returns:
+        requests.Response
+    """
+    url = build_url(api_name, function_name, api_key, **override_params)
+    return get(url)
+
+
+class ApiResponse:
+    """
+    A response body downloaded exactly once.
+    The raw bytes stay available for archiving; parse() hands the same bytes
+    to the CSV or JSON parser without copying them into text.
+    """
+    __slots__ = ("api_name", "function_name", "params", "url", "content", "response_format",
+                 "from_cache", "_parsed")
+
+    def __init__(self, api_name, function_name, params, url, content, response_format, from_cache=False):
+        self.api_name = api_name
+        self.function_name = function_name
+        self.params = params
+        self.url = url
+        self.content = content
+        self.response_format = response_format
+        self.from_cache = from_cache
+        self._parsed = None
+
+    def parse(self):
+        """Return the parsed body (DataFrame for csv, dict for json), parsing once."""
+        if self._parsed is None:
+            start = time.perf_counter()
+            self._parsed = parse_content(self.content, self.response_format, self.function_name)
+            labels = request_labels(self.function_name, self.params)
+            if labels is not None:
+                get_registry().observe("api_parse_seconds", time.perf_counter() - start, **labels)
+        return self._parsed
+
+    def save(self, path):
+        """Write the raw response bytes to path, creating parent folders."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(self.content)
+        return path
+
+
+def fetch(url, labels=None):
+    """
+    Download a response body once and return its bytes.
+    With labels, records connect, time-to-first-byte, download time and size.
+    """
+    if labels is None:
+        return get(url).content
+    registry = get_registry()
+    take_connect_time()
+    start = time.perf_counter()
+    response = get(url, stream=True)
+    headers_at = time.perf_counter()
+    content = response.content
+    done = time.perf_counter()
+
+    connect = take_connect_time()
+    if connect is not None:
+        registry.inc("api_connections_opened_total", **labels)
+        registry.observe("api_connect_seconds", connect, **labels)
+    registry.observe("api_ttfb_seconds", headers_at - start, **labels)
+    registry.observe("api_download_seconds", done - headers_at, **labels)
+    registry.observe("api_response_bytes", len(content), **labels)
+    return content
+
+
+def retry_delay(error, attempt):
+    """
+    Seconds to hold the key before retrying a soft failure, or None to give up.
+    Rate limits wait for their quota window, doubling per attempt, with jitter.
+    """
+    if not isinstance(error, RateLimitError) or attempt >= CLIENT_CONFIG["soft_retries"]:
+        return None
+    delay = error.retry_after * (1 if error.window == "day" else 2 ** attempt)
+    delay *= 1 + random.uniform(0, CLIENT_CONFIG["retry_jitter"])
+    if delay > CLIENT_CONFIG["max_retry_delay"]:
+        return None
+    return delay
+
+
+def fetch_function(api_name, function_name, api_key, priority=None, use_cache=True, coalesce=True,
+                   **override_params):
+    """
+    Fetch a configured API function once and wrap the body for parsing.
+    Fresh cached responses are returned without a network call; otherwise
+    waits for quota budget from the shared scheduler before calling out.
+    Identical requests already in flight (same parameters, any API key)
+    are joined instead of repeated, and every caller gets the same response.
+
+    Args:
+        api_name: e.g., "alpha_vantage"
+        function_name: e.g., "LISTING_STATUS"
+        api_key: API key to use
+        priority: Overrides the function's configured scheduling priority
+        use_cache: Set False to bypass the response cache for this call
+        coalesce: Set False to always make this call, even if an identical one is in flight
+        **override_params: Any parameters to override current_values
+
+    Returns:
+        ApiResponse
+
+    Raises:
+        common.errors.ApiError: The API answered with a message instead of
+            data (RateLimitError once retries are used up, PremiumError,
+            InvalidRequestError)
+    """
+    plan = get_plan(api_name, function_name)
+    params, url = plan.request(api_key, **override_params)
+    response_format = plan.format_for(params)
+    key = cache_key(api_name, params)
+
+    registry = get_registry()
+    labels = request_labels(function_name, params)
+    ttl = plan.cache_ttl if use_cache else 0
+    if ttl:
+        content = get_cache().get(key, ttl)
+        if content is not None and classify(content) is None:
+            if labels is not None:
+                registry.inc("api_cache_hits_total", **labels)
+                registry.inc("api_requests_total", source="cache", **labels)
+            return ApiResponse(api_name, function_name, params, url, content, response_format, from_cache=True)
+        if content is not None:
+            get_cache().discard(key)
+        if labels is not None:
+            registry.inc("api_cache_misses_total", **labels)
+
+    def call():
+        scheduler = get_scheduler()
+        attempt = 0
+        while True:
+            waited = time.perf_counter()
+            scheduler.acquire(api_name, function_name, api_key, priority=priority)
+            if labels is not None:
+                registry.observe("api_quota_wait_seconds", time.perf_counter() - waited, **labels)
+            try:
+                content = fetch(url, labels)
+            except Exception as error:
+                if labels is not None:
+                    registry.inc("api_errors_total", type=type(error).__name__, **labels)
+                raise
+            error = classify(content, function_name)
+            if error is None:
+                break
+            if labels is not None:
+                registry.inc("api_errors_total", type=type(error).__name__, **labels)
+            delay = retry_delay(error, attempt)
+            if isinstance(error, RateLimitError):
+                if delay is None and error.window == "day":
+                    # Spent for the day: hold the key until the reset and fail
+                    # queued calls on it at once rather than re-probing it
+                    scheduler.penalize(api_name, api_key, error.retry_after, fail_fast=True)
+                else:
+                    # Other calls on this key wait too (at most max_retry_delay when giving up)
+                    hold = delay or min(error.retry_after, CLIENT_CONFIG["max_retry_delay"])
+                    scheduler.penalize(api_name, api_key, hold)
+            if delay is None:
+                raise error
+            attempt += 1
+            if labels is not None:
+                registry.inc("api_retries_total", **labels)
+        if labels is not None:
+            registry.inc("api_requests_total", source="network", **labels)
+        if ttl:
+            get_cache().put(key, function_name, content)
+        return ApiResponse(api_name, function_name, params, url, content, response_format)
+
+    if not coalesce:
+        return call()
+    return get_singleflight().run(key, call)
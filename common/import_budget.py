@@ -0,0 +1,84 @@
+"""
+Import-time budget check.
+Imports each module in a fresh interpreter under `python -X importtime`
+and fails if it takes longer than its budget or drags in a heavy
+dependency (pandas, requests, ...) that should only load on first use.
+
+Usage:
+    python -m common.import_budget
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+# Cumulative import time allowed per module, in milliseconds
+BUDGETS = {
+    "common": 5,
+    "common.api_config": 50,
+    "common.cache": 40,
+    "common.quota": 40,
+    "common.http_client": 80,
+    "common.batch": 150,
+    "common.jobspec": 160,
+    "main": 170
+}
+
+# Packages that must not be imported just by importing the modules above
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "requests", "urllib3", "dotenv", "yaml"]
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def measure(module, runs=3):
+    """
+    Time importing `module` in a fresh interpreter.
+
+    Returns:
+        (best cumulative import time in ms over `runs`, set of modules imported)
+    """
+    best, imported = None, set()
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+        total = None
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            name = name.strip()
+            imported.add(name)
+            if name == module:
+                total = int(cumulative) / 1000
+        if total is not None and (best is None or total < best):
+            best = total
+    return best, imported
+
+
+def check(budgets=BUDGETS, heavy_modules=HEAVY_MODULES, runs=3):
+    """
+    Measure every budgeted module.
+
+    Returns:
+        List of failure messages (empty when everything is within budget)
+    """
+    failures = []
+    for module, budget in budgets.items():
+        elapsed, imported = measure(module, runs)
+        heavy = sorted(name for name in heavy_modules if name in imported)
+        status = "ok" if elapsed <= budget and not heavy else "FAIL"
+        print(f"{status:4} {module:24} {elapsed:7.1f} ms (budget {budget} ms)"
+              + (f"  imports {', '.join(heavy)}" if heavy else ""))
+        if elapsed > budget:
+            failures.append(f"{module} took {elapsed:.1f} ms (budget {budget} ms)")
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)}")
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check()
+    if failures:
+        print("\n".join(failures), file=sys.stderr)
+        sys.exit(1)
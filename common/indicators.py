@@ -0,0 +1,370 @@
+"""
+Local technical indicators.
+Computes the Alpha Vantage indicator functions with NumPy over stored daily
+prices, instead of one API call per (indicator, symbol, period). Inputs are
+date x symbol panels (oldest row first), so a whole universe is computed in
+one pass. Each symbol's missing bars are skipped, so every column matches
+what the API returns for that symbol's own series. Warm-up rows are NaN.
+
+Formulas follow TA-Lib, which the API uses. Recursive indicators (EMA, RSI,
+ATR, ADX, MACD) depend on where the history starts, so load the full series
+before comparing. spot_check() compares a symbol against the API.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from common import store
+
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+# Panel plumbing: each column is packed so its valid bars start at row 0 and
+# run without gaps, computed on, then scattered back to its original rows.
+
+def _panel(fn):
+    def wrapper(*inputs, **params):
+        frame = next((x for x in inputs if isinstance(x, pd.DataFrame)), None)
+        arrays = [np.asarray(x, dtype=np.float64) for x in inputs]
+        one_d = arrays[0].ndim == 1
+        if one_d:
+            arrays = [x[:, None] for x in arrays]
+
+        valid = np.logical_and.reduce([np.isfinite(x) for x in arrays])
+        order = np.argsort(~valid, axis=0, kind="stable")
+        filled = np.arange(valid.shape[0])[:, None] < valid.sum(axis=0)
+        packed = [np.where(filled, np.take_along_axis(x, order, axis=0), np.nan) for x in arrays]
+
+        outputs = fn(*packed, **params)
+        single = not isinstance(outputs, tuple)
+        results = []
+        for output in ([outputs] if single else outputs):
+            result = np.empty_like(output)
+            np.put_along_axis(result, order, np.where(filled, output, np.nan), axis=0)
+            if one_d:
+                result = result[:, 0]
+            elif frame is not None:
+                result = pd.DataFrame(result, index=frame.index, columns=frame.columns)
+            results.append(result)
+        return results[0] if single else tuple(results)
+
+    wrapper.__name__, wrapper.__doc__ = fn.__name__, fn.__doc__
+    return wrapper
+
+
+def _nan_like(x):
+    return np.full(x.shape, np.nan)
+
+
+def _windows(x, n):
+    """Trailing windows of n rows: shape (rows - n + 1, symbols, n)."""
+    return sliding_window_view(x, n, axis=0)
+
+
+def _sma(x, n):
+    out = _nan_like(x)
+    if len(x) >= n:
+        out[n - 1:] = _windows(x, n).mean(axis=-1)
+    return out
+
+
+def _ema(x, n, start=None):
+    """EMA seeded with the SMA of the n rows ending at start (default n - 1)."""
+    start = n - 1 if start is None else start
+    out = _nan_like(x)
+    if len(x) <= start:
+        return out
+    k = 2.0 / (n + 1)
+    out[start] = x[start - n + 1:start + 1].mean(axis=0)
+    for t in range(start + 1, len(x)):
+        out[t] = out[t - 1] + k * (x[t] - out[t - 1])
+    return out
+
+
+def _wilder(x, n, start):
+    """Wilder's smoothing seeded with the mean of the n rows ending at start."""
+    out = _nan_like(x)
+    if len(x) <= start:
+        return out
+    out[start] = x[start - n + 1:start + 1].mean(axis=0)
+    for t in range(start + 1, len(x)):
+        out[t] = (out[t - 1] * (n - 1) + x[t]) / n
+    return out
+
+
+def _wma(x, n):
+    out = _nan_like(x)
+    if len(x) >= n:
+        weights = np.arange(1, n + 1, dtype=np.float64)
+        out[n - 1:] = _windows(x, n) @ weights / weights.sum()
+    return out
+
+
+def _true_range(high, low, close):
+    tr = _nan_like(close)
+    previous = close[:-1]
+    tr[1:] = np.maximum.reduce([high[1:] - low[1:], np.abs(high[1:] - previous), np.abs(low[1:] - previous)])
+    return tr
+
+
+def _ratio(numerator, denominator, scale=1.0):
+    """numerator / denominator * scale, 0 where the denominator is 0 (as TA-Lib does)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator == 0, np.where(np.isnan(denominator), np.nan, 0.0),
+                        numerator / denominator * scale)
+
+
+@_panel
+def sma(x, time_period=14):
+    """Simple moving average."""
+    return _sma(x, time_period)
+
+
+@_panel
+def ema(x, time_period=14):
+    """Exponential moving average (seeded with the first SMA)."""
+    return _ema(x, time_period)
+
+
+@_panel
+def wma(x, time_period=14):
+    """Linearly weighted moving average."""
+    return _wma(x, time_period)
+
+
+@_panel
+def mom(x, time_period=10):
+    """Momentum: x - x n bars ago."""
+    out = _nan_like(x)
+    out[time_period:] = x[time_period:] - x[:-time_period]
+    return out
+
+
+@_panel
+def roc(x, time_period=10):
+    """Rate of change, in percent."""
+    out = _nan_like(x)
+    out[time_period:] = _ratio(x[time_period:] - x[:-time_period], x[:-time_period], 100.0)
+    return out
+
+
+@_panel
+def rsi(x, time_period=14):
+    """Relative strength index (Wilder)."""
+    change = _nan_like(x)
+    change[1:] = x[1:] - x[:-1]
+    gains = _wilder(np.maximum(change, 0.0), time_period, time_period)
+    losses = _wilder(np.maximum(-change, 0.0), time_period, time_period)
+    return _ratio(gains, gains + losses, 100.0)
+
+
+@_panel
+def macd(x, fastperiod=12, slowperiod=26, signalperiod=9):
+    """
+    Moving average convergence/divergence.
+
+    Returns:
+        (macd, signal, histogram); the fast EMA is seeded on the same bar as
+        the slow one and all three start once the signal line has warmed up
+    """
+    line = _ema(x, fastperiod, start=slowperiod - 1) - _ema(x, slowperiod)
+    first = slowperiod - 1 + signalperiod - 1
+    signal = _ema(line, signalperiod, start=first)
+    line[:first] = np.nan
+    return line, signal, line - signal
+
+
+@_panel
+def bbands(x, time_period=20, nbdevup=2.0, nbdevdn=2.0, matype=0):
+    """
+    Bollinger bands around a moving average (matype 0 SMA, 1 EMA, 2 WMA).
+
+    Returns:
+        (upper, middle, lower); the band width uses the population standard
+        deviation over the window
+    """
+    middle = MOVING_AVERAGES[int(matype)](x, time_period)
+    deviation = _nan_like(x)
+    if len(x) >= time_period:
+        deviation[time_period - 1:] = _windows(x, time_period).std(axis=-1)
+    return middle + nbdevup * deviation, middle, middle - nbdevdn * deviation
+
+
+@_panel
+def atr(high, low, close, time_period=14):
+    """Average true range (Wilder)."""
+    return _wilder(_true_range(high, low, close), time_period, time_period)
+
+
+@_panel
+def willr(high, low, close, time_period=14):
+    """Williams' %R."""
+    out = _nan_like(close)
+    if len(close) >= time_period:
+        highest = _windows(high, time_period).max(axis=-1)
+        lowest = _windows(low, time_period).min(axis=-1)
+        out[time_period - 1:] = _ratio(highest - close[time_period - 1:], highest - lowest, -100.0)
+    return out
+
+
+@_panel
+def cci(high, low, close, time_period=20):
+    """Commodity channel index."""
+    out = _nan_like(close)
+    if len(close) >= time_period:
+        windows = _windows((high + low + close) / 3.0, time_period)
+        average = windows.mean(axis=-1)
+        deviation = np.abs(windows - average[..., None]).mean(axis=-1)
+        out[time_period - 1:] = _ratio(windows[..., -1] - average, 0.015 * deviation)
+    return out
+
+
+@_panel
+def adx(high, low, close, time_period=14):
+    """Average directional index (Wilder); the first value needs 2n bars."""
+    n = time_period
+    out = _nan_like(close)
+    if len(close) < 2 * n:
+        return out
+
+    up, down = _nan_like(close), _nan_like(close)
+    up[1:], down[1:] = high[1:] - high[:-1], low[:-1] - low[1:]
+    plus = np.where((up > 0) & (up > down), up, 0.0)
+    minus = np.where((down > 0) & (down > up), down, 0.0)
+    tr = _true_range(high, low, close)
+
+    # Running Wilder sums, seeded with the first n - 1 moves
+    plus_sum, minus_sum, tr_sum = (x[1:n].sum(axis=0) for x in (plus, minus, tr))
+    dx = _nan_like(close)
+    for t in range(n, len(close)):
+        plus_sum = plus_sum - plus_sum / n + plus[t]
+        minus_sum = minus_sum - minus_sum / n + minus[t]
+        tr_sum = tr_sum - tr_sum / n + tr[t]
+        plus_di, minus_di = _ratio(plus_sum, tr_sum, 100.0), _ratio(minus_sum, tr_sum, 100.0)
+        dx[t] = _ratio(np.abs(plus_di - minus_di), plus_di + minus_di, 100.0)
+    return _wilder(dx, n, 2 * n - 1)
+
+
+@_panel
+def obv(close, volume):
+    """On-balance volume, starting from the first bar's volume."""
+    signed = np.sign(np.diff(close, axis=0)) * volume[1:]
+    return np.concatenate([volume[:1], volume[:1] + np.cumsum(signed, axis=0)])
+
+
+MOVING_AVERAGES = {0: _sma, 1: _ema, 2: _wma}
+
+# API function -> (function, price inputs, API parameter names, output columns as
+# the API names them). "series" is the input picked by series_type.
+INDICATORS = {
+    "SMA": (sma, ["series"], ["time_period"], ["SMA"]),
+    "EMA": (ema, ["series"], ["time_period"], ["EMA"]),
+    "WMA": (wma, ["series"], ["time_period"], ["WMA"]),
+    "MOM": (mom, ["series"], ["time_period"], ["MOM"]),
+    "ROC": (roc, ["series"], ["time_period"], ["ROC"]),
+    "RSI": (rsi, ["series"], ["time_period"], ["RSI"]),
+    "MACD": (macd, ["series"], ["fastperiod", "slowperiod", "signalperiod"], ["MACD", "MACD_Signal", "MACD_Hist"]),
+    "BBANDS": (bbands, ["series"], ["time_period", "nbdevup", "nbdevdn", "matype"],
+               ["Real Upper Band", "Real Middle Band", "Real Lower Band"]),
+    "ATR": (atr, ["high", "low", "close"], ["time_period"], ["ATR"]),
+    "WILLR": (willr, ["high", "low", "close"], ["time_period"], ["WILLR"]),
+    "CCI": (cci, ["high", "low", "close"], ["time_period"], ["CCI"]),
+    "ADX": (adx, ["high", "low", "close"], ["time_period"], ["ADX"]),
+    "OBV": (obv, ["close", "volume"], [], ["OBV"])
+}
+
+
+def load_prices(symbols=None, start=None, end=None, adjusted=True,
+                function_name="TIME_SERIES_DAILY_ADJUSTED", directory=store.STORE_DIR):
+    """
+    Stored daily bars as date x symbol panels (oldest first), one per column.
+
+    Args:
+        symbols: Symbols to load (None = every stored symbol)
+        start, end: Inclusive date range (None = unbounded)
+        adjusted: Scale open/high/low/close by adjusted_close / close
+        function_name: Store function holding the bars
+        directory: Store root
+
+    Returns:
+        Dict "open", "high", "low", "close", "volume" -> DataFrame (empty dict if nothing is stored)
+    """
+    columns = [store.DATE_COLUMN] + PRICE_COLUMNS + (["adjusted_close"] if adjusted else [])
+    df = store.read(function_name, symbols, columns=columns, start=start, end=end, directory=directory)
+    if df.empty:
+        return {}
+    wide = df.pivot(index=store.DATE_COLUMN, columns="symbol").sort_index().astype(np.float64)
+    prices = {column: wide[column] for column in PRICE_COLUMNS}
+    if adjusted:
+        factor = wide["adjusted_close"] / wide["close"]
+        for column in ["open", "high", "low", "close"]:
+            prices[column] = prices[column] * factor
+    return prices
+
+
+def compute(function_name, prices, series_type="close", **params):
+    """
+    Compute an API indicator for every symbol in prices.
+
+    Args:
+        function_name: Key of INDICATORS, e.g. "ADX"
+        prices: Panels from load_prices() (or any dict of date x symbol frames)
+        series_type: Price column used by single-series indicators
+        **params: Indicator parameters, named as in the API (time_period, ...)
+
+    Returns:
+        Dict of output column (as the API names it) -> date x symbol DataFrame
+    """
+    if function_name not in INDICATORS:
+        raise ValueError(f"Unknown indicator: {function_name}")
+    fn, inputs, parameter_names, outputs = INDICATORS[function_name]
+    unknown = set(params) - set(parameter_names)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {function_name}: {', '.join(sorted(unknown))}")
+    panels = [prices[series_type if name == "series" else name] for name in inputs]
+    kwargs = {name: float(value) if name.startswith("nbdev") else int(value) for name, value in params.items()}
+    results = fn(*panels, **kwargs)
+    return dict(zip(outputs, results if isinstance(results, tuple) else (results,)))
+
+
+def spot_check(function_name, symbol, api_key, prices=None, series_type="close", **params):
+    """
+    Compare the local values for one symbol with the API's daily series.
+
+    Args:
+        function_name: Key of INDICATORS
+        symbol: Symbol to check
+        api_key: API key to use
+        prices: Panels to compute from (defaults to load_prices([symbol]))
+        series_type, **params: As for compute()
+
+    Returns:
+        DataFrame with one row per output: rows compared, max and mean absolute difference
+    """
+    from common.http_client import fetch_function
+
+    prices = prices if prices is not None else load_prices([symbol])
+    local = compute(function_name, prices, series_type=series_type, **params)
+    api_params = dict(params, series_type=series_type) if "series" in INDICATORS[function_name][1] else params
+    remote = fetch_function("alpha_vantage", function_name, api_key, symbol=symbol, interval="daily",
+                            datatype="csv", **api_params).parse().set_index("time")
+
+    rows = []
+    for column, panel in local.items():
+        both = pd.concat([remote[column], panel[symbol]], axis=1, join="inner").dropna()
+        difference = (both.iloc[:, 0] - both.iloc[:, 1]).abs()
+        rows.append({"column": column, "rows": len(both), "max_abs_diff": difference.max(),
+                     "mean_abs_diff": difference.mean()})
+    return pd.DataFrame(rows)
+
+
+# Example usage:
+if __name__ == "__main__":
+    prices = load_prices()
+    if not prices:
+        print("No TIME_SERIES_DAILY_ADJUSTED data stored yet")
+    else:
+        for name, params in [("ADX", {"time_period": 14}), ("WILLR", {"time_period": 14}),
+                             ("RSI", {"time_period": 14})]:
+            latest = compute(name, prices, **params)[name].iloc[-1]
+            print(f"{name} latest:\n{latest.round(2).to_string()}\n")
@@ -0,0 +1,192 @@
+"""
+YAML job specs for batch runs.
+A spec lists functions, symbol universes, intervals and date ranges; it is
+expanded into the cross product of individual API calls (Jobs). Date ranges
+become per-request parameters where the function supports them (month for
+intraday and indicators, time_from/time_to windows for NEWS_SENTIMENT) and a
+local filter on the parsed rows otherwise.
+
+Example:
+    universes:
+      megacaps: [NVDA, AAPL, MSFT]
+    jobs:
+      - functions: [TIME_SERIES_DAILY_ADJUSTED]
+        symbols: megacaps
+        incremental: true
+"""
+import re
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+
+from common.api_config import API_CONFIGS, get_plan
+from common.batch import Job
+from common.news_backfill import API_TIME_FORMAT, split_range
+
+SpecTask = namedtuple("SpecTask", ["job", "store_name", "symbol", "start", "end", "output", "mode", "incremental"])
+SpecTask.__doc__ = """One expanded call plus what to do with its result: the Job, the store
+partition to write it under, the local date filter, start and end
+both inclusive (None when the range was applied through request
+parameters), and whether the job is a compact window to merge into the
+stored series (see common.timeseries)."""
+
+DURATION_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+OUTPUTS = ("store", "files", "none")
+
+
+def load_spec(path):
+    """Read a YAML job spec."""
+    import yaml
+
+    with open(path) as f:
+        spec = yaml.safe_load(f) or {}
+    if not isinstance(spec.get("jobs"), list):
+        raise ValueError(f"Job spec {path} needs a 'jobs' list")
+    return spec
+
+
+def parse_duration(value):
+    """timedelta from "30m", "12h", "7d" or "2w"."""
+    if isinstance(value, timedelta):
+        return value
+    match = re.fullmatch(r"\s*(\d+)\s*([mhdw])\s*", str(value))
+    if not match:
+        raise ValueError(f"Bad duration: {value!r} (expected e.g. 30m, 12h, 7d, 2w)")
+    return timedelta(**{DURATION_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def _to_datetime(value, end=False):
+    """
+    datetime from a YAML date, datetime or ISO string. A date-only end
+    (2025-03-31) stands for the whole day, so it maps to the day's last instant.
+    """
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, date):
+        value = str(value)
+        parsed = datetime.fromisoformat(value)
+        if not end or len(value) > 10:
+            return parsed
+        value = parsed.date()
+    if end:
+        return datetime.combine(value, time.max)
+    return datetime(value.year, value.month, value.day)
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return [value] if isinstance(value, (str, int, float)) else list(value)
+
+
+def resolve_symbols(names, universes):
+    """Expand universe names into tickers (other entries are taken as tickers), keeping order."""
+    symbols = []
+    for name in _as_list(names):
+        for symbol in universes.get(name, [name]):
+            if symbol not in symbols:
+                symbols.append(symbol)
+    return symbols
+
+
+def months(start, end):
+    """"YYYY-MM" for every month touched by [start, end]."""
+    current, result = date(start.year, start.month, 1), []
+    while current <= end.date():
+        result.append(f"{current:%Y-%m}")
+        current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+    return result
+
+
+def _accepted(api_name, function_name):
+    func_config = API_CONFIGS[api_name]["functions"][function_name]
+    return set(func_config["required"]) | set(func_config["optional"])
+
+
+def _date_variants(accepted, dates):
+    """
+    Request parameter sets covering a date range, plus the local filter that
+    still has to be applied ((start, end), or (None, None)).
+    """
+    if not dates:
+        return [{}], (None, None)
+    start, end = _to_datetime(dates["start"]), _to_datetime(dates.get("end", datetime.now()), end=True)
+    if "month" in accepted:
+        return [{"month": month} for month in months(start, end)], (start, end)
+    if "time_from" in accepted:
+        window = parse_duration(dates.get("window", "7d"))
+        return [{"time_from": window_start.strftime(API_TIME_FORMAT), "time_to": window_end.strftime(API_TIME_FORMAT)}
+                for window_start, window_end in split_range(start, end, window)], (None, None)
+    return [{}], (start, end)
+
+
+def expand_entry(entry, universes, api_name="alpha_vantage"):
+    """
+    Yield a SpecTask for every call described by one spec entry.
+
+    Entry keys:
+        functions: Function name or list of names
+        symbols: Tickers and/or universe names (sent as symbol, or tickers for news)
+        intervals: Values for the interval parameter, one call each
+        dates: {start, end, window} date range (window sizes news windows)
+        params: Extra parameters for every call
+        priority: Scheduling priority for these calls
+        output: "store" (default; JSON bodies fall back to files), "files" or "none"
+        mode: Store write mode ("upsert" by default)
+        incremental: Fetch only the compact window of a daily series and merge
+            it into the stored history (full history on first run or when the
+            overlap disagrees); needs symbols, store output and no dates
+    """
+    output = entry.get("output", "store")
+    if output not in OUTPUTS:
+        raise ValueError(f"Unknown output {output!r}; expected one of {OUTPUTS}")
+    incremental = bool(entry.get("incremental", False))
+    if incremental:
+        from common.timeseries import INCREMENTAL_FUNCTIONS
+
+        unsupported = [name for name in _as_list(entry.get("functions")) if name not in INCREMENTAL_FUNCTIONS]
+        if unsupported:
+            raise ValueError(f"Incremental refresh not supported for: {unsupported}")
+        if output != "store" or not entry.get("symbols") or entry.get("dates"):
+            raise ValueError("incremental entries need symbols, store output and no dates")
+    symbols = resolve_symbols(entry.get("symbols"), universes)
+    intervals = _as_list(entry.get("intervals"))
+    params = entry.get("params", {})
+    if incremental:
+        params = {**params, "outputsize": "compact", "datatype": "csv"}
+
+    for function_name in _as_list(entry.get("functions")):
+        get_plan(api_name, function_name)
+        accepted = _accepted(api_name, function_name)
+        symbol_param = "symbol" if "symbol" in accepted else "tickers" if "tickers" in accepted else None
+        if symbols and symbol_param is None:
+            raise ValueError(f"{function_name} does not take a symbol")
+        if intervals and "interval" not in accepted:
+            raise ValueError(f"{function_name} does not take an interval")
+        date_variants, (start, end) = _date_variants(accepted, entry.get("dates"))
+
+        for symbol in symbols or [None]:
+            for interval in intervals or [None]:
+                for date_params in date_variants:
+                    job_params = {**params, **date_params}
+                    if symbol is not None:
+                        job_params[symbol_param] = symbol
+                    if interval is not None:
+                        job_params["interval"] = interval
+                    yield SpecTask(
+                        job=Job(function_name, job_params, entry.get("priority")),
+                        store_name=f"{function_name}_{interval}" if interval is not None else function_name,
+                        symbol=symbol,
+                        start=start,
+                        end=end,
+                        output=output,
+                        mode=entry.get("mode", "upsert"),
+                        incremental=incremental
+                    )
+
+
+def expand_spec(spec):
+    """Lazily yield a SpecTask for every call in a spec."""
+    api_name = spec.get("api", "alpha_vantage")
+    universes = {name: _as_list(symbols) for name, symbols in (spec.get("universes") or {}).items()}
+    for entry in spec["jobs"]:
+        yield from expand_entry(entry, universes, api_name)
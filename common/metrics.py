@@ -0,0 +1,238 @@
+"""
+In-process request metrics.
+Counters and fixed-bucket histograms recorded on the shared fetch and parse
+path (connect time, time to first byte, download time and bytes, parse time,
+quota waits, cache hits and misses, soft failures), labelled by function
+and symbol. Recording costs a dict lookup and a bisect under one lock, so it
+stays on by default. Read the numbers in process with snapshot(), scrape
+them as Prometheus text or JSON from serve(), or forward every observation
+to your own sinks with add_sink().
+
+Usage:
+    metrics.serve(port=9108)   # then GET /metrics or /metrics.json
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+METRICS_CONFIG = {
+    "enabled": True,
+    "symbol_labels": True  # set False to drop the symbol label (fewer series for large universes)
+}
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+# name -> (kind, help, buckets)
+METRICS = {
+    "api_requests_total": ("counter", "Responses returned by fetch_function, by source (network or cache)", None),
+    "api_cache_hits_total": ("counter", "Fresh response cache hits", None),
+    "api_cache_misses_total": ("counter", "Response cache misses (including expired and error entries)", None),
+    "api_errors_total": ("counter", "Soft failures and transport errors, by error type", None),
+    "api_retries_total": ("counter", "Calls repeated after a rate-limit answer", None),
+    "api_connections_opened_total": ("counter", "New TCP/TLS connections (the rest reused the pool)", None),
+    "api_quota_wait_seconds": ("histogram", "Time spent waiting for quota budget", SECONDS_BUCKETS),
+    "api_connect_seconds": ("histogram", "DNS lookup + TCP connect + TLS handshake for new connections",
+                            SECONDS_BUCKETS),
+    "api_ttfb_seconds": ("histogram", "Request sent to response headers received", SECONDS_BUCKETS),
+    "api_download_seconds": ("histogram", "Response headers to last body byte", SECONDS_BUCKETS),
+    "api_response_bytes": ("histogram", "Decoded response body size", BYTES_BUCKETS),
+    "api_parse_seconds": ("histogram", "Parsing a response body into a DataFrame / dict", SECONDS_BUCKETS),
+    "pipeline_stage_seconds": ("histogram", "Duration of a named pipeline stage", SECONDS_BUCKETS)
+}
+
+# Connection timings are taken inside urllib3 on the calling thread and
+# picked up by the fetch that triggered them
+connection_timings = threading.local()
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class Registry:
+    """Thread-safe store of counter values and histograms keyed by (name, labels)."""
+
+    def __init__(self, definitions=METRICS):
+        self.definitions = definitions
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._sinks = []
+
+    def inc(self, name, value=1, **labels):
+        """Add value to a counter."""
+        if not METRICS_CONFIG["enabled"]:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        for sink in self._sinks:
+            sink(name, labels, value)
+
+    def observe(self, name, value, **labels):
+        """Record one histogram observation."""
+        if not METRICS_CONFIG["enabled"]:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.definitions[name][2])
+            histogram.observe(value)
+        for sink in self._sinks:
+            sink(name, labels, value)
+
+    @contextmanager
+    def timer(self, name="pipeline_stage_seconds", **labels):
+        """Observe the duration of the with-block into a seconds histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def add_sink(self, sink):
+        """
+        Forward every observation to sink(name, labels, value) as it is recorded.
+        Sinks run on the recording thread, so they should be quick (e.g. push to a queue).
+        """
+        self._sinks.append(sink)
+
+    def remove_sink(self, sink):
+        self._sinks.remove(sink)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        """
+        Current values as plain data.
+
+        Returns:
+            {"counters": [{"name", "labels", "value"}],
+             "histograms": [{"name", "labels", "count", "sum", "buckets": {upper bound: cumulative count}}]}
+        """
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            histograms = []
+            for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                cumulative, buckets = 0, {}
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+                histograms.append({"name": name, "labels": dict(labels), "count": histogram.count,
+                                   "sum": histogram.sum, "buckets": buckets})
+        return {"counters": counters, "histograms": histograms}
+
+    def render_prometheus(self):
+        """Current values in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines, described = [], set()
+
+        def describe(name):
+            if name not in described:
+                described.add(name)
+                kind, help_text, _ = self.definitions.get(name, ("untyped", name, None))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for counter in snapshot["counters"]:
+            describe(counter["name"])
+            lines.append(f"{counter['name']}{_labels(counter['labels'])} {counter['value']}")
+        for histogram in snapshot["histograms"]:
+            name = histogram["name"]
+            describe(name)
+            for bound, count in histogram["buckets"].items():
+                lines.append(f"{name}_bucket{_labels({**histogram['labels'], 'le': bound})} {count}")
+            lines.append(f"{name}_sum{_labels(histogram['labels'])} {histogram['sum']}")
+            lines.append(f"{name}_count{_labels(histogram['labels'])} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+_registry = Registry()
+
+
+def get_registry():
+    """Return the process-wide registry."""
+    return _registry
+
+
+def request_labels(function_name, params):
+    """function / symbol labels for a request (symbol is "" when the call has none)."""
+    if not METRICS_CONFIG["enabled"]:
+        return None
+    symbol = ""
+    if METRICS_CONFIG["symbol_labels"]:
+        symbol = params.get("symbol") or params.get("tickers") or ""
+    return {"function": function_name, "symbol": symbol}
+
+
+def take_connect_time():
+    """Connect time recorded on this thread since the last call (None if the pool reused a connection)."""
+    elapsed = getattr(connection_timings, "connect", None)
+    connection_timings.connect = None
+    return elapsed
+
+
+def serve(host="127.0.0.1", port=9108, registry=None):
+    """
+    Serve /metrics (Prometheus text) and /metrics.json from a background thread.
+
+    Returns:
+        The running ThreadingHTTPServer; call shutdown() to stop it
+    """
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registry = registry or _registry
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                body, content_type = registry.render_prometheus().encode(), "text/plain; version=0.0.4"
+            elif path == "/metrics.json":
+                body, content_type = json.dumps(registry.snapshot()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
@@ -0,0 +1,191 @@
+"""
+Append-only archive of NEWS_SENTIMENT articles.
+Articles are stored as newline-delimited JSON in gzip members ("frames")
+appended to one file per publication day
+(data/news_archive/YYYY/MM/news-YYYYMMDD.ndjson.gz). Next to each file, a
+side index (.idx.jsonl) holds one line per frame: its byte offset and
+length, article count, time range and tickers. Replaying a date range for a
+ticker reads only the matching day files and, within them, only the frames
+whose index entry matches. The data files are ordinary multi-member gzip,
+so `zcat` reads them too.
+"""
+import gzip
+import json
+import os
+import threading
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from common.news_backfill import PUBLISHED_FORMAT, to_datetime
+
+ARCHIVE_DIR = Path(os.getenv("API_EXPLORER_DATA_DIR", Path(__file__).resolve().parent.parent / "data")) / "news_archive"
+
+ARCHIVE_CONFIG = {
+    "frame_articles": 256,   # articles per gzip member; smaller frames skip more precisely, larger compress better
+    "compresslevel": 6
+}
+
+
+def _day_of(published):
+    return datetime.strptime(published[:8], "%Y%m%d").date()
+
+
+def _tickers(article):
+    return {mention["ticker"] for mention in article.get("ticker_sentiment", [])}
+
+
+class NewsArchive:
+    """
+    Day-rotated, compressed, append-only article archive in `directory`.
+
+    Args:
+        directory: Archive root
+        frame_articles: Articles per frame (defaults to ARCHIVE_CONFIG)
+        compresslevel: gzip level (defaults to ARCHIVE_CONFIG)
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR, frame_articles=None, compresslevel=None):
+        self.directory = Path(directory)
+        self.frame_articles = frame_articles or ARCHIVE_CONFIG["frame_articles"]
+        self.compresslevel = compresslevel if compresslevel is not None else ARCHIVE_CONFIG["compresslevel"]
+        self._lock = threading.Lock()
+        self._urls = {}
+
+    def paths(self, day):
+        """(data file, index file) for a publication day."""
+        folder = self.directory / f"{day:%Y}" / f"{day:%m}"
+        return folder / f"news-{day:%Y%m%d}.ndjson.gz", folder / f"news-{day:%Y%m%d}.idx.jsonl"
+
+    def days(self):
+        """Publication days present in the archive, oldest first."""
+        return sorted(datetime.strptime(path.name[5:13], "%Y%m%d").date()
+                      for path in self.directory.glob("*/*/news-*.idx.jsonl"))
+
+    def frames(self, day):
+        """Index entries of a day's frames, in the order they were appended."""
+        index_file = self.paths(day)[1]
+        if not index_file.exists():
+            return []
+        return [json.loads(line) for line in index_file.read_text().splitlines() if line]
+
+    def _read_frame(self, handle, entry):
+        handle.seek(entry["offset"])
+        data = zlib.decompress(handle.read(entry["length"]), wbits=31)
+        return [json.loads(line) for line in data.splitlines()]
+
+    def _known_urls(self, day):
+        if day not in self._urls:
+            urls = set()
+            data_file = self.paths(day)[0]
+            if data_file.exists():
+                with open(data_file, "rb") as handle:
+                    for entry in self.frames(day):
+                        urls.update(article["url"] for article in self._read_frame(handle, entry))
+            self._urls[day] = urls
+        return self._urls[day]
+
+    def append(self, articles):
+        """
+        Add articles, skipping URLs already archived for their day.
+
+        Args:
+            articles: Iterable of feed articles (a list or a streaming generator)
+
+        Returns:
+            Number of articles written
+        """
+        by_day = defaultdict(list)
+        for article in articles:
+            by_day[_day_of(article["time_published"])].append(article)
+
+        written = 0
+        with self._lock:
+            for day, day_articles in sorted(by_day.items()):
+                known = self._known_urls(day)
+                fresh = []
+                for article in sorted(day_articles, key=lambda article: article["time_published"]):
+                    if article["url"] not in known:
+                        known.add(article["url"])
+                        fresh.append(article)
+                for start in range(0, len(fresh), self.frame_articles):
+                    self._write_frame(day, fresh[start:start + self.frame_articles])
+                written += len(fresh)
+        return written
+
+    def _write_frame(self, day, articles):
+        data_file, index_file = self.paths(day)
+        data_file.parent.mkdir(parents=True, exist_ok=True)
+        payload = "".join(json.dumps(article, separators=(",", ":")) + "\n" for article in articles)
+        frame = gzip.compress(payload.encode(), compresslevel=self.compresslevel, mtime=0)
+        with open(data_file, "ab") as handle:
+            offset = handle.seek(0, os.SEEK_END)
+            handle.write(frame)
+        entry = {
+            "offset": offset,
+            "length": len(frame),
+            "count": len(articles),
+            "time_from": articles[0]["time_published"],
+            "time_to": articles[-1]["time_published"],
+            "tickers": sorted(set().union(*(_tickers(article) for article in articles)))
+        }
+        # The index line goes last: a frame without one is never read
+        with open(index_file, "a") as handle:
+            handle.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def replay(self, start=None, end=None, ticker=None):
+        """
+        Yield archived articles in publication order.
+
+        Args:
+            start, end: Inclusive time range (datetime or API time string; None = unbounded)
+            ticker: Only articles mentioning this ticker
+
+        Yields:
+            Feed articles, each once
+        """
+        start = to_datetime(start).strftime(PUBLISHED_FORMAT) if start is not None else None
+        end = to_datetime(end).strftime(PUBLISHED_FORMAT) if end is not None else None
+        for day in self.days():
+            day_start, day_end = f"{day:%Y%m%d}T000000", f"{day:%Y%m%d}T235959"
+            if (start is not None and day_end < start) or (end is not None and day_start > end):
+                continue
+            entries = [entry for entry in self.frames(day)
+                       if (start is None or entry["time_to"] >= start)
+                       and (end is None or entry["time_from"] <= end)
+                       and (ticker is None or ticker in entry["tickers"])]
+            if not entries:
+                continue
+            articles, seen = [], set()
+            with open(self.paths(day)[0], "rb") as handle:
+                for entry in entries:
+                    for article in self._read_frame(handle, entry):
+                        published = article["time_published"]
+                        if ((start is not None and published < start) or (end is not None and published > end)
+                                or article["url"] in seen or (ticker is not None and ticker not in _tickers(article))):
+                            continue
+                        seen.add(article["url"])
+                        articles.append(article)
+            articles.sort(key=lambda article: article["time_published"])
+            yield from articles
+
+    def stats(self):
+        """Days, frames, articles and bytes on disk."""
+        days = self.days()
+        entries = [entry for day in days for entry in self.frames(day)]
+        return {
+            "days": len(days),
+            "frames": len(entries),
+            "articles": sum(entry["count"] for entry in entries),
+            "bytes": sum(path.stat().st_size for path in self.directory.glob("*/*/news-*"))
+        }
+
+
+# Example usage:
+if __name__ == "__main__":
+    archive = NewsArchive()
+    print(archive.stats())
+    last_week = datetime.now() - timedelta(days=7)
+    for article in archive.replay(start=last_week, ticker="NVDA"):
+        print(article["time_published"], article["title"][:80])
@@ -0,0 +1,129 @@
+"""
+Historical NEWS_SENTIMENT backfill.
+A single request returns at most 1,000 articles, so a long time range is
+split into windows that are fetched concurrently within quota. A window that
+comes back full is resumed from its last article, using windows sized to the
+article density just observed, until the whole range is covered. Articles
+are de-duplicated by URL.
+"""
+import math
+from datetime import datetime, timedelta
+
+from common.batch import Job, stream_batch
+from common.news_stream import iter_articles_from_bytes
+
+API_TIME_FORMAT = "%Y%m%dT%H%M"
+PUBLISHED_FORMAT = "%Y%m%dT%H%M%S"
+MAX_LIMIT = 1000
+
+
+def to_datetime(value):
+    """Accept a datetime or an API time string ("YYYYMMDDTHHMM[SS]")."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(value, PUBLISHED_FORMAT if len(value) == 15 else API_TIME_FORMAT)
+
+
+def split_range(start, end, window):
+    """Split [start, end) into consecutive windows of at most `window`."""
+    windows = []
+    while start < end:
+        windows.append((start, min(start + window, end)))
+        start += window
+    return windows
+
+
+def _resume_windows(window_start, window_end, last_published):
+    """
+    Windows covering what a saturated response didn't reach.
+    The response spanned window_start..last_published with a full page;
+    the remainder is cut into windows that should each hold ~80% of that.
+    """
+    # API times have minute resolution; always move forward at least a minute
+    resume = max(last_published.replace(second=0), window_start + timedelta(minutes=1))
+    if resume >= window_end:
+        return []
+    covered = max(last_published - window_start, timedelta(minutes=1))
+    pieces = math.ceil((window_end - resume) / (covered * 0.8))
+    return split_range(resume, window_end, (window_end - resume) / pieces + timedelta(microseconds=1))
+
+
+def iter_backfill(api_key, time_from, time_to, tickers=None, topics=None,
+                  window=timedelta(days=7), limit=MAX_LIMIT, max_in_flight=None, failed_windows=None):
+    """
+    Yield every article published between time_from and time_to, once each.
+    Responses are taken as they complete (about max_in_flight bodies held at
+    a time), streamed article by article and dropped, so memory stays flat
+    no matter how many pages the backfill spans (only seen URLs are kept).
+
+    Args:
+        api_key: API key to use
+        time_from, time_to: datetimes or API time strings ("YYYYMMDDTHHMM")
+        tickers, topics: Optional comma-separated filters, as for NEWS_SENTIMENT
+        window: Initial window size; shrinks automatically where news is dense
+        limit: Articles per request (the API caps this at 1,000)
+        max_in_flight: Concurrent requests (defaults to the client's pool size)
+        failed_windows: Optional list that collects (start, end, error) for
+            windows whose requests failed
+
+    Yields:
+        Article dicts in no particular order
+    """
+    start, end = to_datetime(time_from), to_datetime(time_to)
+    seen_urls = set()
+    pending = split_range(start, end, window)
+
+    while pending:
+        jobs = [Job("NEWS_SENTIMENT", {
+            "tickers": tickers,
+            "topics": topics,
+            "time_from": window_start.strftime(API_TIME_FORMAT),
+            "time_to": window_end.strftime(API_TIME_FORMAT),
+            "sort": "EARLIEST",
+            "limit": limit
+        }) for window_start, window_end in pending]
+        pending = []
+
+        for result in stream_batch(jobs, api_key, max_in_flight=max_in_flight):
+            window_start = to_datetime(result.job.params["time_from"])
+            window_end = to_datetime(result.job.params["time_to"])
+            count = 0
+            last_published = None
+            try:
+                if result.error is not None:
+                    raise result.error
+                for article in iter_articles_from_bytes(result.response.content):
+                    count += 1
+                    if last_published is None or article["time_published"] > last_published:
+                        last_published = article["time_published"]
+                    if article["url"] not in seen_urls:
+                        seen_urls.add(article["url"])
+                        yield article
+            except Exception as error:
+                if failed_windows is not None:
+                    failed_windows.append((window_start, window_end, repr(error)))
+                continue
+            finally:
+                # Let the body go before waiting for the next response
+                result = None
+
+            if count >= limit:
+                pending.extend(_resume_windows(window_start, window_end, to_datetime(last_published)))
+
+
+def backfill_news(api_key, time_from, time_to, tickers=None, topics=None,
+                  window=timedelta(days=7), limit=MAX_LIMIT, max_in_flight=None):
+    """
+    Collect a backfill into one payload (see iter_backfill for arguments).
+    Holds the whole feed in memory; consume iter_backfill directly for long ranges.
+
+    Returns:
+        Dict shaped like a NEWS_SENTIMENT response ("items", "feed") with the
+        feed sorted by time_published, plus "failed_windows" listing windows
+        whose requests errored.
+    """
+    failed_windows = []
+    feed = sorted(iter_backfill(api_key, time_from, time_to, tickers, topics, window, limit,
+                                max_in_flight, failed_windows),
+                  key=lambda article: article["time_published"])
+    return {"items": str(len(feed)), "feed": feed, "failed_windows": failed_windows}
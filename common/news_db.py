@@ -0,0 +1,268 @@
+"""
+Indexed SQLite store for NEWS_SENTIMENT articles.
+Articles are de-duplicated by URL; their ticker sentiment and topic
+relevance go into normalized tables indexed on (ticker, time_published) and
+(topic, time_published), so "NVDA mentions with relevance > 0.5 in Q1" is an
+index range scan instead of a pass over every article. The database runs in
+WAL mode (readers don't block the writer) and inserts are batched into one
+transaction per batch.
+"""
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from common.news_backfill import PUBLISHED_FORMAT, to_datetime
+
+DB_PATH = Path(os.getenv("API_EXPLORER_DATA_DIR", Path(__file__).resolve().parent.parent / "data")) / "news.sqlite"
+
+BATCH_SIZE = 5000
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_PARAMS_PER_QUERY = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    time_published TEXT NOT NULL,
+    title TEXT,
+    summary TEXT,
+    source TEXT,
+    source_domain TEXT,
+    authors TEXT,
+    overall_sentiment_score REAL,
+    overall_sentiment_label TEXT
+);
+CREATE INDEX IF NOT EXISTS articles_time ON articles (time_published);
+
+CREATE TABLE IF NOT EXISTS ticker_sentiment (
+    article_id INTEGER NOT NULL REFERENCES articles (id),
+    ticker TEXT NOT NULL,
+    time_published TEXT NOT NULL,
+    relevance_score REAL,
+    ticker_sentiment_score REAL,
+    ticker_sentiment_label TEXT,
+    PRIMARY KEY (article_id, ticker)
+);
+CREATE INDEX IF NOT EXISTS ticker_sentiment_ticker_time ON ticker_sentiment (ticker, time_published);
+
+CREATE TABLE IF NOT EXISTS topics (
+    article_id INTEGER NOT NULL REFERENCES articles (id),
+    topic TEXT NOT NULL,
+    time_published TEXT NOT NULL,
+    relevance_score REAL,
+    PRIMARY KEY (article_id, topic)
+);
+CREATE INDEX IF NOT EXISTS topics_topic_time ON topics (topic, time_published);
+"""
+
+ARTICLE_COLUMNS = "a.time_published, a.url, a.title, a.source, a.overall_sentiment_score, a.overall_sentiment_label"
+
+
+def _time_bound(value, end=False):
+    bound = to_datetime(value).strftime(PUBLISHED_FORMAT)
+    # An end given to the minute ("...T2359") includes that whole minute
+    if end and isinstance(value, str) and len(value) < len(bound):
+        bound = bound[:-2] + "59"
+    return bound
+
+
+def _as_list(values):
+    return [values] if isinstance(values, str) else list(values)
+
+
+def _range_clause(column, start, end, params):
+    clauses = []
+    if start is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(_time_bound(start))
+    if end is not None:
+        clauses.append(f"{column} <= ?")
+        params.append(_time_bound(end, end=True))
+    return clauses
+
+
+def _typed(df, category_columns):
+    """Date column from time_published plus categoricals, like sentiment.flatten_feed's frames."""
+    df.insert(0, "date", pd.to_datetime(df["time_published"].str[:8], format="%Y%m%d"))
+    for column in category_columns:
+        df[column] = df[column].astype("category")
+    return df
+
+
+class ArticleStore:
+    """
+    Articles, ticker sentiment and topics in one SQLite file.
+
+    Args:
+        path: Database file (created on first use)
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def insert(self, articles, batch_size=BATCH_SIZE):
+        """
+        Add articles; URLs already stored are skipped.
+
+        Args:
+            articles: Iterable of feed articles (a list or a streaming generator)
+            batch_size: Articles per transaction
+
+        Returns:
+            Number of new articles
+        """
+        added, batch = 0, []
+        for article in articles:
+            batch.append(article)
+            if len(batch) >= batch_size:
+                added += self._insert_batch(batch)
+                batch = []
+        if batch:
+            added += self._insert_batch(batch)
+        return added
+
+    def _insert_batch(self, articles):
+        rows = [(article["url"], article["time_published"], article.get("title"), article.get("summary"),
+                 article.get("source"), article.get("source_domain"), json.dumps(article.get("authors", [])),
+                 float(article["overall_sentiment_score"]), article.get("overall_sentiment_label"))
+                for article in articles]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                before = self._db.total_changes
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO articles (url, time_published, title, summary, source, source_domain,"
+                    " authors, overall_sentiment_score, overall_sentiment_label) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows)
+                added = self._db.total_changes - before
+
+                urls = list({article["url"] for article in articles})
+                ids = {}
+                for start in range(0, len(urls), _PARAMS_PER_QUERY):
+                    chunk = urls[start:start + _PARAMS_PER_QUERY]
+                    ids.update(self._db.execute(
+                        f"SELECT url, id FROM articles WHERE url IN ({','.join('?' * len(chunk))})", chunk))
+
+                mentions, topics = [], []
+                for article in articles:
+                    article_id, published = ids[article["url"]], article["time_published"]
+                    mentions.extend((article_id, mention["ticker"], published, float(mention["relevance_score"]),
+                                     float(mention["ticker_sentiment_score"]), mention["ticker_sentiment_label"])
+                                    for mention in article.get("ticker_sentiment", []))
+                    topics.extend((article_id, topic["topic"], published, float(topic["relevance_score"]))
+                                  for topic in article.get("topics", []))
+                self._db.executemany("INSERT OR IGNORE INTO ticker_sentiment VALUES (?, ?, ?, ?, ?, ?)", mentions)
+                self._db.executemany("INSERT OR IGNORE INTO topics VALUES (?, ?, ?, ?)", topics)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return added
+
+    def _query(self, sql, params):
+        with self._lock:
+            return pd.read_sql_query(sql, self._db, params=params)
+
+    def mentions(self, tickers=None, start=None, end=None, min_relevance=None):
+        """
+        Ticker mentions with their article, oldest first.
+
+        Args:
+            tickers: A ticker or list of tickers (None = all; that query can't use the ticker index)
+            start, end: Inclusive time range (datetime or API time string; None = unbounded)
+            min_relevance: Only mentions with relevance_score above this
+
+        Returns:
+            DataFrame with the columns of sentiment.flatten_feed's mentions
+            frame (date, time_published, url, ticker, ticker_sentiment_score,
+            relevance_score, ticker_sentiment_label) plus title and source
+        """
+        params, clauses = [], []
+        if tickers is not None:
+            tickers = _as_list(tickers)
+            clauses.append(f"t.ticker IN ({','.join('?' * len(tickers))})")
+            params.extend(tickers)
+        clauses += _range_clause("t.time_published", start, end, params)
+        if min_relevance is not None:
+            clauses.append("t.relevance_score > ?")
+            params.append(min_relevance)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        df = self._query(
+            "SELECT t.time_published, a.url, t.ticker, t.ticker_sentiment_score, t.relevance_score,"
+            " t.ticker_sentiment_label, a.title, a.source"
+            f" FROM ticker_sentiment t JOIN articles a ON a.id = t.article_id {where}"
+            " ORDER BY t.time_published", params)
+        return _typed(df, ["ticker", "ticker_sentiment_label", "source"])
+
+    def articles(self, start=None, end=None, tickers=None, topics=None):
+        """
+        Articles in a time range, oldest first, optionally only those
+        mentioning any of `tickers` or tagged with any of `topics`.
+
+        Returns:
+            DataFrame with the columns of sentiment.flatten_feed's articles
+            frame (date, time_published, url, title, source,
+            overall_sentiment_score, overall_sentiment_label)
+        """
+        params = []
+        clauses = _range_clause("a.time_published", start, end, params)
+        for table, column, values in (("ticker_sentiment", "ticker", tickers), ("topics", "topic", topics)):
+            if values is None:
+                continue
+            values = _as_list(values)
+            inner = [f"{column} IN ({','.join('?' * len(values))})"]
+            params.extend(values)
+            inner += _range_clause("time_published", start, end, params)
+            clauses.append(f"a.id IN (SELECT article_id FROM {table} WHERE {' AND '.join(inner)})")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        df = self._query(f"SELECT {ARTICLE_COLUMNS} FROM articles a {where} ORDER BY a.time_published", params)
+        return _typed(df, ["source", "overall_sentiment_label"])
+
+    def topic_articles(self, topics, start=None, end=None, min_relevance=None):
+        """
+        Articles tagged with a topic (or any of a list), with the topic's relevance.
+
+        Returns:
+            DataFrame with date, time_published, url, title, source, overall
+            sentiment, topic and relevance_score, oldest first
+        """
+        topics = _as_list(topics)
+        params = list(topics)
+        clauses = [f"p.topic IN ({','.join('?' * len(topics))})"]
+        clauses += _range_clause("p.time_published", start, end, params)
+        if min_relevance is not None:
+            clauses.append("p.relevance_score > ?")
+            params.append(min_relevance)
+        df = self._query(
+            f"SELECT {ARTICLE_COLUMNS}, p.topic, p.relevance_score"
+            f" FROM topics p JOIN articles a ON a.id = p.article_id WHERE {' AND '.join(clauses)}"
+            " ORDER BY p.time_published", params)
+        return _typed(df, ["source", "overall_sentiment_label", "topic"])
+
+    def counts(self):
+        """Row counts per table."""
+        with self._lock:
+            return {table: self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ("articles", "ticker_sentiment", "topics")}
+
+
+# Example usage:
+if __name__ == "__main__":
+    store = ArticleStore()
+    print(store.counts())
+    print(store.mentions("NVDA", start="20250101T0000", end="20250331T2359", min_relevance=0.5).head())
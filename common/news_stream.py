@@ -0,0 +1,124 @@
+"""
+Streaming parser for NEWS_SENTIMENT payloads.
+Yields the articles of the top-level "feed" array one at a time from a
+stream of byte chunks, so only the current article (plus a read buffer) is
+held in memory instead of the whole decoded payload.
+"""
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Incrementally decoded text buffer over an iterator of byte chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self):
+        """Pull the next chunk into the buffer; False once the stream is exhausted."""
+        if self.eof:
+            return False
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            self.buffer += self.decoder.decode(b"", final=True)
+            return False
+        # Drop consumed text once it dominates the buffer
+        if self.pos > len(self.buffer) // 2:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += self.decoder.decode(chunk)
+        return True
+
+    def skip_whitespace(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.more():
+                return
+
+    def peek(self):
+        self.skip_whitespace()
+        if self.pos >= len(self.buffer):
+            raise ValueError("Unexpected end of NEWS_SENTIMENT payload")
+        return self.buffer[self.pos]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {self.buffer[self.pos]!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more chunks as needed."""
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.more():
+                    continue
+                raise
+            # A number at the buffer's end may continue in the next chunk
+            if end == len(self.buffer) and not self.eof and self.more():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_articles(chunks):
+    """
+    Yield each article of a NEWS_SENTIMENT payload's "feed" array.
+
+    Args:
+        chunks: Iterable of bytes chunks making up the JSON body
+
+    Raises:
+        ValueError: If the payload has no "feed" (e.g. an "Information" or
+            "Note" message); the message includes the top-level fields seen
+    """
+    reader = _Reader(chunks)
+    reader.expect("{")
+    seen = {}
+    while reader.peek() != "}":
+        key = reader.value()
+        reader.expect(":")
+        if key == "feed":
+            reader.expect("[")
+            while reader.peek() != "]":
+                yield reader.value()
+                if reader.peek() == ",":
+                    reader.pos += 1
+            return
+        seen[key] = reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+    raise ValueError(f"NEWS_SENTIMENT payload has no feed: {seen}")
+
+
+def iter_articles_from_bytes(content, chunk_size=CHUNK_SIZE):
+    """Stream articles out of an already downloaded body (e.g. ApiResponse.content)."""
+    view = memoryview(content)
+    return iter_articles(bytes(view[start:start + chunk_size]) for start in range(0, len(view), chunk_size))
+
+
+def iter_articles_from_file(path, chunk_size=CHUNK_SIZE):
+    """Stream articles out of an archived payload on disk."""
+    with open(path, "rb") as f:
+        yield from iter_articles(iter(lambda: f.read(chunk_size), b""))
+
+
+def iter_articles_from_response(response, chunk_size=CHUNK_SIZE):
+    """Stream articles straight off a requests response opened with stream=True."""
+    try:
+        yield from iter_articles(response.iter_content(chunk_size))
+    finally:
+        response.close()
@@ -0,0 +1,226 @@
+"""
+Parsers that read API responses straight from the downloaded bytes.
+The body is wrapped in an in-memory buffer rather than decoded to text or
+fetched a second time. pandas is only imported once a CSV is parsed.
+Functions with a registered schema are parsed with explicit dtypes.
+"""
+import io
+import json
+
+
+def read_csv_bytes(content, **kwargs):
+    """
+    Parse a CSV response body into a DataFrame.
+
+    Args:
+        content: Raw response bytes
+        **kwargs: Passed through to pandas.read_csv
+
+    Returns:
+        pandas.DataFrame
+    """
+    import pandas as pd
+
+    return pd.read_csv(io.BytesIO(content), **kwargs)
+
+
+def read_json_bytes(content):
+    """Parse a JSON response body. json.loads decodes UTF-8 bytes directly."""
+    return json.loads(content)
+
+
+# Typed parsing: per-function schemas so CSV columns come back with explicit
+# dtypes (datetimes, categoricals, integer volumes, float32 prices on request)
+# instead of whatever pandas infers.
+
+PARSE_CONFIG = {
+    "float32_prices": False  # store OHLC / price columns as float32 (half the memory)
+}
+
+PRICE_COLUMNS = ["open", "high", "low", "close", "adjusted_close", "adjusted close", "price", "previousClose",
+                 "change", "priceRangeLow", "priceRangeHigh"]
+
+_OHLCV = {
+    "dates": ["timestamp"],
+    "dtypes": {
+        "volume": "int64",
+        "dividend_amount": "float64", "dividend amount": "float64",
+        "split_coefficient": "float64"
+    }
+}
+
+SCHEMAS = {
+    **{function_name: _OHLCV for function_name in [
+        "TIME_SERIES_INTRADAY", "TIME_SERIES_DAILY", "TIME_SERIES_DAILY_ADJUSTED", "TIME_SERIES_WEEKLY",
+        "TIME_SERIES_WEEKLY_ADJUSTED", "TIME_SERIES_MONTHLY", "TIME_SERIES_MONTHLY_ADJUSTED"]},
+    "GLOBAL_QUOTE": {
+        "dates": ["latestDay"],
+        "dtypes": {"symbol": "string", "volume": "int64"},
+        "percent": ["changePercent"]
+    },
+    "LISTING_STATUS": {
+        "dates": ["ipoDate", "delistingDate"],
+        "dtypes": {"symbol": "string", "name": "string", "exchange": "category", "assetType": "category",
+                   "status": "category"},
+        # "NA" is a ticker; only "null" means missing
+        "read_kwargs": {"keep_default_na": False, "na_values": ["null", ""]}
+    },
+    "EARNINGS_CALENDAR": {
+        "dates": ["reportDate", "fiscalDateEnding"],
+        "dtypes": {"symbol": "string", "name": "string", "estimate": "float64", "currency": "category"},
+        "read_kwargs": {"keep_default_na": False, "na_values": ["null", ""]}
+    },
+    "IPO_CALENDAR": {
+        "dates": ["ipoDate"],
+        "dtypes": {"symbol": "string", "name": "string", "currency": "category", "exchange": "category"},
+        "read_kwargs": {"keep_default_na": False, "na_values": ["null", ""]}
+    },
+    "SYMBOL_SEARCH": {
+        "dtypes": {"symbol": "string", "name": "string", "type": "category", "region": "category",
+                   "timezone": "category", "currency": "category", "matchScore": "float64"},
+        "read_kwargs": {"keep_default_na": False, "na_values": [""]}
+    },
+    # Economic series mark missing observations with "."
+    **{function_name: {"dates": ["timestamp"], "dtypes": {"value": "float64"}, "read_kwargs": {"na_values": ["."]}}
+       for function_name in ["WTI", "BRENT", "NATURAL_GAS", "COPPER", "ALUMINUM", "WHEAT", "CORN", "COTTON",
+                             "SUGAR", "COFFEE", "ALL_COMMODITIES", "REAL_GDP", "REAL_GDP_PER_CAPITA"]},
+    # Technical indicators: "time" plus one float column per output
+    **{function_name: {"dates": ["time"]} for function_name in ["ADX", "WILLR", "ATR", "CCI", "SMA", "EMA", "WMA",
+                                                                "RSI", "MOM", "ROC", "BBANDS", "MACD", "OBV"]}
+}
+
+# OVERVIEW is JSON with every value as a string; these fields stay text,
+# dates are parsed and everything else is numeric ("None" / "-" become NaN)
+OVERVIEW_TEXT = ["Symbol", "AssetType", "Name", "Description", "CIK", "Exchange", "Currency", "Country",
+                 "Sector", "Industry", "Address", "OfficialSite", "FiscalYearEnd"]
+OVERVIEW_CATEGORIES = ["AssetType", "Exchange", "Currency", "Country", "Sector", "Industry", "FiscalYearEnd"]
+OVERVIEW_DATES = ["LatestQuarter", "DividendDate", "ExDividendDate"]
+
+
+def _csv_columns(content):
+    end = content.find(b"\n")
+    header = content if end < 0 else content[:end]
+    return [column.strip().strip('"') for column in header.decode("utf-8", "replace").split(",")]
+
+
+def read_csv_typed(content, schema, float32_prices=None, date_index=False):
+    """
+    Parse a CSV body with a schema's explicit dtypes.
+
+    Args:
+        content: Raw response bytes
+        schema: SCHEMAS entry (dates, dtypes, percent, read_kwargs)
+        float32_prices: Price columns as float32 (defaults to PARSE_CONFIG)
+        date_index: Use the schema's first date column as a DatetimeIndex
+                    (off by default; the store and timeseries expect it as a column)
+
+    Returns:
+        pandas.DataFrame; columns the schema doesn't know are left to inference
+    """
+    import pandas as pd
+
+    if float32_prices is None:
+        float32_prices = PARSE_CONFIG["float32_prices"]
+    columns = set(_csv_columns(content))
+    price_dtype = "float32" if float32_prices else "float64"
+    dtype = {column: price_dtype for column in PRICE_COLUMNS if column in columns}
+    dtype.update({column: kind for column, kind in schema.get("dtypes", {}).items() if column in columns})
+    dtype.update({column: "string" for column in schema.get("percent", []) if column in columns})
+    read_kwargs = schema.get("read_kwargs", {})
+
+    try:
+        df = read_csv_bytes(content, dtype=dtype, **read_kwargs)
+    except (ValueError, TypeError):
+        # Missing values in an integer column: fall back to nullable integers
+        dtype = {column: "Int64" if kind == "int64" else kind for column, kind in dtype.items()}
+        df = read_csv_bytes(content, dtype=dtype, **read_kwargs)
+
+    for column in schema.get("percent", []):
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column].str.rstrip("%"), errors="coerce")
+    for column in schema.get("dates", []):
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], format="ISO8601", errors="coerce")
+    dates = [column for column in schema.get("dates", []) if column in df.columns]
+    if date_index and dates:
+        df = df.set_index(dates[0])
+    return df
+
+
+def coerce_overview(payload):
+    """OVERVIEW payload with numbers and dates converted (missing markers become None)."""
+    from datetime import date
+
+    if not isinstance(payload, dict) or "Symbol" not in payload:
+        return payload
+    typed = {}
+    for field, value in payload.items():
+        if field in OVERVIEW_TEXT or not isinstance(value, str):
+            typed[field] = value
+        elif value in ("None", "-", ""):
+            typed[field] = None
+        elif field in OVERVIEW_DATES:
+            try:
+                typed[field] = date.fromisoformat(value)
+            except ValueError:
+                typed[field] = None
+        else:
+            try:
+                typed[field] = float(value)
+            except ValueError:
+                typed[field] = value
+    return typed
+
+
+def overview_frame(payloads):
+    """
+    One typed row per OVERVIEW payload: categoricals for low-cardinality
+    text, datetimes for dates, float64 for every numeric field.
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame([coerce_overview(payload) for payload in payloads])
+    for column in frame.columns:
+        if column in OVERVIEW_CATEGORIES:
+            frame[column] = frame[column].astype("category")
+        elif column in OVERVIEW_DATES:
+            frame[column] = pd.to_datetime(frame[column])
+        elif column in OVERVIEW_TEXT:
+            frame[column] = frame[column].astype("string")
+        else:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce").astype("float64")
+    return frame
+
+
+JSON_SCHEMAS = {
+    "OVERVIEW": coerce_overview
+}
+
+
+PARSERS = {
+    "csv": read_csv_bytes,
+    "json": read_json_bytes
+}
+
+
+def parse_content(content, response_format, function_name=None):
+    """
+    Parse a response body with the parser registered for its format,
+    applying the function's schema when one is registered.
+
+    Args:
+        content: Raw response bytes
+        response_format: "csv" or "json"
+        function_name: e.g., "TIME_SERIES_DAILY" (None parses without a schema)
+
+    Returns:
+        DataFrame for csv, decoded JSON object for json
+    """
+    if response_format not in PARSERS:
+        raise ValueError(f"Unknown response format: {response_format}")
+    if response_format == "csv" and function_name in SCHEMAS:
+        return read_csv_typed(content, SCHEMAS[function_name])
+    parsed = PARSERS[response_format](content)
+    if response_format == "json" and function_name in JSON_SCHEMAS:
+        return JSON_SCHEMAS[function_name](parsed)
+    return parsed
@@ -0,0 +1,234 @@
+"""
+Client-side quota scheduling.
+Token buckets per API key and per function pace calls to the provider's
+limits; callers wait in a priority queue until budget is available so calls
+are never spent on throttled responses.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+from common.api_config import API_CONFIGS
+from common.errors import RateLimitError
+
+DEFAULT_PRIORITY = 5
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens and refills
+    continuously at `capacity / period` tokens per second.
+    """
+
+    def __init__(self, capacity, period, clock=time.monotonic):
+        if capacity <= 0 or period <= 0:
+            raise ValueError(f"Invalid bucket capacity ({capacity}) or period ({period})")
+        self.capacity = float(capacity)
+        self.rate = capacity / period
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until_available(self, tokens=1):
+        """Seconds until `tokens` can be consumed (0 if available now)."""
+        self._refill()
+        if self.tokens >= tokens:
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    def consume(self, tokens=1):
+        self._refill()
+        self.tokens -= tokens
+
+    def drain(self):
+        """Empty the bucket, e.g. after the provider reports we are throttled."""
+        self._refill()
+        self.tokens = 0.0
+
+
+class Hold:
+    """
+    A pause on a key: behaves like a bucket that has no budget until a
+    deadline, then unlimited budget. Used to wait out a provider's quota
+    window without spending tokens.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.until = clock()
+        self.fail_fast = False
+
+    def extend(self, seconds, fail_fast=False):
+        now = self.clock()
+        if self.until <= now:
+            self.fail_fast = False
+        self.until = max(self.until, now + seconds)
+        self.fail_fast = self.fail_fast or fail_fast
+
+    def exhausted(self):
+        """True while a fail-fast hold (e.g. a spent daily quota) is in effect."""
+        return self.fail_fast and self.time_until_available() > 0
+
+    def time_until_available(self, tokens=1):
+        return max(0.0, self.until - self.clock())
+
+    def consume(self, tokens=1):
+        pass
+
+
+def _buckets_from_quota(quota, clock):
+    """Turn a {"per_minute": n, "per_day": m} quota into token buckets."""
+    buckets = []
+    if quota.get("per_minute"):
+        buckets.append(TokenBucket(quota["per_minute"], 60, clock))
+    if quota.get("per_day"):
+        buckets.append(TokenBucket(quota["per_day"], 86400, clock))
+    return buckets
+
+
+class QuotaScheduler:
+    """
+    Hands out call permits in priority order within the configured quotas.
+
+    Quotas come from API_CONFIGS: the API-level "quotas" entry applies to
+    each API key, and a function-level "quota" entry adds a separate limit
+    for that function. Per-key overrides are set with set_key_quota().
+    Lower priority numbers are served first.
+    """
+
+    def __init__(self, configs=API_CONFIGS, clock=time.monotonic):
+        self.configs = configs
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._key_quotas = {}
+        self._buckets = {}
+        self._holds = {}
+
+    def set_key_quota(self, api_name, api_key, per_minute=None, per_day=None):
+        """Override the quota for one API key (e.g. a premium key)."""
+        with self._cond:
+            self._key_quotas[(api_name, api_key)] = {"per_minute": per_minute, "per_day": per_day}
+            self._buckets.pop(("key", api_name, api_key), None)
+            self._cond.notify_all()
+
+    def _get_buckets(self, api_name, function_name, api_key):
+        api_config = self.configs[api_name]
+        key_scope = ("key", api_name, api_key)
+        if key_scope not in self._buckets:
+            quota = self._key_quotas.get((api_name, api_key), api_config.get("quotas", {}))
+            self._buckets[key_scope] = _buckets_from_quota(quota, self.clock)
+
+        function_scope = ("function", api_name, api_key, function_name)
+        if function_scope not in self._buckets:
+            quota = api_config["functions"][function_name].get("quota", {})
+            self._buckets[function_scope] = _buckets_from_quota(quota, self.clock)
+
+        hold = self._holds.setdefault((api_name, api_key), Hold(self.clock))
+        return self._buckets[key_scope] + [hold] + self._buckets[function_scope]
+
+    def get_priority(self, api_name, function_name):
+        """Priority configured for a function (lower runs first)."""
+        return self.configs[api_name]["functions"][function_name].get("priority", DEFAULT_PRIORITY)
+
+    def acquire(self, api_name, function_name, api_key, priority=None, timeout=None):
+        """
+        Block until one call of `function_name` fits within every quota.
+
+        Args:
+            api_name: e.g., "alpha_vantage"
+            function_name: e.g., "GLOBAL_QUOTE"
+            api_key: Key whose quota the call counts against
+            priority: Overrides the function's configured priority
+            timeout: Give up after this many seconds (None waits forever)
+
+        Raises:
+            TimeoutError: If no budget became available within timeout
+            common.errors.RateLimitError: The key's daily quota is spent
+                (see penalize with fail_fast); raised at once, not after the wait
+        """
+        if priority is None:
+            priority = self.get_priority(api_name, function_name)
+        deadline = None if timeout is None else self.clock() + timeout
+
+        with self._cond:
+            buckets = self._get_buckets(api_name, function_name, api_key)
+            entry = [priority, next(self._sequence), buckets]
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    for bucket in entry[2]:
+                        if isinstance(bucket, Hold) and bucket.exhausted():
+                            raise RateLimitError(
+                                f"Quota for this key is exhausted for another {bucket.time_until_available():.0f}s",
+                                function_name, window="day", retry_after=bucket.time_until_available())
+                    wait = self._next_turn(entry)
+                    if wait == 0:
+                        for bucket in entry[2]:
+                            bucket.consume()
+                        return
+                    if deadline is not None:
+                        remaining = deadline - self.clock()
+                        if remaining <= 0:
+                            raise TimeoutError(f"No quota available for {function_name} within {timeout}s")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def _next_turn(self, entry):
+        """
+        0 if `entry` may go now, otherwise how long to sleep (None = until notified).
+        The first waiter in priority order whose buckets all have budget goes
+        next, so a high-priority call blocked only on its own function quota
+        does not hold up everyone sharing the key quota.
+        """
+        for waiter in sorted(self._waiting):
+            if all(bucket.time_until_available() == 0 for bucket in waiter[2]):
+                return 0 if waiter is entry else None
+            if waiter is entry:
+                return max(bucket.time_until_available() for bucket in entry[2])
+        return None
+
+    def penalize(self, api_name, api_key, delay=None, fail_fast=False):
+        """
+        Back off after the provider says we are throttled.
+
+        Args:
+            api_name: e.g., "alpha_vantage"
+            api_key: Throttled key
+            delay: Hold every call on the key for this many seconds; without
+                   it the key's buckets are drained instead
+            fail_fast: Calls on the key raise RateLimitError until the hold
+                       ends instead of waiting it out (for a spent daily quota)
+        """
+        with self._cond:
+            if delay:
+                self._holds.setdefault((api_name, api_key), Hold(self.clock)).extend(delay, fail_fast)
+            else:
+                for bucket in self._buckets.get(("key", api_name, api_key), []):
+                    bucket.drain()
+            self._cond.notify_all()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the process-wide scheduler shared by all fetches."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = QuotaScheduler()
+    return _scheduler
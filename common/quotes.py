@@ -0,0 +1,144 @@
+"""
+Watchlist quotes.
+Symbols are packed into REALTIME_BULK_QUOTES calls (up to the endpoint's
+per-call symbol limit) that run concurrently, so refreshing N symbols costs
+about N / 100 calls instead of N. When the key is told the endpoint is
+premium-only, the affected symbols fall back to one GLOBAL_QUOTE call each
+and later calls on that key skip bulk quotes; a bulk answer without data
+falls back for that batch only. Other failures (rate limits, network
+errors) leave NaN rows rather than multiplying the calls while the key is
+throttled.
+"""
+import threading
+
+import pandas as pd
+
+from common.api_config import API_CONFIGS
+from common.batch import Job, run_batch
+from common.errors import PremiumError
+
+QUOTE_COLUMNS = ["symbol", "timestamp", "open", "high", "low", "close", "volume",
+                 "previous_close", "change", "change_percent", "source"]
+NUMERIC_COLUMNS = ["open", "high", "low", "close", "volume", "previous_close", "change", "change_percent"]
+
+# GLOBAL_QUOTE JSON fields -> quote table columns
+GLOBAL_QUOTE_FIELDS = {
+    "01. symbol": "symbol",
+    "02. open": "open",
+    "03. high": "high",
+    "04. low": "low",
+    "05. price": "close",
+    "06. volume": "volume",
+    "07. latest trading day": "timestamp",
+    "08. previous close": "previous_close",
+    "09. change": "change",
+    "10. change percent": "change_percent"
+}
+
+# Keys told bulk quotes are premium-only; they go straight to GLOBAL_QUOTE
+_bulk_unavailable = set()
+_bulk_lock = threading.Lock()
+
+
+def bulk_limit(api_name="alpha_vantage"):
+    """Symbols allowed per REALTIME_BULK_QUOTES call."""
+    return API_CONFIGS[api_name]["functions"]["REALTIME_BULK_QUOTES"]["max_symbols"]
+
+
+def chunk(symbols, size):
+    """Split symbols into consecutive lists of at most size."""
+    return [symbols[start:start + size] for start in range(0, len(symbols), size)]
+
+
+def _bulk_rows(payload):
+    """Quote rows from a bulk response, or None if the response carries no data."""
+    data = payload.get("data") if isinstance(payload, dict) else None
+    if not isinstance(data, list):
+        return None
+    return [{**{column: row.get(column) for column in QUOTE_COLUMNS}, "source": "bulk"} for row in data]
+
+
+def _global_quote_row(payload):
+    quote = payload.get("Global Quote") if isinstance(payload, dict) else None
+    if not quote:
+        return None
+    row = {column: quote.get(field) for field, column in GLOBAL_QUOTE_FIELDS.items()}
+    return {**row, "source": "global_quote"}
+
+
+def to_table(rows, symbols):
+    """Columnar quote table with one row per requested symbol (NaN where no quote came back)."""
+    frame = pd.DataFrame(rows, columns=QUOTE_COLUMNS).drop_duplicates("symbol", keep="last")
+    frame = frame.set_index("symbol").reindex(symbols).rename_axis("symbol").reset_index()
+    frame["change_percent"] = frame["change_percent"].astype("string").str.rstrip("%")
+    for column in NUMERIC_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").astype("float64")
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], errors="coerce")
+    return frame
+
+
+def get_quotes(symbols, api_key, api_name="alpha_vantage", batch_size=None, max_in_flight=None, failed=None):
+    """
+    Latest quotes for any number of symbols.
+
+    Args:
+        symbols: Iterable of symbols (duplicates are fetched once)
+        api_key: API key to use
+        api_name: e.g., "alpha_vantage"
+        batch_size: Symbols per bulk call (defaults to the endpoint's limit)
+        max_in_flight: Concurrent requests (defaults to the client's pool size)
+        failed: Optional list that collects (symbols, error) for calls that
+            failed; their symbols get NaN rows
+
+    Returns:
+        DataFrame with QUOTE_COLUMNS, one row per symbol in request order;
+        "source" tells whether a row came from a bulk or a GLOBAL_QUOTE call
+    """
+    symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols))
+    batch_size = min(batch_size or bulk_limit(api_name), bulk_limit(api_name))
+    rows, fallback = [], []
+
+    if api_key in _bulk_unavailable:
+        fallback = symbols
+    else:
+        jobs = [Job("REALTIME_BULK_QUOTES", {"symbol": ",".join(batch), "datatype": "json"})
+                for batch in chunk(symbols, batch_size)]
+        for result in run_batch(jobs, api_key, api_name, max_in_flight):
+            batch_symbols = result.job.params["symbol"].split(",")
+            if result.error is not None and not isinstance(result.error, PremiumError):
+                if failed is not None:
+                    failed.append((batch_symbols, result.error))
+                continue
+            if result.error is not None:
+                # Premium notice: bulk isn't enabled for this key
+                fallback.extend(batch_symbols)
+                with _bulk_lock:
+                    _bulk_unavailable.add(api_key)
+                continue
+            batch_rows = _bulk_rows(result.response.parse())
+            if batch_rows is None:
+                # An answer without data may be a one-off; only this batch falls back
+                fallback.extend(batch_symbols)
+                continue
+            rows.extend(batch_rows)
+
+    if fallback:
+        jobs = [Job("GLOBAL_QUOTE", {"symbol": symbol, "datatype": "json"}) for symbol in fallback]
+        for result in run_batch(jobs, api_key, api_name, max_in_flight):
+            if result.error is not None:
+                if failed is not None:
+                    failed.append(([result.job.params["symbol"]], result.error))
+                continue
+            row = _global_quote_row(result.response.parse())
+            if row is not None:
+                rows.append(row)
+
+    return to_table(rows, symbols)
+
+
+# Example usage:
+if __name__ == "__main__":
+    from common.api_config import get_api_key
+
+    watchlist = ["NVDA", "MSFT", "AAPL", "GOOGL", "AMZN", "META", "TSLA"]
+    print(get_quotes(watchlist, get_api_key()).to_string(index=False))
@@ -0,0 +1,292 @@
+"""
+Local stand-in for the Alpha Vantage endpoint.
+Serves recorded payloads (by default the files under alpha-vantage/examples/)
+keyed by function and symbol, with configurable latency, bandwidth and
+concurrency caps, and per-key quotas that answer with the same "Note" /
+"Information" bodies the real API sends. Point the client at it with
+ALPHAVANTAGE_BASE_URL or api_config.set_base_url().
+
+Usage:
+    python -m common.replay_server --port 8765 --latency 0.05 --per-minute 5
+    ALPHAVANTAGE_BASE_URL=http://127.0.0.1:8765/query python main.py jobs.example.yaml
+"""
+import argparse
+import collections
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+from common.api_config import API_CONFIGS, set_base_url
+from common.errors import MAX_MESSAGE_BYTES, MESSAGE_FIELDS
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "alpha-vantage" / "examples"
+
+# Recorded files whose names don't start with the function they answer
+FILE_ALIASES = {"news_sentiment_data": "NEWS_SENTIMENT"}
+
+CONTENT_TYPES = {"csv": "application/x-download", "json": "application/json"}
+
+MINUTE_NOTE = ("Thank you for using Alpha Vantage! Our standard API rate limit is {limit} requests per minute. "
+               "Please subscribe to any of the premium plans at https://www.alphavantage.co/premium/ "
+               "to instantly remove all daily rate limits.")
+DAY_INFORMATION = ("We have detected your API key as {key} and our standard API rate limit is {limit} "
+                   "requests per day. Please subscribe to any of the premium plans at "
+                   "https://www.alphavantage.co/premium/ to instantly remove all daily rate limits.")
+
+REPLAY_CONFIG = {
+    "latency": 0.0,          # seconds before the first byte; a (low, high) pair is drawn uniformly
+    "bandwidth": None,       # bytes per second per response (None = unthrottled)
+    "max_concurrent": None,  # responses served at once; further requests queue (None = unlimited)
+    "per_minute": None,      # calls per API key per minute before a "Note" (None = unlimited)
+    "per_day": None          # calls per API key per day before an "Information" (None = unlimited)
+}
+
+
+def parse_fixture_name(stem, function_names):
+    """
+    (function, symbol) from a recorded file name such as
+    "TIME_SERIES_DAILY_NVDA_compact" or "LISTING_STATUS"; None if unknown.
+    """
+    stem = FILE_ALIASES.get(stem, stem)
+    for function_name in function_names:
+        if stem == function_name or stem.startswith(function_name + "_"):
+            rest = [part for part in stem[len(function_name) + 1:].split("_") if part not in ("", "compact", "full")]
+            return function_name, rest[0] if rest else None
+    return None
+
+
+def recorded_message(body):
+    """
+    The message field ("Error Message", "Note", "Information") a recorded
+    body holds instead of data, or None. Also catches messages that were
+    saved through pandas as CSV, with the JSON quoted into cells.
+    """
+    if len(body) > MAX_MESSAGE_BYTES:
+        return None
+    text = body.decode("utf-8", "replace").replace('""', '"')
+    return next((field for field in MESSAGE_FIELDS if f'"{field}":' in text), None)
+
+
+class FixtureSet:
+    """
+    Recorded bodies keyed by (function, symbol, format).
+
+    Lookups fall back from the exact symbol to a symbol-less fixture and
+    then to any symbol of the same function, so one recording can answer
+    a whole universe.
+    """
+
+    def __init__(self):
+        self._bodies = {}
+        self._by_function = collections.defaultdict(list)
+
+    def add(self, function_name, symbol, body, response_format):
+        """Register a body (bytes, or a dict/list that is JSON-encoded)."""
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        key = (function_name, symbol, response_format)
+        if key not in self._bodies:
+            self._by_function[(function_name, response_format)].append(key)
+        self._bodies[key] = body
+
+    def add_directory(self, directory, api_name="alpha_vantage"):
+        """
+        Register every *.csv / *.json file under directory whose name maps to
+        a function. Recorded error / quota messages are skipped, so those
+        requests fall back to another recording or get an "Error Message".
+        """
+        # Longest names first so TIME_SERIES_DAILY_ADJUSTED wins over TIME_SERIES_DAILY
+        function_names = sorted(API_CONFIGS[api_name]["functions"], key=len, reverse=True)
+        for path in sorted(Path(directory).rglob("*")):
+            if path.suffix not in (".csv", ".json"):
+                continue
+            parsed = parse_fixture_name(path.stem, function_names)
+            if parsed is None or path.stat().st_size <= 1:
+                continue
+            body = path.read_bytes()
+            if recorded_message(body) is None:
+                self.add(parsed[0], parsed[1], body, path.suffix[1:])
+        return self
+
+    def get(self, function_name, symbol, response_format):
+        """Body for a request, or None if nothing was recorded for the function and format."""
+        for key in ((function_name, symbol, response_format), (function_name, None, response_format)):
+            if key in self._bodies:
+                return self._bodies[key]
+        keys = self._by_function.get((function_name, response_format))
+        return self._bodies[keys[0]] if keys else None
+
+    def __len__(self):
+        return len(self._bodies)
+
+
+class _Quota:
+    """Per-key call counters for the minute and day windows."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._minute = collections.defaultdict(collections.deque)
+        self._day = collections.defaultdict(collections.deque)
+
+    def check(self, api_key, per_minute, per_day):
+        """Record a call; returns the quota message body if it is over a limit."""
+        now = time.monotonic()
+        with self._lock:
+            for calls, window in ((self._day[api_key], 86400), (self._minute[api_key], 60)):
+                while calls and calls[0] <= now - window:
+                    calls.popleft()
+            if per_day is not None and len(self._day[api_key]) >= per_day:
+                return {"Information": DAY_INFORMATION.format(key=api_key, limit=per_day)}
+            if per_minute is not None and len(self._minute[api_key]) >= per_minute:
+                return {"Note": MINUTE_NOTE.format(limit=per_minute)}
+            self._day[api_key].append(now)
+            self._minute[api_key].append(now)
+        return None
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering /query?function=...&symbol=... from fixtures.
+
+    Args:
+        fixtures: FixtureSet to serve (defaults to alpha-vantage/examples)
+        host, port: Address to bind (port 0 picks a free port)
+        **settings: Any keys of REPLAY_CONFIG
+    """
+    daemon_threads = True
+
+    def __init__(self, fixtures=None, host="127.0.0.1", port=0, **settings):
+        unknown = set(settings) - set(REPLAY_CONFIG)
+        if unknown:
+            raise ValueError(f"Unknown replay settings: {sorted(unknown)}")
+        self.fixtures = fixtures if fixtures is not None else FixtureSet().add_directory(EXAMPLES_DIR)
+        self.settings = {**REPLAY_CONFIG, **settings}
+        self.quota = _Quota()
+        self.slots = threading.BoundedSemaphore(self.settings["max_concurrent"]) \
+            if self.settings["max_concurrent"] else None
+        super().__init__((host, port), _ReplayHandler)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/query"
+
+    def start(self):
+        """Serve in a background daemon thread; returns self."""
+        threading.Thread(target=self.serve_forever, name="replay-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40 ms to small responses on keep-alive connections
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        settings = server.settings
+        params = dict(parse_qsl(urlsplit(self.path).query))
+        if server.slots is not None:
+            server.slots.acquire()
+        try:
+            latency = settings["latency"]
+            delay = random.uniform(*latency) if isinstance(latency, (tuple, list)) else latency
+            if delay:
+                time.sleep(delay)
+            body, response_format = self._body(params)
+            self._send(body, response_format, settings["bandwidth"])
+        finally:
+            if server.slots is not None:
+                server.slots.release()
+
+    def _body(self, params):
+        function_name = params.get("function")
+        response_format = params.get("datatype", "json")
+        if function_name in API_CONFIGS["alpha_vantage"]["functions"]:
+            response_format = params.get("datatype", API_CONFIGS["alpha_vantage"]["functions"][function_name]
+                                         .get("response_format", "json"))
+        message = self.server.quota.check(params.get("apikey"), self.server.settings["per_minute"],
+                                          self.server.settings["per_day"])
+        if message is not None:
+            return json.dumps(message).encode(), "json"
+        symbol = params.get("symbol") or params.get("tickers") or params.get("keywords")
+        body = self.server.fixtures.get(function_name, symbol, response_format)
+        if body is None:
+            error = {"Error Message": f"Invalid API call. No recorded {response_format} payload for {function_name}."}
+            return json.dumps(error).encode(), "json"
+        return body, response_format
+
+    def _send(self, body, response_format, bandwidth):
+        # The real API answers quota and error messages with 200 as well
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[response_format])
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not bandwidth:
+            self.wfile.write(body)
+            return
+        chunk_size = max(1, int(bandwidth) // 20)
+        for start in range(0, len(body), chunk_size):
+            self.wfile.write(body[start:start + chunk_size])
+            time.sleep(chunk_size / bandwidth)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def replay(fixtures=None, api_name="alpha_vantage", **settings):
+    """
+    Run a replay server for the duration of a with-block, with the API's
+    base URL pointed at it.
+
+    Example:
+        with replay(latency=0.05, per_minute=5) as server:
+            fetch_function("alpha_vantage", "GLOBAL_QUOTE", "demo", datatype="csv")
+    """
+    server = ReplayServer(fixtures, **settings).start()
+    previous = set_base_url(api_name, server.base_url)
+    try:
+        yield server
+    finally:
+        set_base_url(api_name, previous)
+        server.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve recorded API payloads locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=str(EXAMPLES_DIR), help="Folder of recorded payloads")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response")
+    parser.add_argument("--bandwidth", type=int, help="Bytes per second per response")
+    parser.add_argument("--max-concurrent", type=int, help="Responses served at once")
+    parser.add_argument("--per-minute", type=int, help="Calls per key per minute before a Note")
+    parser.add_argument("--per-day", type=int, help="Calls per key per day before an Information message")
+    args = parser.parse_args(argv)
+
+    fixtures = FixtureSet().add_directory(args.fixtures)
+    server = ReplayServer(fixtures, args.host, args.port, latency=args.latency, bandwidth=args.bandwidth,
+                          max_concurrent=args.max_concurrent, per_minute=args.per_minute, per_day=args.per_day)
+    print(f"Serving {len(fixtures)} recorded payloads at {server.base_url}")
+    print(f"export ALPHAVANTAGE_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
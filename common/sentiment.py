@@ -0,0 +1,172 @@
+"""
+Vectorized aggregation of NEWS_SENTIMENT feeds.
+The feed is flattened into columnar frames in a single pass (one row per
+article, one row per article-ticker mention), and daily statistics are
+computed with grouped pandas operations instead of per-article loops.
+"""
+import pandas as pd
+
+LABELS = {"Bullish": "bullish_mentions", "Bearish": "bearish_mentions", "Neutral": "neutral_mentions"}
+
+
+def flatten_feed(articles, tickers=None):
+    """
+    Flatten articles into an article frame and a ticker-mention frame.
+
+    Args:
+        articles: Iterable of feed articles (a list or a streaming generator)
+        tickers: Only keep mentions of these tickers (None keeps all)
+
+    Returns:
+        (articles_df, mentions_df)
+        articles_df: date, time_published, url, title, source,
+                     overall_sentiment_score, overall_sentiment_label
+        mentions_df: date, time_published, url, ticker, ticker_sentiment_score,
+                     relevance_score, ticker_sentiment_label
+    """
+    tickers = set(tickers) if tickers is not None else None
+    article_cols = {key: [] for key in ["time_published", "url", "title", "source",
+                                        "overall_sentiment_score", "overall_sentiment_label"]}
+    mention_cols = {key: [] for key in ["time_published", "url", "ticker", "ticker_sentiment_score",
+                                        "relevance_score", "ticker_sentiment_label"]}
+
+    for article in articles:
+        published, url = article["time_published"], article["url"]
+        article_cols["time_published"].append(published)
+        article_cols["url"].append(url)
+        article_cols["title"].append(article.get("title"))
+        article_cols["source"].append(article.get("source"))
+        article_cols["overall_sentiment_score"].append(article["overall_sentiment_score"])
+        article_cols["overall_sentiment_label"].append(article["overall_sentiment_label"])
+        for mention in article["ticker_sentiment"]:
+            if tickers is not None and mention["ticker"] not in tickers:
+                continue
+            mention_cols["time_published"].append(published)
+            mention_cols["url"].append(url)
+            mention_cols["ticker"].append(mention["ticker"])
+            mention_cols["ticker_sentiment_score"].append(mention["ticker_sentiment_score"])
+            mention_cols["relevance_score"].append(mention["relevance_score"])
+            mention_cols["ticker_sentiment_label"].append(mention["ticker_sentiment_label"])
+
+    articles_df = _finish(pd.DataFrame(article_cols), ["overall_sentiment_score"], ["source", "overall_sentiment_label"])
+    mentions_df = _finish(pd.DataFrame(mention_cols), ["ticker_sentiment_score", "relevance_score"],
+                          ["ticker", "ticker_sentiment_label"])
+    return articles_df, mentions_df
+
+
+def _finish(df, numeric_columns, category_columns):
+    """Vectorized type conversion: dates, float scores, categorical labels."""
+    df.insert(0, "date", pd.to_datetime(df["time_published"].str[:8], format="%Y%m%d"))
+    for column in numeric_columns:
+        df[column] = pd.to_numeric(df[column]).astype("float64")
+    for column in category_columns:
+        df[column] = df[column].astype("category")
+    return df
+
+
+SUM_COLUMNS = ["article_count", "score", "relevance", "weighted", *LABELS.values()]
+
+
+def daily_sums(mentions_df):
+    """
+    Additive per-(date, ticker) sums behind the daily statistics: mention
+    count, score, relevance, score * relevance and label counts. Sums from
+    different batches of articles can simply be added together.
+    """
+    if mentions_df.empty:
+        index = pd.MultiIndex.from_arrays([pd.DatetimeIndex([]), pd.Index([], dtype=object)], names=["date", "ticker"])
+        return pd.DataFrame({column: pd.Series(dtype="float64") for column in SUM_COLUMNS}, index=index)
+
+    score = mentions_df["ticker_sentiment_score"]
+    relevance = mentions_df["relevance_score"]
+    labels = mentions_df["ticker_sentiment_label"]
+    frame = pd.DataFrame({
+        "date": mentions_df["date"],
+        "ticker": mentions_df["ticker"].astype(str),
+        "score": score,
+        "relevance": relevance,
+        "weighted": score * relevance,
+        **{column: (labels == label).astype("int64") for label, column in LABELS.items()}
+    })
+    return frame.groupby(["date", "ticker"], sort=True).agg(
+        article_count=("score", "size"),
+        score=("score", "sum"),
+        relevance=("relevance", "sum"),
+        weighted=("weighted", "sum"),
+        **{column: (column, "sum") for column in LABELS.values()}
+    )
+
+
+def daily_ticker_sentiment(mentions_df):
+    """
+    Daily per-ticker statistics in long format.
+
+    Returns:
+        DataFrame with date, ticker, article_count, avg_sentiment_score,
+        weighted_sentiment_score (relevance-weighted), avg_relevance_score,
+        bullish/bearish/neutral_mentions and sentiment_ratio
+        ((bullish - bearish) / mentions), sorted by date and ticker
+    """
+    return finalize_daily(daily_sums(mentions_df))
+
+
+def finalize_daily(sums):
+    """
+    Turn per-(date, ticker) running sums into the published statistics.
+
+    Args:
+        sums: Frame indexed by (date, ticker) with article_count, score,
+              relevance and weighted (score * relevance) sums plus label counts
+    """
+    count = sums["article_count"]
+    avg = sums["score"] / count
+    weighted = (sums["weighted"] / sums["relevance"]).where(sums["relevance"] > 0, avg)
+    result = pd.DataFrame({
+        "article_count": count,
+        "avg_sentiment_score": avg.round(4),
+        "weighted_sentiment_score": weighted.round(4),
+        "avg_relevance_score": (sums["relevance"] / count).round(4),
+        **{column: sums[column] for column in LABELS.values()},
+        "sentiment_ratio": ((sums["bullish_mentions"] - sums["bearish_mentions"]) / count).round(4)
+    })
+    return result.reset_index()
+
+
+def daily_wide_sentiment(articles_df, mentions_df, tickers):
+    """
+    One row per day: overall market sentiment plus per-ticker columns
+    ({T}_sentiment_avg, {T}_relevance_avg, {T}_mention_count,
+    {T}_sentiment_weighted), with days lacking mentions filled with 0.
+    """
+    overall = articles_df.groupby("date").agg(
+        overall_sentiment_avg=("overall_sentiment_score", "mean"),
+        article_count=("overall_sentiment_score", "size")
+    )
+    wide = overall
+    if not mentions_df.empty:
+        frame = mentions_df[mentions_df["ticker"].isin(tickers)].assign(
+            ticker=lambda df: df["ticker"].astype(str),
+            weighted=lambda df: df["ticker_sentiment_score"] * df["relevance_score"]
+        )
+        grouped = frame.groupby(["date", "ticker"]).agg(
+            sentiment_avg=("ticker_sentiment_score", "mean"),
+            relevance_avg=("relevance_score", "mean"),
+            mention_count=("ticker_sentiment_score", "size"),
+            weighted=("weighted", "sum"),
+            relevance_sum=("relevance_score", "sum")
+        )
+        grouped["sentiment_weighted"] = (grouped["weighted"] / grouped["relevance_sum"]).where(
+            grouped["relevance_sum"] > 0, 0.0)
+        per_ticker = grouped[["sentiment_avg", "relevance_avg", "mention_count", "sentiment_weighted"]].unstack("ticker")
+        per_ticker.columns = [f"{ticker}_{stat}" for stat, ticker in per_ticker.columns]
+        wide = overall.join(per_ticker, how="left")
+
+    for ticker in tickers:
+        for stat in ["sentiment_avg", "relevance_avg", "mention_count", "sentiment_weighted"]:
+            column = f"{ticker}_{stat}"
+            wide[column] = wide[column].fillna(0) if column in wide.columns else 0.0
+        wide[f"{ticker}_mention_count"] = wide[f"{ticker}_mention_count"].astype("int64")
+    columns = ["overall_sentiment_avg", "article_count"] + [
+        f"{ticker}_{stat}" for ticker in tickers
+        for stat in ["sentiment_avg", "relevance_avg", "mention_count", "sentiment_weighted"]]
+    return wide[columns].reset_index()
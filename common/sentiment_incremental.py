@@ -0,0 +1,175 @@
+"""
+Watermark-based incremental sentiment time series.
+Keeps running sums per (date, ticker) plus the latest time_published seen,
+so each refresh only fetches and aggregates articles newer than the
+watermark (minus a look-back window that catches late-arriving articles).
+Updates cost O(new articles) and only the days they touch are recomputed.
+"""
+import itertools
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from common.news_backfill import PUBLISHED_FORMAT, iter_backfill
+from common.sentiment import SUM_COLUMNS, daily_sums, finalize_daily, flatten_feed
+
+# Up to this many tracked tickers are fetched with one filtered query each;
+# beyond that a single unfiltered query is cheaper
+MAX_SCOPED_TICKERS = 10
+
+
+class SentimentAccumulator:
+    """
+    Running per-(date, ticker) sentiment sums persisted in `directory`.
+
+    Args:
+        directory: Folder for state.json (watermark, seen URLs) and sums.parquet
+        tickers: Tickers to track (None tracks every ticker mentioned)
+        lookback: How far behind the watermark each refresh re-reads, so
+                  articles that show up late are still counted (once)
+    """
+
+    def __init__(self, directory, tickers=None, lookback=timedelta(hours=6)):
+        self.directory = Path(directory)
+        self.tickers = list(tickers) if tickers is not None else None
+        self.lookback = lookback
+        self.watermark = None
+        self.seen = {}
+        self.sums = {}
+        self._load()
+
+    def _load(self):
+        state_file = self.directory / "state.json"
+        if state_file.exists():
+            state = json.loads(state_file.read_text())
+            self.watermark = state["watermark"]
+            self.seen = state["seen"]
+        sums_file = self.directory / "sums.parquet"
+        if sums_file.exists():
+            frame = pd.read_parquet(sums_file)
+            for row in frame.itertuples(index=False):
+                self.sums[(row.date, row.ticker)] = [getattr(row, column) for column in SUM_COLUMNS]
+
+    def save(self):
+        """Persist watermark, seen URLs and running sums."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        state = {"watermark": self.watermark, "seen": self.seen}
+        (self.directory / "state.json").write_text(json.dumps(state))
+        frame = pd.DataFrame([[date, ticker, *values] for (date, ticker), values in self.sums.items()],
+                             columns=["date", "ticker", *SUM_COLUMNS])
+        frame.to_parquet(self.directory / "sums.parquet", index=False)
+
+    def update(self, articles, failed_windows=None):
+        """
+        Fold new articles into the running sums.
+        Articles already counted (same URL within the look-back window) are skipped.
+
+        Args:
+            articles: Iterable of feed articles
+            failed_windows: (start, end, error) windows the articles should have
+                covered but didn't (as collected by iter_backfill, filled in by
+                the time `articles` is exhausted); the watermark stops at the
+                earliest one so the next refresh fetches it again
+
+        Returns:
+            Sorted list of dates whose statistics changed
+        """
+        fresh, newest = [], None
+        for article in articles:
+            if newest is None or article["time_published"] > newest:
+                newest = article["time_published"]
+            if article["url"] in self.seen:
+                continue
+            self.seen[article["url"]] = article["time_published"]
+            fresh.append(article)
+        if newest is None:
+            return []
+
+        if failed_windows:
+            newest = min(newest, min(start for start, _, _ in failed_windows).strftime(PUBLISHED_FORMAT))
+        if self.watermark is None or newest > self.watermark:
+            self.watermark = newest
+        self._prune_seen()
+        if not fresh:
+            return []
+
+        _, mentions_df = flatten_feed(fresh, self.tickers)
+        touched = set()
+        for (date, ticker), values in zip(*_sum_rows(daily_sums(mentions_df))):
+            current = self.sums.get((date, ticker))
+            if current is None:
+                self.sums[(date, ticker)] = values
+            else:
+                self.sums[(date, ticker)] = [a + b for a, b in zip(current, values)]
+            touched.add(date)
+        return sorted(touched)
+
+    def _prune_seen(self):
+        # URLs older than the look-back window will never be re-fetched
+        cutoff = (datetime.strptime(self.watermark, PUBLISHED_FORMAT) - self.lookback).strftime(PUBLISHED_FORMAT)
+        self.seen = {url: published for url, published in self.seen.items() if published >= cutoff}
+
+    def refresh(self, api_key, start=None, end=None, failed_windows=None):
+        """
+        Fetch articles newer than the watermark and fold them in.
+        If some windows fail, the watermark doesn't move past the earliest of
+        them, so the next refresh retries it (articles already counted after
+        it are recognized by URL and skipped).
+
+        Args:
+            api_key: API key to use
+            start: Where to begin when there is no watermark yet (required then)
+            end: Upper bound of the fetch (defaults to now)
+            failed_windows: Optional list that collects (start, end, error) for
+                windows whose requests failed
+
+        Returns:
+            Sorted list of dates whose statistics changed
+        """
+        if self.watermark is not None:
+            start = datetime.strptime(self.watermark, PUBLISHED_FORMAT) - self.lookback
+        elif start is None:
+            raise ValueError("No watermark yet: pass start for the first refresh")
+        end = end or datetime.now()
+        if failed_windows is None:
+            failed_windows = []
+        touched = self.update(self._fetch(api_key, start, end, failed_windows), failed_windows)
+        self.save()
+        return touched
+
+    def _fetch(self, api_key, start, end, failed_windows):
+        """
+        Articles for [start, end] that can mention the tracked tickers.
+        The API's tickers filter requires every listed ticker in an article,
+        so a few tracked tickers get one filtered query each (a handful of
+        calls per window however busy the market is). Tracking every ticker,
+        or more than MAX_SCOPED_TICKERS, fetches all market news instead:
+        about one call per 1,000 articles published since the watermark
+        minus the look-back.
+        """
+        if self.tickers is not None and len(self.tickers) <= MAX_SCOPED_TICKERS:
+            return itertools.chain.from_iterable(
+                iter_backfill(api_key, start, end, tickers=ticker, failed_windows=failed_windows)
+                for ticker in self.tickers
+            )
+        return iter_backfill(api_key, start, end, failed_windows=failed_windows)
+
+    def daily(self, dates=None):
+        """
+        Daily statistics (as sentiment.daily_ticker_sentiment) from the running
+        sums, for every date or only the given ones.
+        """
+        dates = set(pd.to_datetime(dates)) if dates is not None else None
+        keys = [key for key in self.sums if dates is None or key[0] in dates]
+        index = pd.MultiIndex.from_tuples(sorted(keys), names=["date", "ticker"]) if keys else \
+            pd.MultiIndex.from_arrays([pd.DatetimeIndex([]), pd.Index([], dtype=object)], names=["date", "ticker"])
+        sums = pd.DataFrame([self.sums[key] for key in index], index=index, columns=SUM_COLUMNS)
+        counts = [column for column in SUM_COLUMNS if column not in ("score", "relevance", "weighted")]
+        return finalize_daily(sums.astype({column: "int64" for column in counts}))
+
+
+def _sum_rows(sums):
+    """(keys, value lists) from a daily_sums frame."""
+    return list(sums.index), sums[SUM_COLUMNS].to_numpy().tolist()
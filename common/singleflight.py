@@ -0,0 +1,94 @@
+"""
+Request coalescing ("single flight").
+Identical requests that are in flight at the same time share one upstream
+call: the first caller fetches, later callers (threads or asyncio tasks)
+wait for that call and get the same result, so a burst of duplicate
+requests costs one unit of quota instead of many.
+"""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    Keys should identify the request independently of who makes it, e.g.
+    cache.cache_key(), which leaves out the API key. Results are shared as
+    is, so callers must not mutate what they get back.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0   # calls that went upstream
+        self.shared = 0    # calls answered by another caller's request
+
+    def _join(self, key):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def in_flight(self):
+        """Number of distinct calls currently running."""
+        with self._lock:
+            return len(self._calls)
+
+    def run(self, key, fn):
+        """Call fn() unless a call for key is already running; then wait for and return its result."""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as error:
+            self._finish(key, future, error=error)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def run_async(self, key, fn, executor=None):
+        """
+        Async variant of run(): the leader runs fn in `executor`, waiters
+        await without holding a thread. Shares calls with run() callers.
+        """
+        import asyncio
+
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, fn)
+        except BaseException as error:
+            self._finish(key, future, error=error)
+            raise
+        self._finish(key, future, result)
+        return result
+
+
+_singleflight = None
+_singleflight_lock = threading.Lock()
+
+
+def get_singleflight():
+    """Return the process-wide coalescer shared by all fetches."""
+    global _singleflight
+    if _singleflight is None:
+        with _singleflight_lock:
+            if _singleflight is None:
+                _singleflight = SingleFlight()
+    return _singleflight
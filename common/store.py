@@ -0,0 +1,139 @@
+"""
+Columnar data store for API results.
+Each function's results are written as Parquet files partitioned by function
+and symbol (data/store/function=<F>/symbol=<S>/). Dtypes survive the round
+trip, and readers load only the columns, symbols and date range they ask for.
+"""
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+STORE_DIR = Path(os.getenv("API_EXPLORER_DATA_DIR", Path(__file__).resolve().parent.parent / "data")) / "store"
+
+# Partition used for functions that aren't keyed by symbol (e.g. LISTING_STATUS)
+ALL_SYMBOLS = "_ALL_"
+
+DATE_COLUMN = "timestamp"
+
+PARTITIONING = ds.partitioning(pa.schema([("function", pa.string()), ("symbol", pa.string())]), flavor="hive")
+
+
+def partition_path(function_name, symbol=ALL_SYMBOLS, directory=STORE_DIR):
+    return Path(directory) / f"function={function_name}" / f"symbol={symbol}"
+
+
+def list_symbols(function_name, directory=STORE_DIR):
+    """Symbols that have data stored for a function."""
+    function_dir = Path(directory) / f"function={function_name}"
+    if not function_dir.exists():
+        return []
+    return sorted(path.name.split("=", 1)[1] for path in function_dir.iterdir() if any(path.glob("*.parquet")))
+
+
+def _prepare(df, date_column):
+    df = df.drop(columns=["function", "symbol"], errors="ignore")
+    if date_column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[date_column]):
+        df = df.assign(**{date_column: pd.to_datetime(df[date_column])})
+    return df
+
+
+def write(df, function_name, symbol=ALL_SYMBOLS, mode="upsert", key_columns=None,
+          date_column=DATE_COLUMN, directory=STORE_DIR):
+    """
+    Write a frame into the function/symbol partition.
+
+    Args:
+        df: Rows to write
+        function_name: e.g., "TIME_SERIES_DAILY_ADJUSTED"
+        symbol: Partition symbol (ALL_SYMBOLS for non-symbol functions)
+        mode: "append" adds a new file, "upsert" merges on key_columns
+              (incoming rows win), "replace" overwrites the partition
+        key_columns: Columns identifying a row for upsert (defaults to the date column)
+        date_column: Column parsed to datetime so range filters work
+        directory: Store root
+
+    Returns:
+        Path of the partition folder
+    """
+    if mode not in ("append", "upsert", "replace"):
+        raise ValueError(f"Unknown write mode: {mode}")
+
+    df = _prepare(df, date_column)
+    path = partition_path(function_name, symbol, directory)
+    path.mkdir(parents=True, exist_ok=True)
+    existing = sorted(path.glob("*.parquet"))
+
+    if mode == "upsert" and existing:
+        if key_columns is None:
+            key_columns = [date_column] if date_column in df.columns else list(df.columns)
+        stored = pq.read_table(existing).to_pandas()
+        stored = stored.drop(columns=["function", "symbol"], errors="ignore")
+        df = pd.concat([stored, df], ignore_index=True).drop_duplicates(key_columns, keep="last")
+        if date_column in df.columns:
+            df = df.sort_values(date_column, ascending=False, ignore_index=True)
+
+    # Write to a new file first so readers never see a half-written partition
+    new_file = path / f"part-{time.time_ns()}.parquet"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), new_file)
+    if mode in ("upsert", "replace"):
+        for old_file in existing:
+            old_file.unlink()
+    return path
+
+
+def read(function_name, symbols=None, columns=None, start=None, end=None,
+         date_column=DATE_COLUMN, directory=STORE_DIR):
+    """
+    Load stored rows for a function.
+
+    Args:
+        function_name: e.g., "TIME_SERIES_DAILY_ADJUSTED"
+        symbols: Symbols to load (None = every stored symbol)
+        columns: Columns to load (None = all); "symbol" is always included
+        start, end: Inclusive date range on date_column (None = unbounded)
+        date_column: Column used for the date range
+        directory: Store root
+
+    Returns:
+        DataFrame with a "symbol" column, or an empty DataFrame if nothing is stored
+    """
+    if symbols is None:
+        symbols = list_symbols(function_name, directory)
+    files = [str(file) for symbol in symbols
+             for file in sorted(partition_path(function_name, symbol, directory).glob("*.parquet"))]
+    if not files:
+        return pd.DataFrame()
+
+    dataset = ds.dataset(files, format="parquet", partitioning=PARTITIONING, partition_base_dir=str(directory))
+    schema = pa.unify_schemas([fragment.physical_schema for fragment in dataset.get_fragments()],
+                              promote_options="permissive")
+    dataset = ds.dataset(files, schema=schema.append(pa.field("symbol", pa.string())), format="parquet",
+                         partitioning=PARTITIONING, partition_base_dir=str(directory))
+
+    expression = None
+    if start is not None:
+        expression = ds.field(date_column) >= pd.Timestamp(start)
+    if end is not None:
+        upper = ds.field(date_column) <= pd.Timestamp(end)
+        expression = upper if expression is None else expression & upper
+
+    if columns is not None:
+        columns = ["symbol"] + [column for column in columns if column != "symbol"]
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+def read_panel(function_name, value_column, symbols=None, start=None, end=None,
+               date_column=DATE_COLUMN, directory=STORE_DIR):
+    """
+    Load one column for many symbols as a wide date x symbol panel.
+    """
+    df = read(function_name, symbols, columns=[date_column, value_column], start=start, end=end,
+              date_column=date_column, directory=directory)
+    if df.empty:
+        return df
+    return df.pivot(index=date_column, columns="symbol", values=value_column).sort_index()
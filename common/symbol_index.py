@@ -0,0 +1,380 @@
+"""
+Offline symbol search over the LISTING_STATUS universe.
+Replaces a SYMBOL_SEARCH call per lookup with an in-memory index: symbol
+prefix matching, token matching on company names and a fuzzy fallback for
+misspelled names, with exchange / asset type / status filters. The index is
+saved in a compact binary file that loads in a few milliseconds and is
+rebuilt from LISTING_STATUS once it is older than its TTL.
+"""
+import array
+import bisect
+import csv
+import difflib
+import io
+import json
+import os
+import re
+import struct
+import time
+import zlib
+from collections import namedtuple
+from pathlib import Path
+
+INDEX_PATH = Path(os.getenv("API_EXPLORER_DATA_DIR", Path(__file__).resolve().parent.parent / "data")) \
+    / "symbol_index.bin"
+INDEX_TTL = 86400
+
+MAGIC = b"AVSYMIDX1"
+CATEGORIES = ["exchange", "asset_type", "status"]
+# LISTING_STATUS column -> index field
+LISTING_COLUMNS = {"symbol": "symbol", "name": "name", "exchange": "exchange",
+                   "assetType": "asset_type", "status": "status"}
+
+SCORE_EXACT = 1.0
+SCORE_SYMBOL_PREFIX = 0.9
+SCORE_NAME = 0.8
+SCORE_FUZZY = 0.6
+
+# Single-token name queries up to this long match a large part of the universe;
+# they walk a ranking computed once per prefix instead of scoring every match
+SHORT_PREFIX = 2
+
+Match = namedtuple("Match", ["symbol", "name", "exchange", "asset_type", "status", "score"])
+Match.__doc__ = "One search hit; score is 1.0 for an exact symbol match and lower for looser matches."
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lower-case alphanumeric tokens of a name or query."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class SymbolIndex:
+    """
+    Search index over listings.
+
+    Args:
+        rows: Iterable of dicts with symbol, name, exchange, asset_type, status
+        built_at: Epoch seconds the listing was downloaded (defaults to now)
+    """
+
+    def __init__(self, rows=(), built_at=None):
+        self.built_at = built_at if built_at is not None else time.time()
+        self.symbols, self.names = [], []
+        self.vocab = {category: [] for category in CATEGORIES}
+        self.codes = {category: array.array("B") for category in CATEGORIES}
+        codes = {category: {} for category in CATEGORIES}
+        for row in rows:
+            if not row.get("symbol"):
+                continue
+            # Newlines would break the line-delimited sections of the saved file
+            self.symbols.append(row["symbol"].upper().replace("\n", " "))
+            self.names.append((row.get("name") or "").replace("\n", " "))
+            for category in CATEGORIES:
+                value = row.get(category) or ""
+                if value not in codes[category]:
+                    codes[category][value] = len(self.vocab[category])
+                    self.vocab[category].append(value)
+                self.codes[category].append(codes[category][value])
+        self._build_postings()
+        self._finish()
+
+    def _build_postings(self):
+        postings = {}
+        for row, name in enumerate(self.names):
+            for token in set(tokenize(name)):
+                postings.setdefault(token, array.array("I")).append(row)
+        self.tokens = sorted(postings)
+        self.offsets = array.array("I", [0])
+        self.postings = array.array("I")
+        for token in self.tokens:
+            self.postings.extend(postings[token])
+            self.offsets.append(len(self.postings))
+
+    def _finish(self):
+        """Derived lookup structures (rebuilt on load, not stored)."""
+        order = sorted(range(len(self.symbols)), key=self.symbols.__getitem__)
+        self._sorted_symbols = [self.symbols[row] for row in order]
+        self._symbol_rows = order
+        self._lookup = {category: {value: code for code, value in enumerate(values)}
+                        for category, values in self.vocab.items()}
+        self._prefix_rankings = {}
+        self._name_lengths = {}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @classmethod
+    def from_listing_csv(cls, content, built_at=None):
+        """Build from a LISTING_STATUS CSV body (bytes or str); extra columns are ignored."""
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        reader = csv.DictReader(io.StringIO(content))
+        return cls(({field: row.get(column) for column, field in LISTING_COLUMNS.items()} for row in reader),
+                   built_at)
+
+    def rows(self):
+        """Yield the indexed listings as dicts (the constructor's input format)."""
+        for row in range(len(self.symbols)):
+            match = self._row_match(row, None)
+            yield {field: getattr(match, field) for field in ["symbol", "name", *CATEGORIES]}
+
+    # Persistence
+
+    def save(self, path=INDEX_PATH):
+        """Write the index as header + zlib-compressed sections; returns the path."""
+        sections = {
+            "symbols": "\n".join(self.symbols).encode(),
+            "names": "\n".join(self.names).encode(),
+            "tokens": "\n".join(self.tokens).encode(),
+            "offsets": self.offsets.tobytes(),
+            "postings": self.postings.tobytes(),
+            **{category: self.codes[category].tobytes() for category in CATEGORIES}
+        }
+        header = json.dumps({
+            "built_at": self.built_at,
+            "vocab": self.vocab,
+            "sections": [[name, len(data)] for name, data in sections.items()]
+        }).encode()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(MAGIC + struct.pack("<I", len(header)) + header + zlib.compress(b"".join(sections.values())))
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        """Read an index written by save()."""
+        data = Path(path).read_bytes()
+        if not data.startswith(MAGIC):
+            raise ValueError(f"Not a symbol index file: {path}")
+        (header_size,) = struct.unpack_from("<I", data, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(data[start:start + header_size])
+        body = memoryview(zlib.decompress(data[start + header_size:]))
+
+        sections, position = {}, 0
+        for name, size in header["sections"]:
+            sections[name] = body[position:position + size]
+            position += size
+
+        index = cls.__new__(cls)
+        index.built_at = header["built_at"]
+        index.vocab = header["vocab"]
+        index.symbols = _split_lines(sections["symbols"])
+        index.names = _split_lines(sections["names"], len(index.symbols))
+        index.tokens = _split_lines(sections["tokens"])
+        index.offsets = _array("I", sections["offsets"])
+        index.postings = _array("I", sections["postings"])
+        index.codes = {category: _array("B", sections[category]) for category in CATEGORIES}
+        index._finish()
+        return index
+
+    # Search
+
+    def _row_match(self, row, score):
+        return Match(self.symbols[row], self.names[row],
+                     *(self.vocab[category][self.codes[category][row]] for category in CATEGORIES), score)
+
+    def _token_rows(self, token, prefix=False):
+        """Rows whose name has the token (or, with prefix, a token starting with it)."""
+        position = bisect.bisect_left(self.tokens, token)
+        if not prefix:
+            if position < len(self.tokens) and self.tokens[position] == token:
+                return set(self.postings[self.offsets[position]:self.offsets[position + 1]])
+            return set()
+        end = bisect.bisect_left(self.tokens, token + "\uffff", position)
+        return set(self.postings[self.offsets[position]:self.offsets[end]])
+
+    def _name_length(self, row):
+        """Number of tokens in a row's name (memoized)."""
+        length = self._name_lengths.get(row)
+        if length is None:
+            length = self._name_lengths[row] = len(tokenize(self.names[row]))
+        return length
+
+    def _ranked_prefix_rows(self, prefix):
+        """
+        Rows with a name token starting with a short prefix, in the order
+        search() ranks single-token name matches (fewest name tokens, active,
+        shortest symbol, symbol). Computed on first use and kept.
+        """
+        ranking = self._prefix_rankings.get(prefix)
+        if ranking is None:
+            active = self._lookup["status"].get("Active")
+            ranking = array.array("I", sorted(
+                self._token_rows(prefix, prefix=True),
+                key=lambda row: (self._name_length(row), self.codes["status"][row] != active,
+                                 len(self.symbols[row]), self.symbols[row])))
+            self._prefix_rankings[prefix] = ranking
+        return ranking
+
+    def _fuzzy_rows(self, token):
+        """Rows with a name token close to `token` (same first letter, to keep the scan small)."""
+        start = bisect.bisect_left(self.tokens, token[0])
+        end = bisect.bisect_left(self.tokens, token[0] + "\uffff", start)
+        rows = {}
+        for match in difflib.get_close_matches(token, self.tokens[start:end], n=5, cutoff=0.75):
+            ratio = difflib.SequenceMatcher(None, token, match).ratio()
+            for row in self._token_rows(match):
+                rows[row] = max(rows.get(row, 0.0), ratio)
+        return rows
+
+    def _filter(self, **filters):
+        """Per-category allowed codes, or None when a filter value doesn't exist at all."""
+        allowed = {}
+        for category, value in filters.items():
+            if value is None:
+                continue
+            values = [value] if isinstance(value, str) else value
+            codes = {self._lookup[category][item] for item in values if item in self._lookup[category]}
+            if not codes:
+                return None
+            allowed[category] = codes
+        return allowed
+
+    def search(self, query, limit=10, exchange=None, asset_type=None, status=None, fuzzy=True):
+        """
+        Find listings matching a symbol or company name.
+
+        Args:
+            query: Symbol, symbol prefix or (part of) a company name
+            limit: Maximum number of matches
+            exchange, asset_type, status: Filter values (a string or a list),
+                e.g. exchange="NASDAQ", asset_type="ETF", status="Active"
+            fuzzy: Fall back to approximate name matching when nothing matches exactly
+
+        Returns:
+            List of Match, best first
+        """
+        allowed = self._filter(exchange=exchange, asset_type=asset_type, status=status)
+        if allowed is None or not query.strip():
+            return []
+
+        def keep(row):
+            return all(self.codes[category][row] in codes for category, codes in allowed.items())
+
+        scores = {}
+        # Symbol: exact, then prefix (sorted, so shorter symbols come first)
+        symbol_query = query.strip().upper()
+        position = bisect.bisect_left(self._sorted_symbols, symbol_query)
+        while position < len(self._sorted_symbols) and len(scores) < limit:
+            symbol = self._sorted_symbols[position]
+            if not symbol.startswith(symbol_query):
+                break
+            row = self._symbol_rows[position]
+            if keep(row):
+                scores[row] = SCORE_EXACT if symbol == symbol_query else SCORE_SYMBOL_PREFIX
+            position += 1
+
+        # Name tokens: every query token must match; the last may be a prefix (still typing)
+        tokens = tokenize(query)
+        if len(tokens) == 1 and len(tokens[0]) <= SHORT_PREFIX:
+            # Taking the first `limit` new rows of the ranking is enough: only
+            # those can outrank what the symbol matches already hold
+            taken = 0
+            for row in self._ranked_prefix_rows(tokens[0]):
+                if taken >= limit:
+                    break
+                if row not in scores and keep(row):
+                    scores[row] = SCORE_NAME + 0.1 / self._name_length(row)
+                    taken += 1
+        elif tokens:
+            rows = None
+            for i, token in enumerate(tokens):
+                token_rows = self._token_rows(token, prefix=i == len(tokens) - 1)
+                rows = token_rows if rows is None else rows & token_rows
+                if not rows:
+                    break
+            for row in rows or ():
+                if row not in scores and keep(row):
+                    # Prefer names made up mostly of the query's tokens
+                    scores[row] = SCORE_NAME + 0.1 * len(tokens) / max(self._name_length(row), len(tokens))
+
+        if tokens and fuzzy and not scores:
+            fuzzy_scores = None
+            for token in tokens:
+                token_scores = self._fuzzy_rows(token)
+                if fuzzy_scores is None:
+                    fuzzy_scores = token_scores
+                else:
+                    fuzzy_scores = {row: min(score, token_scores[row])
+                                    for row, score in fuzzy_scores.items() if row in token_scores}
+            for row, ratio in (fuzzy_scores or {}).items():
+                if keep(row):
+                    scores[row] = SCORE_FUZZY * ratio
+
+        active = self._lookup["status"].get("Active")
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.codes["status"][item[0]] != active,
+                                                          len(self.symbols[item[0]]), self.symbols[item[0]]))
+        return [self._row_match(row, round(score, 4)) for row, score in ranked[:limit]]
+
+    def resolve(self, query, **filters):
+        """Best matching symbol for a user-entered name or ticker, or None."""
+        matches = self.search(query, limit=1, **filters)
+        return matches[0].symbol if matches else None
+
+
+def _split_lines(data, count=None):
+    text = bytes(data).decode()
+    if not text:
+        return [""] * count if count else []
+    return text.split("\n")
+
+
+def _array(typecode, data):
+    values = array.array(typecode)
+    values.frombytes(data)
+    return values
+
+
+def build_index(api_key, api_name="alpha_vantage", include_delisted=True):
+    """Download LISTING_STATUS (active and optionally delisted listings) and index it."""
+    from common.http_client import fetch_function
+
+    rows = {}
+    for state in ["active", "delisted"] if include_delisted else ["active"]:
+        content = fetch_function(api_name, "LISTING_STATUS", api_key, state=state).content
+        for row in SymbolIndex.from_listing_csv(content).rows():
+            rows.setdefault((row["symbol"], row["exchange"], row["status"]), row)
+    return SymbolIndex(rows.values())
+
+
+def load_index(api_key=None, path=INDEX_PATH, ttl=INDEX_TTL, listing_csv=None):
+    """
+    Load the saved index, rebuilding it once it is older than ttl seconds.
+
+    Args:
+        api_key: Key used to download LISTING_STATUS when a rebuild is due
+        path: Index file
+        ttl: Maximum age in seconds before rebuilding
+        listing_csv: Build from this LISTING_STATUS CSV file instead of downloading
+
+    Returns:
+        SymbolIndex (a stale index is returned if a rebuild isn't possible)
+    """
+    path = Path(path)
+    index = SymbolIndex.load(path) if path.exists() else None
+    if index is not None and time.time() - index.built_at < ttl:
+        return index
+
+    try:
+        if listing_csv is not None:
+            fresh = SymbolIndex.from_listing_csv(Path(listing_csv).read_bytes())
+        elif api_key is not None:
+            fresh = build_index(api_key)
+        else:
+            fresh = None
+    except Exception:
+        if index is None:
+            raise
+        return index
+
+    if fresh is None:
+        if index is None:
+            raise ValueError(f"No symbol index at {path}; pass api_key or listing_csv to build one")
+        return index
+    fresh.save(path)
+    return fresh
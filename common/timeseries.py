@@ -0,0 +1,139 @@
+"""
+Incremental refresh for daily time series.
+Instead of re-pulling outputsize=full on every refresh, fetch the compact
+window (latest 100 bars), check it against the stored history and append
+only the new bars. If the overlap disagrees (a split or dividend re-adjusted
+history) the series is pulled in full again.
+
+refresh_series does both calls itself; the batch runner fetches the windows
+through its own engine and hands them to apply_compact / save_full.
+"""
+import numpy as np
+import pandas as pd
+
+from common import store
+from common.http_client import fetch_function
+
+# Functions that accept outputsize=compact|full
+INCREMENTAL_FUNCTIONS = ["TIME_SERIES_DAILY", "TIME_SERIES_DAILY_ADJUSTED"]
+
+KEY_COLUMN = store.DATE_COLUMN
+COMPARE_COLUMNS = ["open", "high", "low", "close", "adjusted_close", "volume"]
+
+
+def load_series(function_name, symbol, directory=store.STORE_DIR):
+    """Load a stored series (newest bar first), or None if there is none."""
+    df = store.read(function_name, [symbol], directory=directory)
+    if df.empty:
+        return None
+    return df.drop(columns="symbol").sort_values(KEY_COLUMN, ascending=False, ignore_index=True)
+
+
+def save_series(df, function_name, symbol, directory=store.STORE_DIR):
+    return store.write(df, function_name, symbol, mode="replace", directory=directory)
+
+
+def overlap_matches(stored, fresh, rtol=1e-6):
+    """
+    True if every bar present in both frames has the same values.
+    The newest stored bar is skipped: it may have been captured mid-session
+    and is replaced by the fresh bar anyway.
+    """
+    latest = stored[KEY_COLUMN].max()
+    merged = stored[stored[KEY_COLUMN] < latest].merge(fresh, on=KEY_COLUMN, suffixes=("_stored", "_fresh"))
+    if merged.empty:
+        return False
+    for column in COMPARE_COLUMNS:
+        if f"{column}_stored" not in merged.columns:
+            continue
+        stored_values = merged[f"{column}_stored"].to_numpy(dtype=float)
+        fresh_values = merged[f"{column}_fresh"].to_numpy(dtype=float)
+        if not np.allclose(stored_values, fresh_values, rtol=rtol, atol=0):
+            return False
+    return True
+
+
+def merge_incremental(stored, fresh):
+    """
+    Append the fresh compact window onto stored history.
+
+    Returns:
+        Merged DataFrame (newest bar first), or None if the windows don't
+        overlap or disagree and a full pull is needed.
+    """
+    fresh = fresh.assign(**{KEY_COLUMN: pd.to_datetime(fresh[KEY_COLUMN])})
+    if fresh.empty or fresh[KEY_COLUMN].min() > stored[KEY_COLUMN].max():
+        # Gap between stored history and the compact window
+        return None
+    if not overlap_matches(stored, fresh):
+        return None
+
+    latest = stored[KEY_COLUMN].max()
+    newer = fresh[fresh[KEY_COLUMN] >= latest]
+    kept = stored[stored[KEY_COLUMN] < latest]
+    return pd.concat([newer, kept], ignore_index=True).sort_values(KEY_COLUMN, ascending=False, ignore_index=True)
+
+
+def has_series(function_name, symbol, directory=store.STORE_DIR):
+    """True if a series is stored for symbol (without reading it)."""
+    return any(store.partition_path(function_name, symbol, directory).glob("*.parquet"))
+
+
+def apply_compact(function_name, symbol, fresh, directory=store.STORE_DIR):
+    """
+    Merge a fetched compact window into the stored series and save the result.
+
+    Returns:
+        The merged DataFrame, or None if nothing is stored yet or the window
+        doesn't line up with it and a full pull is needed.
+    """
+    stored = load_series(function_name, symbol, directory)
+    if stored is None or stored.empty:
+        return None
+    merged = merge_incremental(stored, fresh)
+    if merged is not None:
+        save_series(merged, function_name, symbol, directory)
+    return merged
+
+
+def save_full(function_name, symbol, full, directory=store.STORE_DIR):
+    """Replace the stored series with a full pull; returns the saved frame."""
+    full = full.assign(**{KEY_COLUMN: pd.to_datetime(full[KEY_COLUMN])})
+    save_series(full, function_name, symbol, directory)
+    return full
+
+
+def refresh_series(function_name, symbol, api_key, directory=store.STORE_DIR):
+    """
+    Bring the stored series for symbol up to date.
+
+    Args:
+        function_name: One of INCREMENTAL_FUNCTIONS
+        symbol: e.g., "NVDA"
+        api_key: API key to use
+        directory: Store root
+
+    Returns:
+        (DataFrame, mode) where mode is "incremental" or "full"
+    """
+    if function_name not in INCREMENTAL_FUNCTIONS:
+        raise ValueError(f"Incremental refresh not supported for: {function_name}")
+
+    if has_series(function_name, symbol, directory):
+        fresh = fetch_function("alpha_vantage", function_name, api_key,
+                               symbol=symbol, outputsize="compact", datatype="csv").parse()
+        merged = apply_compact(function_name, symbol, fresh, directory)
+        if merged is not None:
+            return merged, "incremental"
+
+    full = fetch_function("alpha_vantage", function_name, api_key,
+                          symbol=symbol, outputsize="full", datatype="csv").parse()
+    return save_full(function_name, symbol, full, directory), "full"
+
+
+# Example usage:
+if __name__ == "__main__":
+    from common.api_config import get_api_key
+
+    df, mode = refresh_series("TIME_SERIES_DAILY_ADJUSTED", "NVDA", get_api_key())
+    print(f"Refreshed NVDA ({mode}): {len(df)} bars through {df[KEY_COLUMN].iloc[0]}")
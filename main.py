@@ -1,6 +1,150 @@
-def main():
-    print("Hello from api-explorer!")
+"""
+Batch runner: fetch everything described in a YAML job spec in one process.
+All calls share the pooled HTTP session, response cache and quota
+scheduler. CSV results are written to the Parquet store, JSON bodies are
+saved as files.
+
+Usage:
+    python main.py jobs.example.yaml [--dry-run] [--max-in-flight N]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from common.api_config import ParamSet, build_url, get_api_key
+from common.batch import Job, iter_batch
+from common.jobspec import expand_spec, load_spec
+
+DEFAULT_OUTPUT_DIR = Path(__file__).resolve().parent / "data" / "raw"
+
+# Parameters that tell apart files of the same function and symbol
+FILE_NAME_PARAMS = ["month", "time_from", "time_to"]
+
+
+def _task_key(job):
+    return job.function_name, ParamSet(job.params)
+
+
+def _full_pull(task):
+    """The same incremental task, asking for the full history instead of the compact window."""
+    job = task.job
+    return task._replace(job=Job(job.function_name, {**job.params, "outputsize": "full"}, job.priority))
+
+
+def handle_result(task, response, output_dir):
+    """
+    Write one response where its spec entry asks; returns the path written
+    (or None). For an incremental task whose compact window can't be merged,
+    nothing is written and None is returned so the caller pulls it in full.
+    """
+    from common import store
+
+    if task.output == "none":
+        return None
+    if task.incremental:
+        from common import timeseries
+
+        df = response.parse()
+        if task.job.params["outputsize"] == "full":
+            timeseries.save_full(task.job.function_name, task.symbol, df)
+        elif timeseries.apply_compact(task.job.function_name, task.symbol, df) is None:
+            return None
+        return store.partition_path(task.store_name, task.symbol)
+    if task.output == "store" and response.response_format == "csv":
+        df = response.parse()
+        if task.start is not None and store.DATE_COLUMN in df.columns:
+            dates = df[store.DATE_COLUMN].astype("datetime64[ns]")
+            df = df[(dates >= task.start) & (dates <= task.end)]
+        return store.write(df, task.store_name, task.symbol or store.ALL_SYMBOLS, mode=task.mode)
+    parts = [task.symbol or store.ALL_SYMBOLS] + [task.job.params[key] for key in FILE_NAME_PARAMS
+                                                    if key in task.job.params]
+    path = Path(output_dir) / task.store_name / f"{'_'.join(parts)}.{response.response_format}"
+    response.save(path)
+    return path
+
+
+def run_spec(spec, api_key, max_in_flight=None, dry_run=False):
+    """
+    Expand a spec and run every call through the batch engine.
+
+    Args:
+        spec: Parsed job spec (see common.jobspec)
+        api_key: API key used for every call
+        max_in_flight: Concurrent requests (defaults to the spec's, then the pool size)
+        dry_run: Only print the URLs that would be fetched
+
+    Returns:
+        Dict of counts: "ok", "cached", "failed"
+    """
+    api_name = spec.get("api", "alpha_vantage")
+    output_dir = spec.get("output_dir", DEFAULT_OUTPUT_DIR)
+    max_in_flight = max_in_flight or spec.get("max_in_flight")
+    pending = {}
+    full_pulls = []
+    counts = {"ok": 0, "cached": 0, "failed": 0}
+
+    def jobs(tasks):
+        # Identical calls from overlapping entries are only made once; the
+        # result goes to every entry that asked for it
+        for task in tasks:
+            if task.incremental and task.job.params["outputsize"] == "compact":
+                from common import timeseries
+
+                if not timeseries.has_series(task.store_name, task.symbol):
+                    task = _full_pull(task)
+            key = _task_key(task.job)
+            if key in pending:
+                pending[key].append(task)
+            else:
+                pending[key] = [task]
+                yield task.job
+
+    if dry_run:
+        for job in jobs(expand_spec(spec)):
+            print(build_url(api_name, job.function_name, "<apikey>", **job.params))
+            counts["ok"] += 1
+        return counts
+
+    async def run(tasks):
+        async for result in iter_batch(jobs(tasks), api_key, api_name, max_in_flight):
+            for task in pending.pop(_task_key(result.job)):
+                label = f"{task.store_name} {task.symbol or ''}".strip()
+                try:
+                    if result.error is not None:
+                        raise result.error
+                    path = handle_result(task, result.response, output_dir)
+                except Exception as error:
+                    counts["failed"] += 1
+                    print(f"❌ {label} {result.job.params}: {error}")
+                    continue
+                if path is None and task.incremental and result.job.params["outputsize"] == "compact":
+                    print(f"↻ {label}: compact window doesn't match the stored history, pulling it in full")
+                    full_pulls.append(_full_pull(task))
+                    continue
+                counts["cached" if result.response.from_cache else "ok"] += 1
+                print(f"{'📦' if result.response.from_cache else '✅'} {label}" + (f" -> {path}" if path else ""))
+
+    asyncio.run(run(expand_spec(spec)))
+    if full_pulls:
+        asyncio.run(run(full_pulls))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a YAML batch of API calls.")
+    parser.add_argument("spec", help="Path to the YAML job spec")
+    parser.add_argument("--dry-run", action="store_true", help="Print the URLs instead of fetching")
+    parser.add_argument("--max-in-flight", type=int, help="Concurrent requests")
+    args = parser.parse_args(argv)
+
+    counts = run_spec(load_spec(args.spec), get_api_key(), args.max_in_flight, args.dry_run)
+    if args.dry_run:
+        print(f"{counts['ok']} calls planned")
+        return 0
+    print(f"Done: {counts['ok']} fetched, {counts['cached']} from cache, {counts['failed']} failed")
+    return 1 if counts["failed"] else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,29 @@
+import unittest
+from urllib.parse import parse_qsl, urlsplit
+
+from common.api_config import build_params, build_url, get_plan
+
+
+class RequestPlanTest(unittest.TestCase):
+    def test_url_matches_params(self):
+        plan = get_plan("alpha_vantage", "NEWS_SENTIMENT")
+        params, url = plan.request("key", tickers="NVDA,MSFT", topics="a b&c", sort=None)
+        self.assertEqual(dict(parse_qsl(urlsplit(url).query)), dict(params.items()))
+        self.assertEqual(url, plan.url("key", tickers="NVDA,MSFT", topics="a b&c", sort=None))
+        self.assertNotIn("sort", params)
+
+    def test_required_parameter_overridden_with_none(self):
+        for build in (build_url, build_params):
+            with self.subTest(build=build.__name__):
+                with self.assertRaisesRegex(ValueError, "symbol"):
+                    build("alpha_vantage", "GLOBAL_QUOTE", "key", symbol=None)
+        with self.assertRaisesRegex(ValueError, "apikey"):
+            build_url("alpha_vantage", "GLOBAL_QUOTE", None)
+
+    def test_optional_parameter_overridden_with_none(self):
+        url = build_url("alpha_vantage", "TIME_SERIES_DAILY_ADJUSTED", "key", datatype=None)
+        self.assertNotIn("datatype", url)
+
+
+if __name__ == "__main__":
+    unittest.main()
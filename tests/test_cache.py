@@ -0,0 +1,66 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from common.cache import ResponseCache
+
+
+class EvictionOrderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.clock = 1000.0
+        patcher = mock.patch("common.cache.time.time", lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def open_cache(self, **settings):
+        settings = {"max_bytes": 350, "memory_items": 8, "memory_max_item_bytes": 1024, **settings}
+        cache = ResponseCache(self.directory.name, **settings)
+        self.addCleanup(cache.close)
+        return cache
+
+    def put(self, cache, key):
+        self.clock += 1
+        cache.put(key, "TEST", b"x" * 100)
+
+    def keys_on_disk(self, cache):
+        return {row[0] for row in cache._db.execute("SELECT key FROM responses")}
+
+    def test_memory_hits_keep_keys_on_disk(self):
+        cache = self.open_cache()
+        for key in ("a", "b", "c"):
+            self.put(cache, key)
+        self.clock += 1
+        self.assertEqual(cache.get("a", ttl=3600), b"x" * 100)  # served from memory
+
+        self.put(cache, "d")
+
+        self.assertEqual(self.keys_on_disk(cache), {"a", "c", "d"})
+
+    def test_disk_hits_keep_keys_on_disk(self):
+        cache = self.open_cache(memory_items=0)
+        for key in ("a", "b", "c"):
+            self.put(cache, key)
+        self.clock += 1
+        self.assertEqual(cache.get("a", ttl=3600), b"x" * 100)
+
+        self.put(cache, "d")
+
+        self.assertEqual(self.keys_on_disk(cache), {"a", "c", "d"})
+
+    def test_touches_persist_on_close(self):
+        cache = self.open_cache()
+        for key in ("a", "b"):
+            self.put(cache, key)
+        self.clock += 1
+        cache.get("a", ttl=3600)
+        cache.close()
+
+        reopened = self.open_cache()
+        accessed = dict(reopened._db.execute("SELECT key, accessed_at FROM responses"))
+        self.assertEqual(accessed, {"a": 1003.0, "b": 1002.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import json
+import unittest
+
+from common.errors import ApiError, InvalidRequestError, PremiumError, RateLimitError, classify
+
+MINUTE_NOTE = ("Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute "
+               "and 500 calls per day. Please visit https://www.alphavantage.co/premium/ if you would like "
+               "to target a higher API call frequency.")
+DAY_INFORMATION = ("We have detected your API key as DEMOKEY and our standard API rate limit is 25 requests "
+                   "per day. Please subscribe to any of the premium plans at "
+                   "https://www.alphavantage.co/premium/ to instantly remove all daily rate limits.")
+PREMIUM_INFORMATION = ("Thank you for using Alpha Vantage! This is a premium endpoint. You may subscribe to "
+                       "any of the premium plans at https://www.alphavantage.co/premium/ to instantly unlock "
+                       "all premium endpoints")
+
+
+def body(field, message):
+    return json.dumps({field: message}).encode()
+
+
+class ClassifyTest(unittest.TestCase):
+    def test_per_minute_note(self):
+        error = classify(body("Note", MINUTE_NOTE), "GLOBAL_QUOTE")
+        self.assertIsInstance(error, RateLimitError)
+        self.assertEqual((error.window, error.retry_after), ("minute", 60.0))
+        self.assertEqual(error.field, "Note")
+
+    def test_per_minute_note_without_daily_mention(self):
+        message = "Our standard API rate limit is 5 requests per minute. Please subscribe to remove all daily rate limits."
+        self.assertEqual(classify(body("Note", message)).window, "minute")
+
+    def test_daily_information(self):
+        error = classify(body("Information", DAY_INFORMATION))
+        self.assertIsInstance(error, RateLimitError)
+        self.assertEqual(error.window, "day")
+        self.assertTrue(0 < error.retry_after <= 86400)
+
+    def test_premium_endpoint(self):
+        error = classify(body("Information", PREMIUM_INFORMATION), "REALTIME_BULK_QUOTES")
+        self.assertIsInstance(error, PremiumError)
+        self.assertNotIsInstance(error, RateLimitError)
+
+    def test_error_message(self):
+        error = classify(body("Error Message", "Invalid API call."))
+        self.assertIsInstance(error, InvalidRequestError)
+
+    def test_other_message(self):
+        error = classify(body("Information", "The demo API key is for demo purposes only."))
+        self.assertIs(type(error), ApiError)
+
+    def test_data(self):
+        self.assertIsNone(classify(b"timestamp,open\n2025-06-27,156.04\n"))
+        self.assertIsNone(classify(json.dumps({"Information": DAY_INFORMATION, "feed": []}).encode()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import json
+import unittest
+
+from common.news_stream import iter_articles, iter_articles_from_bytes
+
+PAYLOAD = {
+    "items": "3",
+    "sentiment_score_definition": "x <= -0.35: Bearish",
+    "feed": [
+        {"title": "Café earnings beat", "overall_sentiment_score": 0.123456,
+         "ticker_sentiment": [{"ticker": "MSFT", "relevance_score": "0.5"}]},
+        {"title": "日本株 rally", "overall_sentiment_score": -12345678,
+         "ticker_sentiment": []},
+        {"title": "Plain", "overall_sentiment_score": 1e-5, "ticker_sentiment": []},
+    ],
+}
+
+
+class IterArticlesTest(unittest.TestCase):
+    def test_chunk_sizes(self):
+        body = json.dumps(PAYLOAD, ensure_ascii=False, indent=2).encode("utf-8")
+        for chunk_size in (1, 2, 3, 7, 64, len(body)):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_articles_from_bytes(body, chunk_size)), PAYLOAD["feed"])
+
+    def test_number_split_across_chunks(self):
+        body = b'{"feed": [-12345678, 0.5]}'
+        split = body.index(b"5678")
+        self.assertEqual(list(iter_articles([body[:split], body[split:]])), [-12345678, 0.5])
+
+    def test_empty_feed(self):
+        self.assertEqual(list(iter_articles([b'{"items": "0", "feed": []}'])), [])
+
+    def test_missing_feed(self):
+        body = b'{"Information": "Invalid inputs."}'
+        with self.assertRaisesRegex(ValueError, "Invalid inputs"):
+            list(iter_articles_from_bytes(body, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import json
+import threading
+import unittest
+from unittest import mock
+
+from common import http_client
+from common.errors import RateLimitError
+from common.quota import QuotaScheduler
+
+from tests.test_errors import DAY_INFORMATION, MINUTE_NOTE
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCondition(threading.Condition):
+    """Waiting advances the fake clock instead of sleeping."""
+
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+
+    def wait(self, timeout=None):
+        if timeout is None:
+            raise AssertionError("waiting without a timeout would block forever")
+        self.clock.now += timeout
+        return True
+
+
+def make_scheduler():
+    clock = FakeClock()
+    scheduler = QuotaScheduler(clock=clock)
+    scheduler._cond = FakeCondition(clock)
+    return scheduler, clock
+
+
+class FailFastHoldTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler, self.clock = make_scheduler()
+        self.scheduler.set_key_quota("alpha_vantage", "key", per_minute=5, per_day=2)
+
+    def acquire(self, timeout=None):
+        self.scheduler.acquire("alpha_vantage", "GLOBAL_QUOTE", "key", timeout=timeout)
+
+    def test_exhausted_daily_quota_fails_at_once(self):
+        self.acquire()
+        self.acquire()
+        self.scheduler.penalize("alpha_vantage", "key", 3600, fail_fast=True)
+
+        with self.assertRaises(RateLimitError) as raised:
+            self.acquire()
+        self.assertEqual(raised.exception.window, "day")
+        self.assertAlmostEqual(raised.exception.retry_after, 3600)
+        self.assertEqual(self.clock.now, 1000.0)
+
+        self.clock.now += 3600
+        self.acquire()
+
+    def test_plain_hold_waits(self):
+        self.scheduler.penalize("alpha_vantage", "key", 60)
+        with self.assertRaises(TimeoutError):
+            self.acquire(timeout=30)
+        self.acquire()
+        self.assertGreaterEqual(self.clock.now, 1060.0)
+
+    def test_fail_fast_ends_with_its_hold(self):
+        self.scheduler.penalize("alpha_vantage", "key", 60, fail_fast=True)
+        self.clock.now += 61
+        self.scheduler.penalize("alpha_vantage", "key", 30)
+        self.acquire()
+        self.assertGreaterEqual(self.clock.now, 1091.0)
+
+
+class RetryTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler, self.clock = make_scheduler()
+        self.scheduler.set_key_quota("alpha_vantage", "key", per_minute=100, per_day=1000)
+        patchers = [
+            mock.patch("common.http_client.get_scheduler", return_value=self.scheduler),
+            mock.patch("common.http_client.random.uniform", return_value=0.0),
+            mock.patch.dict(http_client.CLIENT_CONFIG, soft_retries=3, max_retry_delay=300)
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def fetch(self, bodies):
+        with mock.patch("common.http_client.fetch", side_effect=bodies) as fetch:
+            try:
+                return http_client.fetch_function("alpha_vantage", "GLOBAL_QUOTE", "key", use_cache=False,
+                                                  coalesce=False, symbol="TEST")
+            finally:
+                self.calls = fetch.call_count
+
+    def test_minute_note_is_retried_after_the_window(self):
+        data = b"symbol,price\nTEST,1.0\n"
+        response = self.fetch([json.dumps({"Note": MINUTE_NOTE}).encode(), data])
+        self.assertEqual(response.content, data)
+        self.assertEqual(self.calls, 2)
+        self.assertGreaterEqual(self.clock.now, 1060.0)
+
+    def test_daily_limit_fails_fast_for_later_calls(self):
+        with self.assertRaises(RateLimitError) as raised:
+            self.fetch([json.dumps({"Information": DAY_INFORMATION}).encode()])
+        self.assertEqual(raised.exception.window, "day")
+        self.assertEqual(self.calls, 1)
+
+        with self.assertRaises(RateLimitError):
+            self.fetch([b"symbol,price\nTEST,1.0\n"])
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(self.clock.now, 1000.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from unittest import mock
+
+from common import quotes
+from common.batch import BatchResult
+from common.errors import PremiumError, RateLimitError
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def parse(self):
+        return self.payload
+
+
+def global_quote(symbol):
+    return {"Global Quote": {"01. symbol": symbol, "05. price": "10.0", "07. latest trading day": "2025-06-27"}}
+
+
+class GetQuotesTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(quotes, "_bulk_unavailable", set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = []
+
+    def run_quotes(self, bulk_answer, symbols=("AAA", "BBB")):
+        def run_batch(jobs, api_key, api_name, max_in_flight):
+            results = []
+            for job in jobs:
+                self.calls.append(job.function_name)
+                if job.function_name == "GLOBAL_QUOTE":
+                    results.append(BatchResult(job, FakeResponse(global_quote(job.params["symbol"])), None))
+                elif isinstance(bulk_answer, Exception):
+                    results.append(BatchResult(job, None, bulk_answer))
+                else:
+                    results.append(BatchResult(job, FakeResponse(bulk_answer), None))
+            return results
+
+        failed = []
+        with mock.patch.object(quotes, "run_batch", run_batch):
+            table = quotes.get_quotes(symbols, "key", failed=failed)
+        return table, failed
+
+    def test_answer_without_data_falls_back_once(self):
+        table, _ = self.run_quotes({"Information": "temporarily unavailable"})
+        self.assertEqual(list(table["source"]), ["global_quote", "global_quote"])
+        self.assertNotIn("key", quotes._bulk_unavailable)
+
+        self.calls.clear()
+        table, _ = self.run_quotes({"data": [{"symbol": "AAA", "close": "1.5"}, {"symbol": "BBB", "close": "2.5"}]})
+        self.assertEqual(self.calls, ["REALTIME_BULK_QUOTES"])
+        self.assertEqual(list(table["close"]), [1.5, 2.5])
+
+    def test_premium_error_skips_bulk_for_the_key(self):
+        self.run_quotes(PremiumError("This is a premium endpoint."))
+        self.assertIn("key", quotes._bulk_unavailable)
+
+        self.calls.clear()
+        table, _ = self.run_quotes({"data": []})
+        self.assertEqual(self.calls, ["GLOBAL_QUOTE", "GLOBAL_QUOTE"])
+        self.assertEqual(list(table["close"]), [10.0, 10.0])
+
+    def test_rate_limit_leaves_nan_rows(self):
+        error = RateLimitError("Note")
+        table, failed = self.run_quotes(error)
+        self.assertEqual(self.calls, ["REALTIME_BULK_QUOTES"])
+        self.assertTrue(table["close"].isna().all())
+        self.assertEqual(failed, [(["AAA", "BBB"], error)])
+        self.assertNotIn("key", quotes._bulk_unavailable)
+
+
+if __name__ == "__main__":
+    unittest.main()
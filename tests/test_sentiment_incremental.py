@@ -0,0 +1,129 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from common.news_backfill import PUBLISHED_FORMAT
+from common.sentiment_incremental import SentimentAccumulator
+
+START = datetime(2025, 3, 3, 9, 0)
+
+
+def article(url, published, tickers=("AAA",), score=0.2):
+    return {
+        "url": url,
+        "time_published": published.strftime(PUBLISHED_FORMAT),
+        "title": url,
+        "source": "Test",
+        "overall_sentiment_score": score,
+        "overall_sentiment_label": "Neutral",
+        "ticker_sentiment": [{"ticker": ticker, "ticker_sentiment_score": str(score), "relevance_score": "0.5",
+                              "ticker_sentiment_label": "Neutral"} for ticker in tickers]
+    }
+
+
+class FakeFeed:
+    """Stands in for iter_backfill: serves `articles` published within [start, end]."""
+
+    def __init__(self):
+        self.articles = []
+        self.failing = []     # (start, end) windows whose request fails
+        self.calls = []
+
+    def __call__(self, api_key, start, end, tickers=None, failed_windows=None, **kwargs):
+        self.calls.append((start, end, tickers))
+        for window in self.failing:
+            if start <= window[1] and window[0] <= end and failed_windows is not None:
+                failed_windows.append((*window, "RateLimitError()"))
+        for item in self.articles:
+            published = datetime.strptime(item["time_published"], PUBLISHED_FORMAT)
+            if not start <= published <= end:
+                continue
+            if any(window[0] <= published <= window[1] for window in self.failing):
+                continue
+            if tickers is not None and tickers not in [mention["ticker"] for mention in item["ticker_sentiment"]]:
+                continue
+            yield item
+
+
+class SentimentAccumulatorTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.feed = FakeFeed()
+        patcher = mock.patch("common.sentiment_incremental.iter_backfill", self.feed)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def accumulator(self, tickers=("AAA",)):
+        return SentimentAccumulator(self.directory.name, tickers=tickers)
+
+    def counts(self, accumulator):
+        daily = accumulator.daily()
+        return {(row.date.strftime("%Y-%m-%d"), row.ticker): row.article_count for row in daily.itertuples()}
+
+    def test_late_article_inside_lookback_is_counted_once(self):
+        self.feed.articles = [article("a", START), article("b", START + timedelta(hours=3))]
+        accumulator = self.accumulator()
+        accumulator.refresh("key", start=START - timedelta(hours=1), end=START + timedelta(hours=4))
+        self.assertEqual(accumulator.watermark, "20250303T120000")
+
+        # Published two hours before the watermark, but only visible now
+        self.feed.articles.append(article("late", START + timedelta(hours=1)))
+        touched = accumulator.refresh("key", end=START + timedelta(hours=5))
+
+        self.assertEqual(self.feed.calls[-1][0], START + timedelta(hours=3) - timedelta(hours=6))
+        self.assertEqual(touched, [datetime(2025, 3, 3)])
+        self.assertEqual(self.counts(accumulator), {("2025-03-03", "AAA"): 3})
+
+    def test_failed_window_is_retried_on_next_refresh(self):
+        self.feed.articles = [article("a", START), article("b", START + timedelta(days=2)),
+                              article("c", START + timedelta(days=4))]
+        self.feed.failing = [(START + timedelta(days=1), START + timedelta(days=3))]
+        accumulator = self.accumulator()
+        failed = []
+        accumulator.refresh("key", start=START - timedelta(hours=1), end=START + timedelta(days=5),
+                            failed_windows=failed)
+
+        self.assertEqual(len(failed), 1)
+        self.assertEqual(accumulator.watermark, (START + timedelta(days=1)).strftime(PUBLISHED_FORMAT))
+        self.assertEqual(self.counts(accumulator), {("2025-03-03", "AAA"): 1, ("2025-03-07", "AAA"): 1})
+
+        self.feed.failing = []
+        accumulator.refresh("key", end=START + timedelta(days=5))
+
+        self.assertEqual(accumulator.watermark, (START + timedelta(days=4)).strftime(PUBLISHED_FORMAT))
+        self.assertEqual(self.counts(accumulator), {("2025-03-03", "AAA"): 1, ("2025-03-05", "AAA"): 1,
+                                                    ("2025-03-07", "AAA"): 1})
+
+    def test_restart_from_saved_state_does_not_double_count(self):
+        self.feed.articles = [article("a", START), article("b", START + timedelta(hours=2), score=-0.4)]
+        first = self.accumulator()
+        first.refresh("key", start=START - timedelta(hours=1), end=START + timedelta(hours=3))
+        expected = first.daily()
+
+        restarted = self.accumulator()
+        self.assertEqual(restarted.watermark, first.watermark)
+        self.assertEqual(restarted.refresh("key", end=START + timedelta(hours=4)), [])
+        self.assertTrue(restarted.daily().equals(expected))
+
+        self.feed.articles.append(article("c", START + timedelta(hours=3, minutes=30)))
+        restarted.refresh("key", end=START + timedelta(hours=4))
+        self.assertEqual(self.counts(self.accumulator()), {("2025-03-03", "AAA"): 3})
+
+    def test_refresh_is_scoped_to_tracked_tickers(self):
+        self.feed.articles = [article("a", START, tickers=("AAA", "BBB")), article("b", START, tickers=("CCC",)),
+                              article("c", START, tickers=("BBB",))]
+        accumulator = self.accumulator(tickers=["AAA", "BBB"])
+        accumulator.refresh("key", start=START - timedelta(hours=1), end=START + timedelta(hours=1))
+
+        self.assertEqual([tickers for _, _, tickers in self.feed.calls], ["AAA", "BBB"])
+        self.assertEqual(self.counts(accumulator), {("2025-03-03", "AAA"): 1, ("2025-03-03", "BBB"): 2})
+
+        untracked = SentimentAccumulator(self.directory.name + "/all")
+        untracked.refresh("key", start=START - timedelta(hours=1), end=START + timedelta(hours=1))
+        self.assertEqual(self.feed.calls[-1][2], None)
+
+
+if __name__ == "__main__":
+    unittest.main()